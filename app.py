@@ -1,5 +1,8 @@
 import streamlit as st
 
+from portfolio.pagina import rastreio
+from portfolio.pagina.recursos import AQUECER_PADRAO, aquecer
+
 # 1. Configuração inicial
 st.set_page_config(layout="wide", page_title="Portfólio de Data Science - Danilo A. F.")
 
@@ -32,4 +35,16 @@ pg = st.navigation([
     st.Page("projeto-5-logistica/app_logist.py", title="5. Logística Real", icon="📦"), 
 ])
 
+# Instrumentação opcional (PORTFOLIO_RASTREIO=1 ou ?rastreio=1): etapas, cache e gráficos desta execução
+rastreio.iniciar(pg.title)
 pg.run()
+rastreio.painel()
+
+# 4. AQUECIMENTO: depois que a página aberta foi desenhada, uma thread de fundo importa os módulos das
+# demais páginas e prepara os seus dados e modelos padrão (uma vez por processo). Trocar de página
+# passa a reaproveitar o cache em memória. PORTFOLIO_AQUECER=0 desliga.
+if AQUECER_PADRAO:
+    aquecer(modulos=[
+        "portfolio.pagina.churn", "portfolio.pagina.geo", "portfolio.pagina.auditoria",
+        "portfolio.pagina.kpi", "portfolio.pagina.logistica", "plotly.express",
+    ])
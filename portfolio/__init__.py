@@ -0,0 +1,8 @@
+"""
+Núcleo compartilhado do portfólio.
+
+As páginas Streamlit (`projeto-*/app_*.py`) cuidam apenas da interface;
+a lógica de dados e modelos fica aqui, em funções sem dependência do Streamlit.
+A exceção é `portfolio.pagina`, o runtime comum das páginas (recursos cacheados,
+aquecimento e arquivos estáticos).
+"""
@@ -0,0 +1,208 @@
+"""
+Armazenamento colunar dos datasets dos dashboards.
+
+Cada dataset é gravado em `<diretorio>/<nome>/` como Parquet (ou Arrow IPC)
+particionado no estilo Hive (`Regiao=Norte/...`), com as colunas categóricas
+em dictionary encoding. A leitura projeta só as colunas pedidas e empurra os
+filtros da barra lateral para o leitor: partições fora do filtro nem são
+abertas, e os demais predicados usam as estatísticas dos row groups. Os
+arquivos são lidos com memory-map, então abrir uma página sobre um histórico
+de vários GB só toca os bytes necessários.
+"""
+import base64
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+# Diretório padrão dos dados (pode ser trocado pela variável de ambiente)
+DIRETORIO_PADRAO = os.environ.get(
+    "PORTFOLIO_DADOS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dados"),
+)
+
+FORMATOS = {"parquet": "parquet", "arrow": "ipc"}
+LINHAS_POR_GRUPO = 256 * 1024
+
+
+@dataclass
+class Varredura:
+    """Quanto do dataset uma leitura precisa tocar (arquivos e bytes após a poda de partições)."""
+    arquivos: int
+    arquivos_total: int
+    bytes: int
+    bytes_total: int
+
+
+def _sistema_arquivos():
+    from pyarrow import fs
+
+    return fs.LocalFileSystem(use_mmap=True)
+
+
+def _para_tabela(df):
+    """DataFrame -> tabela Arrow com texto e categorias em dictionary encoding."""
+    import pyarrow as pa
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    for i, campo in enumerate(tabela.schema):
+        if pa.types.is_string(campo.type) or pa.types.is_large_string(campo.type):
+            tabela = tabela.set_column(i, campo.name, tabela.column(i).dictionary_encode())
+    return tabela
+
+
+def _expressao(filtros):
+    """{coluna: valores} (lista = pertence; tupla (min, max) = intervalo, None = aberto) -> expressão do pyarrow."""
+    import pyarrow.dataset as ds
+
+    expressao = None
+    for coluna, valores in (filtros or {}).items():
+        if valores is None:
+            continue
+        campo = ds.field(coluna)
+        if isinstance(valores, tuple):
+            minimo, maximo = valores
+            termos = ([campo >= minimo] if minimo is not None else []) + ([campo <= maximo] if maximo is not None else [])
+            if not termos:
+                continue
+            termo = termos[0] if len(termos) == 1 else termos[0] & termos[1]
+        else:
+            termo = campo.isin(list(valores))
+        expressao = termo if expressao is None else expressao & termo
+    return expressao
+
+
+class Armazem:
+    """Datasets colunares em `<diretorio>/<nome>/`, com um `_meta.json` descrevendo partições e formato."""
+
+    def __init__(self, diretorio=None):
+        self.diretorio = diretorio or DIRETORIO_PADRAO
+
+    def caminho(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def metadados(self, nome):
+        try:
+            with open(os.path.join(self.caminho(nome), "_meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def existe(self, nome):
+        return self.metadados(nome) is not None
+
+    def gravar(self, nome, dados, particoes=(), formato="parquet"):
+        """
+        Grava `dados` (um DataFrame ou um iterável de DataFrames, em lotes) particionado
+        pelas colunas `particoes`. A escrita é atômica: o dataset só aparece completo.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        lotes = [dados] if isinstance(dados, pd.DataFrame) else dados
+        destino = self.caminho(nome)
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        shutil.rmtree(temporario, ignore_errors=True)
+        inicio = time.perf_counter()
+        linhas = 0
+        esquema = None
+        for i, df in enumerate(lotes):
+            tabela = _para_tabela(df)
+            if esquema is None:
+                esquema = tabela.schema
+                esquema_particoes = pa.schema([esquema.field(c) for c in particoes])
+                particionamento = ds.partitioning(esquema_particoes, flavor="hive") if particoes else None
+            ds.write_dataset(
+                tabela.cast(esquema), temporario, format=FORMATOS[formato],
+                partitioning=particionamento, basename_template=f"parte-{i:05d}-{{i}}.{formato}",
+                existing_data_behavior="overwrite_or_ignore",
+                max_rows_per_group=LINHAS_POR_GRUPO, min_rows_per_group=min(LINHAS_POR_GRUPO, len(tabela)),
+            )
+            linhas += len(tabela)
+
+        metadados = {
+            "nome": nome,
+            "formato": formato,
+            "particoes": list(particoes),
+            # Tipos das partições (ex.: Ano inteiro, Zona em dicionário), para a leitura não tratar tudo como texto
+            "esquema_particoes": base64.b64encode(esquema_particoes.serialize().to_pybytes()).decode() if esquema else None,
+            "colunas": esquema.names if esquema is not None else [],
+            "linhas": linhas,
+            "segundos_gravacao": round(time.perf_counter() - inicio, 4),
+            "criado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        os.makedirs(temporario, exist_ok=True)
+        with open(os.path.join(temporario, "_meta.json"), "w", encoding="utf-8") as f:
+            json.dump(metadados, f, indent=2, ensure_ascii=False)
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(temporario, destino)
+        return destino
+
+    def dataset(self, nome):
+        import pyarrow.dataset as ds
+
+        meta = self.metadados(nome)
+        if meta is None:
+            raise FileNotFoundError(f"Dataset '{nome}' não encontrado em {self.diretorio}")
+        particionamento = None
+        if meta["particoes"]:
+            import pyarrow as pa
+
+            esquema = pa.ipc.read_schema(pa.py_buffer(base64.b64decode(meta["esquema_particoes"])))
+            particionamento = ds.partitioning(esquema, flavor="hive", dictionaries="infer")
+        return ds.dataset(
+            self.caminho(nome), format=FORMATOS[meta["formato"]], filesystem=_sistema_arquivos(),
+            partitioning=particionamento,
+            exclude_invalid_files=True, ignore_prefixes=["_", "."],
+        )
+
+    def ler_tabela(self, nome, colunas=None, filtros=None):
+        """Tabela Arrow só com `colunas`, filtrada no leitor (partições e row groups)."""
+        return self.dataset(nome).to_table(columns=colunas, filter=_expressao(filtros))
+
+    def ler(self, nome, colunas=None, filtros=None):
+        """Como `ler_tabela`, já convertido para DataFrame (dicionários viram categorias)."""
+        df = self.ler_tabela(nome, colunas, filtros).to_pandas()
+        # Colunas de partição vêm por último no Arrow: devolve na ordem pedida (ou na original)
+        ordem = colunas or self.metadados(nome)["colunas"]
+        return df[[c for c in ordem if c in df.columns]]
+
+    def lotes(self, nome, colunas=None, filtros=None, tamanho_lote=LINHAS_POR_GRUPO):
+        """DataFrames de até `tamanho_lote` linhas, sem materializar o dataset inteiro."""
+        scanner = self.dataset(nome).scanner(columns=colunas, filter=_expressao(filtros), batch_size=tamanho_lote)
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def valores_particao(self, nome, coluna):
+        """Membros de uma coluna de partição, lidos dos nomes dos diretórios (sem abrir arquivos)."""
+        dataset = self.dataset(nome)
+        valores = set()
+        for fragmento in dataset.get_fragments():
+            for chave, valor in _chaves_particao(fragmento).items():
+                if chave == coluna:
+                    valores.add(valor)
+        return sorted(valores)
+
+    def varredura(self, nome, filtros=None):
+        """Arquivos e bytes que uma leitura com `filtros` abriria (poda por partição), e o total."""
+        dataset = self.dataset(nome)
+        todos = dataset.files
+        tocados = [f.path for f in dataset.get_fragments(filter=_expressao(filtros))]
+        tamanho = {c: os.path.getsize(c) for c in todos}
+        return Varredura(len(tocados), len(todos), sum(tamanho[c] for c in tocados), sum(tamanho.values()))
+
+    def obter_ou_gravar(self, nome, fabrica, particoes=(), formato="parquet"):
+        """Grava o resultado de `fabrica()` na primeira vez; depois só devolve o nome do dataset."""
+        if not self.existe(nome):
+            self.gravar(nome, fabrica(), particoes, formato)
+        return nome
+
+
+def _chaves_particao(fragmento):
+    import pyarrow.dataset as ds
+
+    return ds.get_partition_keys(fragmento.partition_expression)
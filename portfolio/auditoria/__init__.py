@@ -0,0 +1 @@
+"""Motores de detecção de anomalias do projeto de Auditoria Financeira."""
@@ -0,0 +1,50 @@
+"""
+Isolation Forest com ajuste e limiar desacoplados.
+
+O `contamination` do scikit-learn não muda as árvores: ele só define o limiar
+(`offset_`) como o percentil `contamination` dos `score_samples` da base de
+treino. Por isso a floresta é ajustada uma vez por base, os scores ficam
+guardados e a sensibilidade vira apenas uma comparação O(n) com um quantil.
+"""
+import numpy as np
+
+STATUS_ANOMALIA = "Anomalia Detectada"
+STATUS_NORMAL = "Normal"
+
+
+def ajustar_floresta(X, random_state=42, **params):
+    """Ajusta o IsolationForest (sem contamination: o limiar é aplicado depois)."""
+    from sklearn.ensemble import IsolationForest
+
+    return IsolationForest(random_state=random_state, **params).fit(X)
+
+
+def limiar_por_quantil(scores, contaminacao):
+    """Mesmo limiar que o IsolationForest(contamination=...) calcularia no ajuste."""
+    return np.percentile(scores, 100.0 * contaminacao)
+
+
+def rotular(scores, contaminacao, candidatos=None):
+    """
+    Devolve (Anomaly_Score, Status) como no `fit_predict`: -1/'Anomalia Detectada'
+    para scores abaixo do limiar e 1/'Normal' para os demais.
+    Com `candidatos` (máscara booleana, ex.: o residual das regras), o limiar é o quantil
+    só dos scores candidatos e as demais linhas ficam normais (sem candidatos, nenhuma anomalia).
+    """
+    if candidatos is None:
+        anomalia = scores < limiar_por_quantil(scores, contaminacao)
+    else:
+        anomalia = np.zeros(len(scores), dtype=bool)
+        if candidatos.any():
+            anomalia[candidatos] = scores[candidatos] < limiar_por_quantil(scores[candidatos], contaminacao)
+    return np.where(anomalia, -1, 1), np.where(anomalia, STATUS_ANOMALIA, STATUS_NORMAL)
+
+
+def detectar_anomalias(df, contaminacao, scores, candidatos=None):
+    """
+    Grava Anomaly_Score e Status em `df` para a sensibilidade `contaminacao`.
+    A sensibilidade só move o limiar (quantil dos scores, ou só dos `candidatos`):
+    nenhuma floresta é ajustada aqui.
+    """
+    df['Anomaly_Score'], df['Status'] = rotular(scores, contaminacao, candidatos)
+    return df
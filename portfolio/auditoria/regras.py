@@ -0,0 +1,278 @@
+"""
+Pré-filtro de regras de auditoria, aplicado antes do Isolation Forest.
+
+A maior parte dos achados reais são padrões determinísticos e baratos de checar.
+Cada regra é uma passada vetorizada O(n): os agrupamentos usam hash
+(`pd.util.hash_pandas_object` + `pd.factorize`) e as janelas de tempo viram
+baldes do tamanho da janela (duas transações a no máximo uma janela de
+distância estão no mesmo balde ou em baldes vizinhos), sem ordenar a base.
+
+Motivos conclusivos (a transação já é um achado):
+- DUPLICADO: mesmo fornecedor, departamento, categoria e valor em até 24 h;
+- FRACIONADO: no mesmo dia, 2+ pagamentos ao mesmo fornecedor e departamento
+  logo abaixo da alçada que juntos a superam.
+
+Motivos indicativos (a transação fica para o modelo decidir):
+- VALOR_REDONDO: múltiplo de R$ 100;
+- FORA_EXPEDIENTE: horário em que o departamento quase não lança;
+- BENFORD: primeiro dígito em excesso num departamento que não segue a Lei de
+  Benford (só quando os valores cobrem ordens de grandeza suficientes).
+
+As transações sem motivo e dentro da faixa típica de valor do seu segmento
+(Departamento x Categoria) são decididas como normais. Só o residual, ambíguo,
+vai para a floresta.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from portfolio.auditoria.modelo import STATUS_ANOMALIA
+
+# (código, bit, conclusivo, descrição)
+MOTIVOS = [
+    ("DUPLICADO", 1, True, "Mesmo fornecedor, departamento, categoria e valor em até 24 h"),
+    ("FRACIONADO", 2, True, "Pagamentos no mesmo dia logo abaixo da alçada que juntos a superam"),
+    ("VALOR_REDONDO", 4, False, "Valor múltiplo de R$ 100"),
+    ("FORA_EXPEDIENTE", 8, False, "Horário em que o departamento quase não lança"),
+    ("BENFORD", 16, False, "Primeiro dígito em excesso num departamento fora da Lei de Benford"),
+]
+BITS = {codigo: bit for codigo, bit, _, _ in MOTIVOS}
+MASCARA_CONCLUSIVA = sum(bit for _, bit, conclusivo, _ in MOTIVOS if conclusivo)
+MOTIVO_MODELO = "ISOLATION_FOREST"
+
+SEGMENTOS = ["Departamento", "Categoria"]
+JANELA_DUPLICADO_S = 24 * 3600
+ALCADA = 5_000.0           # limite de aprovação de um pagamento
+FRACAO_ALCADA = 0.6        # "logo abaixo": de 60% a 100% da alçada
+MULTIPLO_REDONDO = 100
+VALOR_REDONDO_MIN = 500
+FRACAO_HORARIO = 0.25      # hora com menos de 1/4 da média de lançamentos/hora do departamento
+MIN_LANCAMENTOS_HORARIO = 1_000
+# Benford: conformidade pelo MAD do primeiro dígito (limites de Nigrini) e aplicabilidade
+MAD_NAO_CONFORME = 0.015
+Z_EXCESSO = 2.576
+MIN_BENFORD = 300
+ORDENS_MIN_BENFORD = 2.0   # log10(p99 / p1) dos valores do departamento
+# Faixa típica: mediana +- K x desvio robusto (MAD x 1,4826), estimada numa amostra por segmento
+K_FAIXA = 3.0
+AMOSTRA_FAIXA = 200_000
+# Score das transações decididas pelas regras: acima de qualquer score de isolamento (<= 0)
+SCORE_DECIDIDO = 1.0
+
+BENFORD_ESPERADO = np.log10(1 + 1 / np.arange(1, 10))
+
+
+def _codigos(df, colunas):
+    """Código inteiro por combinação de `colunas` (hash vetorizado + factorize: O(n))."""
+    return pd.factorize(pd.util.hash_pandas_object(df[colunas], index=False).to_numpy())[0]
+
+
+def _segundos(df):
+    data = df["Data"]
+    if not pd.api.types.is_datetime64_any_dtype(data):
+        data = pd.to_datetime(data)
+    return data.to_numpy().astype("datetime64[s]").view(np.int64)
+
+
+def vizinho_na_janela(codigos, tempos, janela):
+    """
+    True onde outra linha com o mesmo código (inteiros de 0 a n-1) está a no máximo `janela` de distância.
+    Baldes de largura `janela`: basta o próprio balde e os máximos/mínimos dos baldes vizinhos.
+    """
+    marcados = np.zeros(len(codigos), dtype=bool)
+    if not len(codigos):
+        return marcados
+    # Códigos que só aparecem uma vez não têm vizinho: a maior parte da base sai aqui
+    repetidos = np.flatnonzero(np.bincount(codigos)[codigos] > 1)
+    if not len(repetidos):
+        return marcados
+    codigos, tempos = codigos[repetidos], tempos[repetidos]
+    balde = tempos // janela
+    balde -= balde.min()
+    n_baldes = int(balde.max()) + 1
+    chave = codigos.astype(np.int64) * n_baldes + balde
+    grupo, unicos = pd.factorize(chave)
+    mesmo_balde = np.bincount(grupo)[grupo] > 1
+
+    por_grupo = pd.Series(tempos).groupby(grupo)
+    maximo, minimo = por_grupo.max().to_numpy(), por_grupo.min().to_numpy()
+    indice = pd.Index(unicos)
+    anterior = np.where(balde > 0, indice.get_indexer(chave - 1), -1)
+    seguinte = np.where(balde < n_baldes - 1, indice.get_indexer(chave + 1), -1)
+    perto_anterior = (anterior >= 0) & (tempos - maximo[anterior] <= janela)
+    perto_seguinte = (seguinte >= 0) & (minimo[seguinte] - tempos <= janela)
+    marcados[repetidos] = mesmo_balde | perto_anterior | perto_seguinte
+    return marcados
+
+
+def duplicados(df, tempos):
+    chave = df[["Fornecedor", "Departamento", "Categoria"]].assign(
+        Centavos=np.round(df["Valor"].to_numpy() * 100).astype(np.int64)
+    )
+    return vizinho_na_janela(_codigos(chave, list(chave.columns)), tempos, JANELA_DUPLICADO_S)
+
+
+def fracionados(df, tempos):
+    valor = df["Valor"].to_numpy()
+    candidatos = np.flatnonzero((valor >= FRACAO_ALCADA * ALCADA) & (valor < ALCADA))
+    marcados = np.zeros(len(df), dtype=bool)
+    if not len(candidatos):
+        return marcados
+    sub = df.iloc[candidatos]
+    grupo = _codigos(sub.assign(Dia=tempos[candidatos] // 86_400), ["Fornecedor", "Departamento", "Dia"])
+    contagem = np.bincount(grupo)
+    soma = np.bincount(grupo, weights=valor[candidatos])
+    marcados[candidatos] = (contagem[grupo] >= 2) & (soma[grupo] > ALCADA)
+    return marcados
+
+
+def redondos(df):
+    centavos = np.round(df["Valor"].to_numpy() * 100).astype(np.int64)
+    return (centavos % (MULTIPLO_REDONDO * 100) == 0) & (centavos >= VALOR_REDONDO_MIN * 100)
+
+
+def fora_expediente(df, tempos):
+    departamento = df["Departamento"].cat.codes.to_numpy().astype(np.int64)
+    hora = (tempos // 3600) % 24
+    n_departamentos = len(df["Departamento"].cat.categories)
+    perfil = np.bincount(departamento * 24 + hora, minlength=24 * n_departamentos).reshape(-1, 24)
+    total = perfil.sum(axis=1, keepdims=True)
+    raro = (perfil < FRACAO_HORARIO * total / 24) & (total >= MIN_LANCAMENTOS_HORARIO)
+    return raro[departamento, hora]
+
+
+def primeiro_digito(valor):
+    valor = np.abs(np.asarray(valor, dtype=np.float64))
+    digito = np.zeros(len(valor), dtype=np.int64)
+    positivos = valor >= 1
+    v = valor[positivos]
+    digito[positivos] = (v // 10 ** np.floor(np.log10(v))).astype(np.int64)
+    return np.clip(digito, 0, 9)  # 0 = valor sem dígito significativo (< R$ 1)
+
+
+def benford(df):
+    """
+    (marcados, tabela por departamento): MAD do primeiro dígito contra a Lei de Benford e
+    os dígitos em excesso (teste z) dos departamentos não conformes.
+    """
+    departamento = df["Departamento"].cat.codes.to_numpy().astype(np.int64)
+    nomes = df["Departamento"].cat.categories
+    valor = df["Valor"].to_numpy()
+    digito = primeiro_digito(valor)
+    validos = digito > 0
+    contagem = np.bincount(departamento[validos] * 9 + digito[validos] - 1,
+                           minlength=9 * len(nomes)).reshape(-1, 9)
+    n = contagem.sum(axis=1)
+    observado = contagem / np.maximum(n, 1)[:, None]
+    mad = np.abs(observado - BENFORD_ESPERADO).mean(axis=1)
+    # Z de Nigrini (com correção de continuidade) por dígito
+    erro = np.sqrt(BENFORD_ESPERADO * (1 - BENFORD_ESPERADO) / np.maximum(n, 1)[:, None])
+    z = (np.abs(observado - BENFORD_ESPERADO) - 1 / (2 * np.maximum(n, 1)[:, None])) / erro
+    excesso = (observado > BENFORD_ESPERADO) & (z > Z_EXCESSO)
+
+    # Benford só vale para valores que cobrem algumas ordens de grandeza
+    ordens = np.zeros(len(nomes))
+    amostra = pd.DataFrame({"d": departamento[validos], "v": valor[validos]})
+    if len(amostra) > AMOSTRA_FAIXA:
+        amostra = amostra.sample(AMOSTRA_FAIXA, random_state=42)
+    faixa = amostra.groupby("d")["v"].quantile([0.01, 0.99]).unstack()
+    ordens[faixa.index] = np.log10(faixa[0.99] / faixa[0.01].clip(lower=1))
+    aplicavel = (n >= MIN_BENFORD) & (ordens >= ORDENS_MIN_BENFORD)
+    nao_conforme = aplicavel & (mad > MAD_NAO_CONFORME)
+
+    marcados = np.zeros(len(df), dtype=bool)
+    d = departamento[validos]
+    marcados[validos] = nao_conforme[d] & excesso[d, digito[validos] - 1]
+    tabela = pd.DataFrame({
+        "Departamento": nomes,
+        "Transacoes": n,
+        "Ordens_Grandeza": ordens.round(2),
+        "MAD": mad.round(4),
+        "Situacao": np.where(~aplicavel, "Não aplicável",
+                             np.where(nao_conforme, "Não conforme", "Conforme")),
+        "Digitos_Em_Excesso": [", ".join(str(i + 1) for i in np.flatnonzero(e)) if nc else ""
+                               for e, nc in zip(excesso, nao_conforme)],
+    })
+    return marcados, tabela
+
+
+def faixa_tipica(df, seed=42):
+    """True onde o valor está a até K desvios robustos da mediana do segmento (estimados numa amostra)."""
+    codigos = _codigos(df, SEGMENTOS)
+    valor = df["Valor"].to_numpy()
+    amostra = np.arange(len(df))
+    if len(amostra) > AMOSTRA_FAIXA:
+        amostra = np.random.default_rng(seed).choice(len(df), AMOSTRA_FAIXA, replace=False)
+    amostra = pd.DataFrame({"c": codigos[amostra], "v": valor[amostra]})
+    mediana = amostra.groupby("c")["v"].median()
+    desvio = (amostra["v"] - amostra["c"].map(mediana)).abs().groupby(amostra["c"]).median() * 1.4826
+    m = np.full(codigos.max() + 1, np.nan)
+    s = np.full(codigos.max() + 1, np.nan)
+    m[mediana.index] = mediana.to_numpy()
+    s[desvio.index] = desvio.to_numpy()
+    # Segmentos fora da amostra ficam sem faixa (NaN): vão para o residual
+    return np.abs(valor - m[codigos]) <= K_FAIXA * s[codigos]
+
+
+@dataclass
+class ResultadoRegras:
+    motivos: np.ndarray   # uint8 por transação, bits de MOTIVOS
+    tipica: np.ndarray    # bool: valor dentro da faixa típica do segmento
+    benford: pd.DataFrame
+    segundos: float
+
+    @property
+    def conclusivo(self):
+        return (self.motivos & MASCARA_CONCLUSIVA) != 0
+
+    @property
+    def normal(self):
+        """Decididas como normais pelas regras: sem nenhum motivo e com valor típico."""
+        return (self.motivos == 0) & self.tipica
+
+    @property
+    def residual(self):
+        """Ambíguas: nem achado conclusivo nem normal decidido (vão para o modelo)."""
+        return ~self.conclusivo & ~self.normal
+
+    def resumo(self):
+        return pd.DataFrame({
+            "Motivo": [m[0] for m in MOTIVOS],
+            "Tipo": ["Conclusivo" if m[2] else "Indicativo" for m in MOTIVOS],
+            "Transacoes": [int(np.count_nonzero(self.motivos & m[1])) for m in MOTIVOS],
+            "Descricao": [m[3] for m in MOTIVOS],
+        })
+
+    def texto(self, posicoes):
+        """Motivos legíveis das transações em `posicoes` (achados do modelo aparecem como ISOLATION_FOREST)."""
+        tabela = []
+        for mascara in range(1 << len(MOTIVOS)):
+            codigos = [m[0] for m in MOTIVOS if mascara & m[1]]
+            if not mascara & MASCARA_CONCLUSIVA:
+                codigos.insert(0, MOTIVO_MODELO)
+            tabela.append(", ".join(codigos))
+        return np.array(tabela, dtype=object)[self.motivos[posicoes]]
+
+
+def aplicar_regras(df):
+    """Roda todas as regras sobre as transações (colunas do gerador de `portfolio.sintetico`)."""
+    inicio = time.perf_counter()
+    tempos = _segundos(df)
+    motivos = np.zeros(len(df), dtype=np.uint8)
+    motivos[duplicados(df, tempos)] |= BITS["DUPLICADO"]
+    motivos[fracionados(df, tempos)] |= BITS["FRACIONADO"]
+    motivos[redondos(df)] |= BITS["VALOR_REDONDO"]
+    motivos[fora_expediente(df, tempos)] |= BITS["FORA_EXPEDIENTE"]
+    marcados_benford, tabela_benford = benford(df)
+    motivos[marcados_benford] |= BITS["BENFORD"]
+    return ResultadoRegras(motivos, faixa_tipica(df), tabela_benford, time.perf_counter() - inicio)
+
+
+def marcar_achados(df, regras):
+    """Achados conclusivos das regras viram anomalias em `df` (após `detectar_anomalias`)."""
+    conclusivo = regras.conclusivo
+    df['Anomaly_Score'] = np.where(conclusivo, -1, df['Anomaly_Score'].to_numpy())
+    df['Status'] = np.where(conclusivo, STATUS_ANOMALIA, df['Status'].to_numpy())
+    return df
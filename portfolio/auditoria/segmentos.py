@@ -0,0 +1,163 @@
+"""
+Detecção de anomalias multivariada e segmentada (Departamento x Categoria).
+
+Cada segmento tem o próprio Isolation Forest, ajustado sobre valor, horário e
+dia da semana: um gasto de R$ 3.000 pode ser comum em Viagem/Vendas e raro em
+Material de Escritório/RH. Segmentos pequenos demais usam um modelo global que
+também recebe os códigos das categorias. Os ajustes (e a pontuação de bases
+grandes) rodam em um pool de processos, com vários segmentos por tarefa.
+
+Os scores de todos os modelos estão na mesma escala (o `score_samples` é
+normalizado pelo tamanho da amostra de cada árvore), então um único limiar
+por quantil continua valendo para a base inteira.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from portfolio.auditoria.modelo import STATUS_ANOMALIA, ajustar_floresta
+from portfolio.sintetico import CATEGORIAS_DESPESA, DEPARTAMENTOS
+
+SEGMENTOS = ["Departamento", "Categoria"]
+FEATURES = ["Log_Valor", "Hora_Sen", "Hora_Cos", "Dia_Semana", "Cod_Departamento", "Cod_Categoria"]
+# Dentro de um segmento os códigos são constantes: só o modelo global os usa
+FEATURES_SEGMENTO = FEATURES[:4]
+
+GLOBAL = "__global__"
+
+
+def montar_features(df):
+    """
+    Matriz float32 com valor (log), hora do dia (cíclica), dia da semana e códigos das categorias.
+    Os códigos vêm dos vocabulários fixos (não das categorias presentes em `df`), então são os mesmos
+    no ajuste e na pontuação, qualquer que seja o dtype da coluna; valores desconhecidos viram -1.
+    """
+    data = pd.to_datetime(df["Data"])
+    hora = (data.dt.hour + data.dt.minute / 60).to_numpy(dtype=np.float32)
+    angulo = 2 * np.pi * hora / 24
+    return np.column_stack([
+        np.log1p(np.clip(df["Valor"].to_numpy(dtype=np.float32), 0, None)),
+        np.sin(angulo),
+        np.cos(angulo),
+        data.dt.dayofweek.to_numpy(dtype=np.float32),
+        pd.Categorical(df["Departamento"], categories=DEPARTAMENTOS).codes.astype(np.float32),
+        pd.Categorical(df["Categoria"], categories=CATEGORIAS_DESPESA).codes.astype(np.float32),
+    ]).astype(np.float32)
+
+
+def _grupos(tarefas, n_grupos):
+    """Distribui as tarefas (..., X) em `n_grupos` listas com número de linhas parecido (maiores primeiro)."""
+    grupos = [[] for _ in range(n_grupos)]
+    cargas = np.zeros(n_grupos)
+    for tarefa in sorted(tarefas, key=lambda t: -len(t[-1])):
+        i = int(np.argmin(cargas))
+        grupos[i].append(tarefa)
+        cargas[i] += len(tarefa[-1])
+    return [g for g in grupos if g]
+
+
+# --- Execução nos processos do pool ---
+def _ajustar_grupo(itens, random_state, params):
+    return [(chave, ajustar_floresta(X, random_state=random_state, **params)) for chave, X in itens]
+
+
+_MODELOS = None
+
+
+def _iniciar_processo(modelos):
+    global _MODELOS
+    _MODELOS = modelos
+
+
+def _pontuar_grupo(itens, modelos=None):
+    modelos = modelos or _MODELOS
+    return [(chave, posicoes, modelos[chave].score_samples(X)) for chave, posicoes, X in itens]
+
+
+class MotorSegmentado:
+    """
+    Um Isolation Forest por segmento (Departamento, Categoria) e um global de reserva.
+
+    `max_treino` limita as linhas enviadas a cada ajuste: cada árvore usa no
+    máximo 256 amostras, então uma amostra aleatória grande basta e evita
+    copiar milhões de linhas para os processos.
+    """
+
+    def __init__(self, min_amostras=200, max_treino=100_000, n_jobs=-1, random_state=42, **params):
+        self.min_amostras = min_amostras
+        self.max_treino = max_treino
+        self.n_jobs = os.cpu_count() if n_jobs in (None, -1) else max(1, n_jobs)
+        self.random_state = random_state
+        self.params = params
+        self.modelos = {}
+
+    def _amostra(self, X, rng):
+        if len(X) <= self.max_treino:
+            return X
+        return X[np.sort(rng.choice(len(X), self.max_treino, replace=False))]
+
+    def _executar(self, funcao, grupos, **kwargs):
+        if self.n_jobs == 1 or len(grupos) == 1:
+            return [r for g in grupos for r in funcao(g, **kwargs)]
+        with ProcessPoolExecutor(min(self.n_jobs, len(grupos))) as pool:
+            futuros = [pool.submit(funcao, g, **kwargs) for g in grupos]
+            return [r for f in futuros for r in f.result()]
+
+    def fit(self, df):
+        rng = np.random.default_rng(self.random_state)
+        X = montar_features(df)
+        tarefas = [(GLOBAL, self._amostra(X, rng))]
+        for chave, posicoes in df.groupby(SEGMENTOS, observed=True).indices.items():
+            if len(posicoes) >= self.min_amostras:
+                tarefas.append((chave, self._amostra(X[posicoes][:, :len(FEATURES_SEGMENTO)], rng)))
+
+        # O paralelismo vem do pool: cada floresta usa 1 núcleo
+        params = {**self.params, "n_jobs": 1}
+        grupos = _grupos(tarefas, self.n_jobs * 4)
+        self.modelos = dict(self._executar(_ajustar_grupo, grupos, random_state=self.random_state, params=params))
+        return self
+
+    @property
+    def n_segmentos(self):
+        return len(self.modelos) - (GLOBAL in self.modelos)
+
+    def pontuar(self, df, tamanho_tarefa=200_000):
+        """Scores de isolamento (menor = mais anômalo), cada transação no modelo do seu segmento."""
+        X = montar_features(df)
+        itens = []
+        reserva = []
+        for chave, posicoes in df.groupby(SEGMENTOS, observed=True).indices.items():
+            if chave in self.modelos:
+                for inicio in range(0, len(posicoes), tamanho_tarefa):
+                    p = posicoes[inicio:inicio + tamanho_tarefa]
+                    itens.append((chave, p, X[p][:, :len(FEATURES_SEGMENTO)]))
+            else:
+                reserva.append(posicoes)
+        if reserva:
+            posicoes = np.concatenate(reserva)
+            for inicio in range(0, len(posicoes), tamanho_tarefa):
+                p = posicoes[inicio:inicio + tamanho_tarefa]
+                itens.append((GLOBAL, p, X[p]))
+
+        scores = np.empty(len(df))
+        if self.n_jobs == 1 or len(df) <= tamanho_tarefa:
+            resultados = _pontuar_grupo(itens, self.modelos)
+        else:
+            grupos = _grupos(itens, self.n_jobs * 2)
+            with ProcessPoolExecutor(min(self.n_jobs, len(grupos)), initializer=_iniciar_processo,
+                                     initargs=(self.modelos,)) as pool:
+                resultados = [r for f in [pool.submit(_pontuar_grupo, g) for g in grupos] for r in f.result()]
+        for _, posicoes, s in resultados:
+            scores[posicoes] = s
+        return scores
+
+    def resumo(self, df, scores, status):
+        """Transações, anomalias e score médio por segmento."""
+        return (
+            df[SEGMENTOS].assign(Score=scores, Anomalia=status == STATUS_ANOMALIA)
+            .groupby(SEGMENTOS, observed=True)
+            .agg(Transacoes=("Score", "size"), Anomalias=("Anomalia", "sum"), Score_Medio=("Score", "mean"))
+            .reset_index()
+        )
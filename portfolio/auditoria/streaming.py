@@ -0,0 +1,235 @@
+"""
+Auditoria contínua: pontuação de transações em micro-lotes.
+
+As transações chegam de uma fonte local (gerador sintético ou um CSV que
+cresce, lido como `tail -f`), são pontuadas por um Isolation Forest e geram
+alertas na hora. O modelo é reajustado periodicamente sobre uma janela
+deslizante de tamanho fixo (buffer circular), então a memória não cresce
+com o volume processado.
+
+Uso (linha de comando):
+    python -m portfolio.auditoria.streaming --lote 1000 --lotes 200
+    python -m portfolio.auditoria.streaming --arquivo transacoes.csv
+"""
+import argparse
+import io
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from portfolio import sintetico
+from portfolio.auditoria.modelo import ajustar_floresta, limiar_por_quantil
+
+FEATURES = ["Valor"]
+
+# O limiar do reajuste é estimado numa amostra da janela (evita pontuar a janela inteira)
+AMOSTRA_LIMIAR = 10_000
+
+
+# --- Fontes de transações ---
+def fonte_sintetica(tamanho_lote=1_000, n_lotes=None, seed=42, intervalo=0.0):
+    """Micro-lotes do gerador sintético, com numeração e datas contínuas (infinito se n_lotes=None)."""
+    sementes = np.random.SeedSequence(seed)
+    k = 0
+    while n_lotes is None or k < n_lotes:
+        yield sintetico.gerar_transacoes(
+            tamanho_lote, seed=sementes.spawn(1)[0], inicio=k * tamanho_lote, por_hora=max(1, tamanho_lote // 10)
+        )
+        k += 1
+        if intervalo:
+            time.sleep(intervalo)
+
+
+def fonte_arquivo(caminho, tamanho_lote=1_000, seguir=True, intervalo=0.2, parar=None):
+    """
+    Lê um CSV que está sendo escrito por outro processo (como `tail -f`).
+    Entrega micro-lotes de até `tamanho_lote` linhas completas; com `seguir=False`
+    termina no fim do arquivo. `parar()` (opcional) encerra a leitura.
+    """
+    with open(caminho, "r", encoding="utf-8") as f:
+        cabecalho = f.readline()
+        while not cabecalho:
+            if not seguir or (parar and parar()):
+                return
+            time.sleep(intervalo)
+            cabecalho = f.readline()
+        pendente = ""
+        linhas = []
+        while True:
+            trecho = f.readline()
+            if trecho:
+                pendente += trecho
+                if not pendente.endswith("\n"):
+                    continue  # Linha ainda sendo escrita
+                linhas.append(pendente)
+                pendente = ""
+                if len(linhas) < tamanho_lote:
+                    continue
+            if linhas:
+                lote = pd.read_csv(io.StringIO(cabecalho + "".join(linhas)), parse_dates=["Data"])
+                linhas = []
+                yield lote
+            elif not seguir or (parar and parar()):
+                return
+            else:
+                time.sleep(intervalo)
+
+
+class JanelaDeslizante:
+    """Buffer circular com as últimas `capacidade` linhas de features (memória fixa)."""
+
+    def __init__(self, capacidade, n_features):
+        self.dados = np.empty((capacidade, n_features))
+        self.capacidade = capacidade
+        self.posicao = 0
+        self.tamanho = 0
+
+    def adicionar(self, X):
+        X = X[-self.capacidade:]
+        n = len(X)
+        fim = self.posicao + n
+        if fim <= self.capacidade:
+            self.dados[self.posicao:fim] = X
+        else:
+            corte = self.capacidade - self.posicao
+            self.dados[self.posicao:] = X[:corte]
+            self.dados[: n - corte] = X[corte:]
+        self.posicao = fim % self.capacidade
+        self.tamanho = min(self.capacidade, self.tamanho + n)
+
+    def conteudo(self):
+        return self.dados[: self.tamanho] if self.tamanho < self.capacidade else self.dados
+
+
+@dataclass
+class ResultadoMicroLote:
+    linhas: int
+    alertas: pd.DataFrame
+    latencia_ms: float
+    reajustou: bool
+
+
+class MonitorContinuo:
+    """
+    Pontua micro-lotes e emite alertas. O modelo é (re)ajustado sobre a janela
+    deslizante a cada `reajuste_a_cada` lotes; o limiar é o quantil
+    `contaminacao` dos scores da própria janela no momento do ajuste.
+    """
+
+    def __init__(self, janela=50_000, reajuste_a_cada=20, contaminacao=0.03, min_treino=1_000,
+                 max_alertas=1_000, historico=1_000, random_state=42):
+        self.janela = JanelaDeslizante(janela, len(FEATURES))
+        self.reajuste_a_cada = reajuste_a_cada
+        self.contaminacao = contaminacao
+        self.min_treino = min_treino
+        self.random_state = random_state
+        self.modelo = None
+        self.limiar = None
+        self.lotes_desde_ajuste = 0
+        self.alertas = deque(maxlen=max_alertas)
+        self._sem_alertas = pd.DataFrame(columns=["Score"])  # colunas dos alertas antes do primeiro deles
+        self.latencias_ms = deque(maxlen=historico)
+        self.total_linhas = 0
+        self.total_alertas = 0
+        self.reajustes = 0
+        self.segundos_processando = 0.0
+        self.ultimo_reajuste_ms = 0.0
+        self._rng = np.random.default_rng(random_state)
+
+    def _reajustar(self):
+        inicio = time.perf_counter()
+        X = self.janela.conteudo()
+        self.modelo = ajustar_floresta(X, random_state=self.random_state)
+        amostra = X if len(X) <= AMOSTRA_LIMIAR else X[self._rng.choice(len(X), AMOSTRA_LIMIAR, replace=False)]
+        self.limiar = limiar_por_quantil(self.modelo.score_samples(amostra), self.contaminacao)
+        self.lotes_desde_ajuste = 0
+        self.reajustes += 1
+        self.ultimo_reajuste_ms = (time.perf_counter() - inicio) * 1000
+
+    def processar(self, lote):
+        inicio = time.perf_counter()
+        X = lote[FEATURES].to_numpy(dtype=float)
+
+        alertas = lote.iloc[0:0].assign(Score=np.empty(0))
+        self._sem_alertas = alertas
+        if self.modelo is not None:
+            scores = self.modelo.score_samples(X)
+            suspeitas = scores < self.limiar
+            if suspeitas.any():
+                alertas = lote[suspeitas].assign(Score=scores[suspeitas])
+                self.alertas.extend(alertas.to_dict("records"))
+                self.total_alertas += len(alertas)
+
+        self.janela.adicionar(X)
+        self.lotes_desde_ajuste += 1
+        reajustou = False
+        if self.janela.tamanho >= self.min_treino and (
+            self.modelo is None or self.lotes_desde_ajuste >= self.reajuste_a_cada
+        ):
+            self._reajustar()
+            reajustou = True
+
+        latencia = (time.perf_counter() - inicio) * 1000
+        self.latencias_ms.append(latencia)
+        self.total_linhas += len(lote)
+        self.segundos_processando += latencia / 1000
+        return ResultadoMicroLote(len(lote), alertas, latencia, reajustou)
+
+    def metricas(self):
+        latencias = np.asarray(self.latencias_ms)
+        return {
+            "transacoes": self.total_linhas,
+            "alertas": self.total_alertas,
+            "reajustes": self.reajustes,
+            "ultimo_reajuste_ms": self.ultimo_reajuste_ms,
+            "latencia_p50_ms": float(np.percentile(latencias, 50)) if len(latencias) else 0.0,
+            "latencia_p99_ms": float(np.percentile(latencias, 99)) if len(latencias) else 0.0,
+            "transacoes_por_segundo": self.total_linhas / self.segundos_processando if self.segundos_processando else 0.0,
+        }
+
+    def ultimos_alertas(self, n=20):
+        """Últimos `n` alertas (mais recente primeiro); sem alertas, um DataFrame vazio com as colunas do lote e o Score."""
+        recentes = list(self.alertas)[-n:][::-1]
+        return pd.DataFrame(recentes) if recentes else self._sem_alertas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auditoria contínua em micro-lotes (Isolation Forest).")
+    parser.add_argument("--arquivo", help="CSV acompanhado como 'tail -f' (padrão: gerador sintético)")
+    parser.add_argument("--lote", type=int, default=1_000, help="Transações por micro-lote")
+    parser.add_argument("--lotes", type=int, default=100, help="Micro-lotes do gerador sintético")
+    parser.add_argument("--janela", type=int, default=50_000, help="Tamanho da janela de treino")
+    parser.add_argument("--reajuste", type=int, default=20, help="Reajusta o modelo a cada N lotes")
+    parser.add_argument("--contaminacao", type=float, default=0.03)
+    args = parser.parse_args(argv)
+
+    if args.arquivo:
+        if not os.path.exists(args.arquivo):
+            parser.error(f"arquivo não encontrado: {args.arquivo}")
+        fonte = fonte_arquivo(args.arquivo, args.lote)
+    else:
+        fonte = fonte_sintetica(args.lote, args.lotes)
+
+    monitor = MonitorContinuo(args.janela, args.reajuste, args.contaminacao)
+    try:
+        for lote in fonte:
+            resultado = monitor.processar(lote)
+            for alerta in resultado.alertas.itertuples():
+                print(f"ALERTA {alerta.ID_Transacao} | {alerta.Departamento} | R$ {alerta.Valor:,.2f} | score {alerta.Score:.3f}")
+    except KeyboardInterrupt:
+        pass
+
+    m = monitor.metricas()
+    print(
+        f"{m['transacoes']:,} transações | {m['alertas']:,} alertas | {m['reajustes']} reajustes | "
+        f"latência p50 {m['latencia_p50_ms']:.1f} ms, p99 {m['latencia_p99_ms']:.1f} ms | "
+        f"{m['transacoes_por_segundo']:,.0f} transações/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
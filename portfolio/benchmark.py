@@ -0,0 +1,450 @@
+"""
+Benchmarks dos caminhos quentes dos dashboards, sem Streamlit, navegador ou rede.
+
+Cada caso prepara uma base sintética de n linhas (fora da medição) e chama uma
+função do núcleo `portfolio` - a mesma que a página usa. Para cada tamanho são
+registrados:
+
+- tempo de parede: a melhor de `repeticoes` execuções (uma só quando a primeira
+  passa de alguns segundos);
+- pico de memória: uma execução extra sob `tracemalloc`, separada das medições
+  de tempo para o rastreamento não distorcê-las.
+
+Os resultados vão para `<dados>/benchmarks/benchmark_<data>.json`. A execução
+anterior é a linha de base: tempos ou picos de memória acima dela além da
+tolerância (e de um piso de ruído) são marcados como regressão.
+
+Casos com custo superlinear (treino de modelos) têm teto de linhas próprio.
+
+Uso:
+    python -m portfolio.benchmark                                 # 1 mil a 10 milhões de linhas
+    python -m portfolio.benchmark --ate 100000 --casos kpi auditoria
+    python -m portfolio.benchmark --tolerancia 0.1 --falhar
+"""
+import argparse
+import atexit
+import functools
+import gc
+import glob
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from portfolio import sintetico
+from portfolio.armazenamento import DIRETORIO_PADRAO
+
+DIRETORIO_BENCHMARKS = os.path.join(DIRETORIO_PADRAO, "benchmarks")
+TAMANHOS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+TOLERANCIA = 0.20
+# Diferenças abaixo destes pisos são ruído de medição, não regressão
+PISO_SEGUNDOS = 0.005
+PISO_MB = 1.0
+# Acima deste tempo, a primeira execução já é a medida (sem repetições)
+LIMITE_REPETICAO_S = 5.0
+# Residual mínimo para conferir que a sensibilidade muda os rótulos (auditoria.rotulos_residuais)
+RESIDUAL_MIN_CONFERENCIA = 40
+
+
+@dataclass
+class Caso:
+    nome: str
+    preparar: object   # n -> função sem argumentos que é medida (a preparação fica fora da medição)
+    max_linhas: int = TAMANHOS[-1]
+
+
+# --- Bases sintéticas (memorizadas por tamanho: vários casos usam a mesma) ---
+
+@functools.lru_cache(maxsize=1)
+def _vendas(n):
+    return sintetico.gerar_vendas(n, seed=42, por_dia=max(1, n // 1000))
+
+
+@functools.lru_cache(maxsize=1)
+def _transacoes(n):
+    return sintetico.gerar_transacoes(n, seed=42, por_hora=max(1, n // 500))
+
+
+@functools.lru_cache(maxsize=1)
+def _floresta(n):
+    from portfolio.auditoria.modelo import ajustar_floresta
+
+    return ajustar_floresta(_transacoes(n)[["Valor"]])
+
+
+@functools.lru_cache(maxsize=1)
+def _geo(n):
+    return sintetico.gerar_dados_geo(n, 18, seed=42)
+
+
+_PASTA_TEMPORARIA = None
+
+
+def _pasta_temporaria():
+    # Uma pasta por execução, removida ao sair: o CSV de 10 milhões de linhas passa de 1 GB
+    global _PASTA_TEMPORARIA
+    if _PASTA_TEMPORARIA is None:
+        _PASTA_TEMPORARIA = tempfile.mkdtemp(prefix="benchmark_olist_")
+        atexit.register(shutil.rmtree, _PASTA_TEMPORARIA, ignore_errors=True)
+    return _PASTA_TEMPORARIA
+
+
+@functools.lru_cache(maxsize=1)
+def _csv_pedidos(n):
+    # CSV no layout da Olist numa pasta temporária (o pyarrow formata as datas como no arquivo original).
+    # Todo tamanho grava no mesmo caminho: só o CSV memorizado (o último) ocupa o disco
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    from portfolio.logistica.fonte import ARQUIVO_PEDIDOS
+
+    caminho = os.path.join(_pasta_temporaria(), ARQUIVO_PEDIDOS)
+    with pacsv.CSVWriter(caminho, pa.Schema.from_pandas(sintetico.gerar_pedidos_olist(0), preserve_index=False)) as escritor:
+        for df in sintetico.em_lotes(sintetico.gerar_pedidos_olist, n):
+            escritor.write_table(pa.Table.from_pandas(df, preserve_index=False))
+    return caminho
+
+
+@functools.lru_cache(maxsize=1)
+def _telco(n):
+    # Clientes da base Telco reamostrados (com reposição) até n linhas
+    from portfolio.churn.pipeline import alvo, carregar_telco
+
+    df = carregar_telco()
+    df = df.iloc[np.random.default_rng(42).integers(0, len(df), n)].reset_index(drop=True)
+    return df, alvo(df)
+
+
+@functools.lru_cache(maxsize=1)
+def _pipeline_churn():
+    # Modelo da página, ajustado na base original
+    from portfolio.churn.pipeline import COLUNA_ALVO, COLUNA_ID, PARAMS_PADRAO, PipelineChurn, alvo, carregar_telco
+
+    base = carregar_telco()
+    return PipelineChurn(**PARAMS_PADRAO).fit(base.drop(columns=[COLUNA_ID, COLUNA_ALVO]), alvo(base))
+
+
+# --- Casos ---
+
+def _geo_cobertura(n):
+    from portfolio.geo.cobertura import LIMIAR_PONTO_A_PONTO, RESOLUCAO_AGREGADA_KM, calcular_cobertura
+
+    df_pop, df_lojas = _geo(n)
+    resolucao = None if n <= LIMIAR_PONTO_A_PONTO else RESOLUCAO_AGREGADA_KM
+    return lambda: calcular_cobertura(df_pop, df_lojas, 1.5, resolucao_km=resolucao)
+
+
+def _geo_niveis(n):
+    from portfolio.geo.mapa import preparar_niveis
+
+    df_pop = _geo(n)[0][["Latitude", "Longitude", "Populacao", "Renda_Media"]]
+    return lambda: preparar_niveis(df_pop)
+
+
+def _auditoria_ajuste(n):
+    from portfolio.auditoria.modelo import ajustar_floresta
+
+    X = _transacoes(n)[["Valor"]]
+    return lambda: ajustar_floresta(X)
+
+
+def _auditoria_scores(n):
+    X = _transacoes(n)[["Valor"]]
+    modelo = _floresta(n)
+    return lambda: modelo.score_samples(X)
+
+
+def _auditoria_rotulos(n):
+    from portfolio.auditoria.modelo import detectar_anomalias
+
+    df = _transacoes(n)
+    scores = _floresta(n).score_samples(df[["Valor"]])
+    # Como na página: visão rasa da base compartilhada (sem copiar os buffers)
+    return lambda: detectar_anomalias(df.copy(deep=False), 0.03, scores)
+
+
+def _auditoria_regras(n):
+    from portfolio.auditoria.regras import aplicar_regras
+
+    df = _transacoes(n)
+    return lambda: aplicar_regras(df)
+
+
+def _auditoria_scores_residuais(n):
+    from portfolio.auditoria.regras import aplicar_regras
+
+    X = _transacoes(n)[["Valor"]]
+    residual = aplicar_regras(_transacoes(n)).residual
+    modelo = _floresta(n)
+    if not residual.any():
+        return lambda: np.empty(0)  # as regras decidiram todas as transações
+    return lambda: modelo.score_samples(X[residual])
+
+
+def _auditoria_rotulos_residuais(n):
+    from portfolio.auditoria.modelo import STATUS_ANOMALIA, detectar_anomalias
+    from portfolio.auditoria.regras import SCORE_DECIDIDO, aplicar_regras
+
+    df = _transacoes(n)
+    residual = aplicar_regras(df).residual
+    scores = np.full(len(df), SCORE_DECIDIDO)
+    if residual.any():
+        scores[residual] = _floresta(n).score_samples(df.loc[residual, ["Valor"]])
+
+    # Conferência: com o pré-filtro, a sensibilidade é a fração do residual e precisa mudar o resultado
+    # (a partir de RESIDUAL_MIN_CONFERENCIA linhas, 5% e 10% do residual já são quantidades diferentes)
+    marcadas = {c: int((detectar_anomalias(df.copy(deep=False), c, scores, residual)["Status"] == STATUS_ANOMALIA).sum())
+                for c in (0.05, 0.10)}
+    if residual.sum() >= RESIDUAL_MIN_CONFERENCIA and marcadas[0.05] >= marcadas[0.10]:
+        raise AssertionError(f"sensibilidade sem efeito no residual: {marcadas}")
+    return lambda: detectar_anomalias(df.copy(deep=False), 0.03, scores, residual)
+
+
+def _kpi_cubo(n):
+    from portfolio.kpi.cubo import CuboVendas
+
+    df = _vendas(n)
+    return lambda: CuboVendas.de_vendas(df)
+
+
+def _kpi_groupby(n):
+    # Caminho anterior ao cubo: agregação direto nas linhas de venda
+    df = _vendas(n)
+    return lambda: df.groupby("Região", observed=True)[["Vendas", "Lucro"]].sum()
+
+
+def _kpi_consulta(n):
+    from portfolio.kpi.cubo import CuboVendas
+
+    cubo = CuboVendas.de_vendas(_vendas(n))
+    regioes = cubo.regioes[:3]
+    return lambda: (cubo.totais(regioes), cubo.por_dimensao("Região", regioes), cubo.por_dimensao("Categoria", regioes))
+
+
+def _kpi_anexar(n):
+    # Um dia novo de vendas entrando no cubo existente (sem reler as n linhas)
+    from portfolio.kpi.cubo import CuboVendas
+
+    cubo = CuboVendas.de_vendas(_vendas(n))
+    por_dia = max(1, n // 1000)
+    novo_dia = sintetico.gerar_vendas(por_dia, seed=7, inicio=n, por_dia=por_dia)
+    return lambda: cubo.anexar([novo_dia])
+
+
+def _kpi_series(n):
+    from portfolio.kpi.cubo import CuboVendas
+    from portfolio.kpi.series import JANELAS, SerieKPI
+
+    cubo = CuboVendas.de_vendas(_vendas(n))
+
+    def executar():
+        serie = SerieKPI.de_cubo(cubo, cubo.regioes[:3])
+        return [serie.periodo_anterior(j) for j in JANELAS], serie.mes_anterior_ate_hoje(), serie.movel(JANELAS)
+
+    return executar
+
+
+def _logistica_leitura(n):
+    from portfolio.logistica.fonte import ARQUIVO_PEDIDOS, ler_csv, preparar_pedidos
+
+    caminho = _csv_pedidos(n)
+    return lambda: preparar_pedidos(ler_csv(caminho, ARQUIVO_PEDIDOS))
+
+
+def _logistica_estatisticas(n):
+    from portfolio.logistica.estatisticas import EstatisticasLeadTime
+    from portfolio.logistica.fonte import preparar_pedidos
+
+    pedidos = pd.concat(
+        [preparar_pedidos(df)[["Dias_Entrega", "Status_Prazo", "Ano"]] for df in sintetico.em_lotes(sintetico.gerar_pedidos_olist, n)],
+        ignore_index=True,
+    )
+    lotes = [pedidos.iloc[i:i + 500_000] for i in range(0, len(pedidos), 500_000)]
+    return lambda: EstatisticasLeadTime.de_lotes(lotes)
+
+
+def _churn_treino(n):
+    from portfolio.churn.pipeline import COLUNA_ALVO, COLUNA_ID, PARAMS_PADRAO, PipelineChurn
+
+    df, y = _telco(n)
+    X = df.drop(columns=[COLUNA_ID, COLUNA_ALVO])
+    return lambda: PipelineChurn(**PARAMS_PADRAO).fit(X, y)
+
+
+def _churn_predicao(n):
+    from portfolio.churn.pipeline import COLUNA_ALVO, COLUNA_ID
+
+    pipeline = _pipeline_churn()
+    X = _telco(n)[0].drop(columns=[COLUNA_ID, COLUNA_ALVO])
+    return lambda: pipeline.prever_proba(X)
+
+
+CASOS = {caso.nome: caso for caso in [
+    Caso("geo.gerar", lambda n: lambda: sintetico.gerar_dados_geo(n, 18, seed=42)),
+    Caso("geo.cobertura", _geo_cobertura),
+    Caso("geo.niveis_mapa", _geo_niveis),
+    Caso("auditoria.gerar", lambda n: lambda: sintetico.gerar_transacoes(n, seed=42, por_hora=max(1, n // 500))),
+    Caso("auditoria.ajuste", _auditoria_ajuste),
+    Caso("auditoria.scores", _auditoria_scores),
+    Caso("auditoria.rotulos", _auditoria_rotulos),
+    Caso("auditoria.regras", _auditoria_regras),
+    Caso("auditoria.scores_residuais", _auditoria_scores_residuais),
+    Caso("auditoria.rotulos_residuais", _auditoria_rotulos_residuais),
+    Caso("kpi.gerar", lambda n: lambda: sintetico.gerar_vendas(n, seed=42, por_dia=max(1, n // 1000))),
+    Caso("kpi.cubo", _kpi_cubo),
+    Caso("kpi.groupby_linhas", _kpi_groupby),
+    Caso("kpi.consulta_cubo", _kpi_consulta),
+    Caso("kpi.anexar_dia", _kpi_anexar),
+    Caso("kpi.series", _kpi_series),
+    Caso("logistica.leitura_csv", _logistica_leitura),
+    Caso("logistica.estatisticas", _logistica_estatisticas),
+    Caso("churn.treino", _churn_treino, max_linhas=1_000_000),
+    Caso("churn.predicao", _churn_predicao, max_linhas=1_000_000),
+]}
+
+
+def selecionar(nomes):
+    """Casos pelo nome exato ou pelo projeto (prefixo antes do ponto), na ordem de `CASOS`."""
+    return [caso for caso in CASOS if caso in nomes or caso.split(".")[0] in nomes]
+
+
+def medir(caso, n, repeticoes=3):
+    """{'caso', 'linhas', 'segundos', 'pico_mb'} de `caso` com n linhas."""
+    executar = caso.preparar(n)
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        executar()
+        tempos.append(time.perf_counter() - inicio)
+        if tempos[-1] > LIMITE_REPETICAO_S:
+            break
+    gc.collect()
+    tracemalloc.start()
+    try:
+        executar()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"caso": caso.nome, "linhas": n, "segundos": min(tempos), "pico_mb": pico / 2**20}
+
+
+def rodar(casos=None, tamanhos=TAMANHOS, repeticoes=3, progresso=None):
+    """Mede os casos (todos, por padrão) em cada tamanho até o teto de linhas de cada um."""
+    resultados = []
+    for nome in casos or list(CASOS):
+        caso = CASOS[nome]
+        for n in tamanhos:
+            if n > caso.max_linhas:
+                continue
+            resultados.append(medir(caso, n, repeticoes))
+            if progresso:
+                progresso(resultados[-1])
+    return resultados
+
+
+def gravar(resultados, diretorio=DIRETORIO_BENCHMARKS):
+    os.makedirs(diretorio, exist_ok=True)
+    agora = datetime.now()
+    caminho = os.path.join(diretorio, f"benchmark_{agora:%Y%m%d_%H%M%S}.json")
+    conteudo = {
+        "criado_em": agora.isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "versoes": {"numpy": np.__version__, "pandas": pd.__version__},
+        "resultados": resultados,
+    }
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(conteudo, f, indent=2, ensure_ascii=False)
+    return caminho
+
+
+def ultima_linha_de_base(diretorio=DIRETORIO_BENCHMARKS, exceto=None):
+    """Caminho do JSON mais recente da pasta (ignorando `exceto`), ou None."""
+    arquivos = sorted(glob.glob(os.path.join(diretorio, "benchmark_*.json")))
+    arquivos = [a for a in arquivos if exceto is None or os.path.abspath(a) != os.path.abspath(exceto)]
+    return arquivos[-1] if arquivos else None
+
+
+def ler_linha_de_base(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)["resultados"]
+
+
+def comparar(resultados, base, tolerancia=TOLERANCIA):
+    """
+    DataFrame com cada medida, a da linha de base (mesmo caso e tamanho) e a situação:
+    'novo' (sem base), 'regressão' (tempo ou memória acima da tolerância) ou 'ok'.
+    """
+    anteriores = {(r["caso"], r["linhas"]): r for r in base or []}
+    linhas = []
+    for r in resultados:
+        antes = anteriores.get((r["caso"], r["linhas"]))
+        linha = {
+            "Caso": r["caso"], "Linhas": r["linhas"],
+            "Tempo (ms)": r["segundos"] * 1000, "Pico (MB)": r["pico_mb"],
+            "Base (ms)": np.nan, "Base (MB)": np.nan, "Δ Tempo (%)": np.nan, "Δ Memória (%)": np.nan, "Situação": "novo",
+        }
+        if antes is not None:
+            mais_lento = r["segundos"] > antes["segundos"] * (1 + tolerancia) and r["segundos"] - antes["segundos"] > PISO_SEGUNDOS
+            mais_memoria = r["pico_mb"] > antes["pico_mb"] * (1 + tolerancia) and r["pico_mb"] - antes["pico_mb"] > PISO_MB
+            linha.update({
+                "Base (ms)": antes["segundos"] * 1000, "Base (MB)": antes["pico_mb"],
+                "Δ Tempo (%)": 100 * (r["segundos"] / antes["segundos"] - 1) if antes["segundos"] else np.nan,
+                "Δ Memória (%)": 100 * (r["pico_mb"] / antes["pico_mb"] - 1) if antes["pico_mb"] else np.nan,
+                "Situação": "regressão" if mais_lento or mais_memoria else "ok",
+            })
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos de dados e modelos dos dashboards.")
+    parser.add_argument("--casos", nargs="+", metavar="CASO",
+                        help=f"Casos medidos (padrão: todos) ou projetos inteiros ('kpi'). Casos: {', '.join(CASOS)}")
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=TAMANHOS, help="Linhas de cada medição")
+    parser.add_argument("--ate", type=int, help="Ignora os tamanhos acima deste valor")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções por medição (vale a melhor)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Piora relativa aceita antes de marcar regressão")
+    parser.add_argument("--linha-de-base", help="JSON de comparação (padrão: a execução anterior)")
+    parser.add_argument("--diretorio", default=DIRETORIO_BENCHMARKS, help="Pasta dos resultados em JSON")
+    parser.add_argument("--nao-gravar", action="store_true", help="Só compara, sem gravar esta execução")
+    parser.add_argument("--falhar", action="store_true", help="Código de saída 1 se houver regressão")
+    args = parser.parse_args(argv)
+
+    casos = selecionar(args.casos) if args.casos else list(CASOS)
+    if not casos:
+        parser.error(f"nenhum caso corresponde a {args.casos}")
+    tamanhos = sorted(n for n in args.tamanhos if args.ate is None or n <= args.ate)
+    base = args.linha_de_base or ultima_linha_de_base(args.diretorio)
+
+    def mostrar(r):
+        print(f"{r['caso']:<24} {r['linhas']:>12,} linhas {r['segundos'] * 1000:>12.1f} ms {r['pico_mb']:>10.1f} MB", flush=True)
+
+    resultados = rodar(casos, tamanhos, args.repeticoes, progresso=mostrar)
+    tabela = comparar(resultados, ler_linha_de_base(base) if base else None, args.tolerancia)
+    print()
+    print(f"Linha de base: {base or '(nenhuma)'}")
+    print(tabela.to_string(index=False, float_format=lambda v: f"{v:,.2f}", na_rep="-"))
+    if not args.nao_gravar:
+        print(f"\nResultados gravados em {gravar(resultados, args.diretorio)}")
+
+    regressoes = tabela[tabela["Situação"] == "regressão"]
+    if len(regressoes):
+        print(f"\n{len(regressoes)} regressão(ões): {', '.join(f'{c} ({n:,})' for c, n in zip(regressoes['Caso'], regressoes['Linhas']))}")
+        if args.falhar:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
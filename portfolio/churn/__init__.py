@@ -0,0 +1 @@
+"""Pipeline de dados e modelo do projeto de Predição de Churn (base Telco)."""
@@ -0,0 +1,330 @@
+"""
+Busca de hiperparâmetros do modelo de churn (validação cruzada + successive halving).
+
+A base é codificada uma única vez (`codificar`) e as dobras estratificadas são
+guardadas como índices sobre essa matriz: nenhuma avaliação refaz a engenharia
+de features. Cada rodada avalia os candidatos sobreviventes em todas as dobras
+com um orçamento de linhas de treino; só a melhor fração (1/`fator`) passa
+para a rodada seguinte, que treina com `fator` vezes mais linhas. A última
+rodada usa as dobras completas. O modelo servido hoje e o padrão (`manter`) não
+são eliminados: chegam à última rodada e são comparados com o mesmo orçamento.
+
+Os pares (candidato, dobra) rodam em paralelo em todos os núcleos (joblib; a
+matriz vai aos processos por memmap, sem cópia por tarefa) e cada floresta usa
+um único núcleo. Para cada ajuste ficam registrados AUC, tempo de treino e
+latência de inferência (por linha em lote e de um cliente isolado).
+
+O vencedor (maior AUC média da última rodada) só é promovido se a busca chegou
+às dobras completas e ele supera a AUC do modelo servido: é treinado na base
+inteira, salvo no registro de modelos e a página de churn passa a servi-lo
+(`params_modelo`). O relatório completo vai para `modelos/churn_telco/buscas/`.
+
+Uso (linha de comando):
+    python -m portfolio.churn.busca --candidatos 24 --folds 5 --tempo-max 600 --jobs -1
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from portfolio.churn.pipeline import (
+    CAMINHO_TELCO, COLUNA_ALVO, COLUNA_ID, NOME_MODELO, PARAMS_PADRAO, PipelineChurn, alvo, codificar, params_modelo,
+)
+
+# Espaço de busca (amostrado sem reposição) e parâmetros fixos de todos os candidatos
+ESPACO = {
+    "n_estimators": [50, 100, 200, 400],
+    "max_depth": [None, 8, 12, 16],
+    "min_samples_leaf": [1, 3, 5, 10, 20],
+    "max_features": ["sqrt", 0.3, 0.5],
+    "class_weight": [None, "balanced"],
+}
+FIXOS = {"random_state": 42}
+MIN_LINHAS = 500          # orçamento mínimo de linhas de treino na primeira rodada
+REPETICOES_LATENCIA = 5   # previsões de um cliente isolado (vale a mediana)
+
+
+@dataclass
+class Dobras:
+    """Matriz já codificada e índices (treino embaralhado, validação) de cada dobra."""
+    X: np.ndarray
+    y: np.ndarray
+    treino: list
+    validacao: list
+
+    @property
+    def linhas_treino(self):
+        return min(len(t) for t in self.treino)
+
+
+def preparar_dobras(df, folds=5, seed=42):
+    """Codifica `df` (layout Telco, com Churn) uma vez e separa as dobras estratificadas."""
+    from sklearn.model_selection import StratifiedKFold
+
+    X, y = codificar(df), alvo(df)
+    rng = np.random.default_rng(seed)
+    treino, validacao = [], []
+    for tr, va in StratifiedKFold(folds, shuffle=True, random_state=seed).split(X, y):
+        # Treino embaralhado: o prefixo de `linhas` posições é uma amostra aleatória da dobra
+        treino.append(rng.permutation(tr))
+        validacao.append(va)
+    return Dobras(X, y, treino, validacao)
+
+
+def sortear_candidatos(n, seed=42, incluir=()):
+    """`n` combinações distintas do ESPACO; as de `incluir` (ex.: o modelo atual) entram primeiro."""
+    candidatos = []
+    for params in incluir:
+        params = {**FIXOS, **{k: v for k, v in params.items() if k != "n_jobs"}}
+        if params not in candidatos:
+            candidatos.append(params)
+    grade = list(itertools.product(*ESPACO.values()))
+    for i in np.random.default_rng(seed).permutation(len(grade)):
+        if len(candidatos) >= n:
+            break
+        params = {**FIXOS, **dict(zip(ESPACO, grade[i]))}
+        if params not in candidatos:
+            candidatos.append(params)
+    return candidatos[:max(n, len(incluir))]
+
+
+def plano_rodadas(n_candidatos, linhas_max, fator=3, min_linhas=MIN_LINHAS):
+    """Linhas de treino de cada rodada: cresce `fator` vezes até `linhas_max` na última."""
+    rodadas = 1 + int(math.floor(math.log(max(n_candidatos, 1), fator) + 1e-9))
+    linhas = [int(linhas_max / fator ** (rodadas - 1 - i)) for i in range(rodadas)]
+    # Rodadas com poucas linhas demais são fundidas no mínimo (menos eliminação às cegas)
+    return [max(min(linhas_max, min_linhas), v) for v in linhas]
+
+
+def _avaliar(X, y, treino, validacao, params, linhas):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import roc_auc_score
+
+    indices = treino[:linhas]
+    inicio = time.perf_counter()
+    modelo = RandomForestClassifier(**params, n_jobs=1).fit(X[indices], y[indices])
+    segundos_treino = time.perf_counter() - inicio
+
+    X_val = X[validacao]
+    inicio = time.perf_counter()
+    proba = modelo.predict_proba(X_val)[:, int(np.flatnonzero(modelo.classes_ == 1)[0])]
+    segundos_lote = time.perf_counter() - inicio
+
+    um = X_val[:1]
+    tempos = []
+    for _ in range(REPETICOES_LATENCIA):
+        inicio = time.perf_counter()
+        modelo.predict_proba(um)
+        tempos.append(time.perf_counter() - inicio)
+
+    return {
+        "auc": float(roc_auc_score(y[validacao], proba)),
+        "segundos_treino": segundos_treino,
+        "latencia_us_linha": segundos_lote / len(validacao) * 1e6,
+        "latencia_ms_cliente": float(np.median(tempos)) * 1000,
+    }
+
+
+@dataclass
+class ResultadoBusca:
+    candidatos: list
+    execucoes: pd.DataFrame      # um registro por (rodada, candidato, dobra)
+    rodadas_concluidas: int
+    segundos: float
+    interrompida: bool = False   # o orçamento de tempo cortou rodadas do plano
+    plano: list = field(default_factory=list)
+
+    def ranking(self, rodada=None):
+        """Média por candidato na `rodada` (padrão: a última concluída), melhor AUC primeiro."""
+        rodada = self.rodadas_concluidas - 1 if rodada is None else rodada
+        df = self.execucoes[self.execucoes["rodada"] == rodada]
+        resumo = df.groupby("candidato").agg(
+            linhas=("linhas", "first"),
+            auc=("auc", "mean"),
+            auc_dp=("auc", "std"),
+            segundos_treino=("segundos_treino", "mean"),
+            latencia_us_linha=("latencia_us_linha", "mean"),
+            latencia_ms_cliente=("latencia_ms_cliente", "median"),
+        ).reset_index()
+        resumo["params"] = [json.dumps(self.candidatos[c], default=str) for c in resumo["candidato"]]
+        # Empate de AUC: vence o mais barato de treinar
+        return resumo.sort_values(["auc", "segundos_treino"], ascending=[False, True], ignore_index=True)
+
+    @property
+    def vencedor(self):
+        return self.candidatos[int(self.ranking()["candidato"].iloc[0])]
+
+    def impedimento(self, atual=0):
+        """
+        Motivo para não promover o vencedor no lugar do candidato `atual` (o modelo servido),
+        ou None: a busca precisa ter chegado às dobras completas e o vencedor precisa superar
+        a AUC do atual na mesma rodada.
+        """
+        if self.interrompida:
+            return (f"busca interrompida na rodada {self.rodadas_concluidas} de {len(self.plano)}: "
+                    "o vencedor não foi avaliado nas dobras completas")
+        ranking = self.ranking().set_index("candidato")
+        vencedor = int(ranking.index[0])
+        if vencedor == atual:
+            return "o modelo servido continua o melhor"
+        if atual not in ranking.index:
+            return "o modelo servido não chegou à última rodada"
+        if ranking.loc[vencedor, "auc"] <= ranking.loc[atual, "auc"]:
+            return f"AUC do vencedor ({ranking.loc[vencedor, 'auc']:.4f}) não supera a do modelo servido"
+        return None
+
+
+def buscar(dobras, candidatos, fator=3, tempo_max=None, n_jobs=-1, min_linhas=MIN_LINHAS, manter=(), progresso=print):
+    """
+    Successive halving sobre `candidatos` (dicts de hiperparâmetros da RandomForest).
+    Os índices de `manter` (ex.: o modelo servido) passam por todas as rodadas.
+    `tempo_max` (segundos) interrompe a busca entre rodadas quando a próxima não cabe
+    mais no orçamento (estimada pela duração da anterior); vale a última rodada concluída.
+    """
+    from joblib import Parallel, delayed
+
+    plano = plano_rodadas(len(candidatos), dobras.linhas_treino, fator, min_linhas)
+    vivos = list(range(len(candidatos)))
+    registros = []
+    inicio = time.perf_counter()
+    ultima_rodada = 0.0
+    concluidas = 0
+    interrompida = False
+
+    with Parallel(n_jobs=n_jobs) as paralelo:
+        for rodada, linhas in enumerate(plano):
+            decorrido = time.perf_counter() - inicio
+            if tempo_max is not None and concluidas and decorrido + ultima_rodada > tempo_max:
+                interrompida = True
+                break
+            inicio_rodada = time.perf_counter()
+            tarefas = [(c, f) for c in vivos for f in range(len(dobras.treino))]
+            resultados = paralelo(
+                delayed(_avaliar)(dobras.X, dobras.y, dobras.treino[f], dobras.validacao[f], candidatos[c], linhas)
+                for c, f in tarefas
+            )
+            registros += [{"rodada": rodada, "candidato": c, "dobra": f, "linhas": linhas, **r}
+                          for (c, f), r in zip(tarefas, resultados)]
+            ultima_rodada = time.perf_counter() - inicio_rodada
+            concluidas += 1
+
+            parcial = ResultadoBusca(candidatos, pd.DataFrame(registros), concluidas, 0.0)
+            ranking = parcial.ranking(rodada)
+            if progresso:
+                progresso(f"Rodada {rodada + 1}/{len(plano)}: {len(vivos)} candidatos x {len(dobras.treino)} dobras, "
+                          f"{linhas:,} linhas | melhor AUC {ranking['auc'].iloc[0]:.4f} | {ultima_rodada:.1f} s")
+            vivos = ranking["candidato"].head(max(1, math.ceil(len(vivos) / fator))).tolist()
+            vivos += [c for c in manter if c not in vivos]
+
+    return ResultadoBusca(candidatos, pd.DataFrame(registros), concluidas, time.perf_counter() - inicio,
+                          interrompida, plano)
+
+
+def promover(df, params, resultado, registro=None):
+    """Treina o vencedor na base inteira, salva no registro e o marca como modelo servido."""
+    from portfolio.registro import RegistroModelos, calcular_chave
+
+    registro = registro or RegistroModelos()
+    params = {**params, "n_jobs": -1}
+    X = df.drop(columns=[COLUNA_ID, COLUNA_ALVO], errors="ignore")
+    y = alvo(df)
+    chave = calcular_chave(X, y, params)
+
+    inicio = time.perf_counter()
+    modelo = PipelineChurn(**params).fit(X, y)
+    segundos = time.perf_counter() - inicio
+    melhor = resultado.ranking().iloc[0]
+    metricas = {
+        "auc_cv": round(float(melhor["auc"]), 5),
+        "auc_cv_dp": round(float(melhor["auc_dp"]), 5) if pd.notna(melhor["auc_dp"]) else None,
+        "latencia_ms_cliente": round(float(melhor["latencia_ms_cliente"]), 3),
+    }
+    metadados = {
+        "params": params,
+        "n_linhas": int(len(X)),
+        "segundos_treino": round(segundos, 4),
+        "criado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+        **metricas,
+    }
+    caminho = registro.salvar(NOME_MODELO, chave, modelo, metadados)
+    registro.promover(NOME_MODELO, chave, params, metricas)
+    return chave, caminho
+
+
+def gravar_relatorio(resultado, configuracao, diretorio):
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, f"busca_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    relatorio = {
+        "configuracao": configuracao,
+        "plano_linhas": resultado.plano,
+        "rodadas_concluidas": resultado.rodadas_concluidas,
+        "interrompida": resultado.interrompida,
+        "segundos": round(resultado.segundos, 2),
+        "candidatos": resultado.candidatos,
+        "vencedor": resultado.vencedor,
+        "ranking": resultado.ranking().to_dict(orient="records"),
+        "execucoes": resultado.execucoes.to_dict(orient="records"),
+    }
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2, default=str)
+    return caminho
+
+
+def _ler_base(caminho):
+    from portfolio.churn.lote import ler_em_lotes
+
+    return pd.concat(ler_em_lotes(caminho), ignore_index=True)
+
+
+def main(argv=None):
+    from portfolio.registro import RegistroModelos
+
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros do modelo de churn (CV + successive halving).")
+    parser.add_argument("--arquivo", default=CAMINHO_TELCO, help="Base de treino (.csv ou .parquet, layout Telco com Churn)")
+    parser.add_argument("--candidatos", type=int, default=24, help="Combinações avaliadas na primeira rodada")
+    parser.add_argument("--folds", type=int, default=5, help="Dobras da validação cruzada")
+    parser.add_argument("--fator", type=int, default=3, help="Fator de eliminação e de crescimento das linhas por rodada")
+    parser.add_argument("--tempo-max", type=float, help="Orçamento de tempo (s): não começa rodadas que não cabem nele")
+    parser.add_argument("--jobs", type=int, default=-1, help="Ajustes em paralelo (-1 = todos os núcleos)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--nao-promover", action="store_true", help="Só avalia: não treina nem promove o vencedor")
+    args = parser.parse_args(argv)
+
+    registro = RegistroModelos()
+    inicio = time.perf_counter()
+    df = _ler_base(args.arquivo)
+    dobras = preparar_dobras(df, args.folds, args.seed)
+    print(f"Base: {len(df):,} linhas, {dobras.X.shape[1]} features | codificação + dobras: {time.perf_counter() - inicio:.2f} s")
+
+    # O modelo servido hoje (candidato 0) e o padrão chegam à última rodada: a promoção os compara
+    # com o vencedor no mesmo orçamento de linhas
+    atuais = sortear_candidatos(0, incluir=[params_modelo(registro), PARAMS_PADRAO])
+    candidatos = sortear_candidatos(args.candidatos, args.seed, incluir=atuais)
+    resultado = buscar(dobras, candidatos, args.fator, args.tempo_max, args.jobs, manter=range(len(atuais)))
+
+    ranking = resultado.ranking()
+    with pd.option_context("display.width", 200, "display.max_colwidth", 120):
+        print(ranking.drop(columns="candidato").head(10).round(4).to_string(index=False))
+    if resultado.interrompida:
+        print(f"Orçamento de tempo atingido: {resultado.rodadas_concluidas} de {len(resultado.plano)} rodadas.")
+
+    relatorio = gravar_relatorio(resultado, vars(args), os.path.join(registro.diretorio, NOME_MODELO, "buscas"))
+    print(f"Relatório: {relatorio}")
+    if args.nao_promover:
+        return
+    impedimento = resultado.impedimento(atual=0)
+    if impedimento is not None:
+        print(f"Sem promoção: {impedimento}.")
+    else:
+        chave, caminho = promover(df, resultado.vencedor, resultado, registro)
+        print(f"Promovido: {json.dumps(resultado.vencedor, default=str)} -> {caminho} ({chave[:16]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Caminho rápido de inferência para o simulador de churn.
+
+1. `FlorestaCompilada`: as árvores do RandomForest achatadas em arrays NumPy
+   (feature, limiar, filhos e probabilidade da folha), pontuando vetores crus
+   sem passar por DataFrame nem pelas validações do scikit-learn.
+2. `GradeProbabilidade`: todas as combinações possíveis dos controles do
+   simulador pré-calculadas; cada clique vira uma consulta por índice.
+
+Uso (comparação de latência):
+    python -m portfolio.churn.inferencia
+"""
+import time
+
+import numpy as np
+
+from portfolio.churn.pipeline import NOMES_FEATURES, NOMINAIS, codificar, montar_cliente
+
+# Domínio dos controles do simulador (mesmos limites dos sliders da página)
+MESES = np.arange(0, 73)
+VALORES = np.arange(18, 120)
+CONTRATOS = NOMINAIS["Contract"]
+INTERNET = NOMINAIS["InternetService"]
+
+_I_TENURE = NOMES_FEATURES.index("tenure")
+_I_MENSAL = NOMES_FEATURES.index("MonthlyCharges")
+_I_TOTAL = NOMES_FEATURES.index("TotalCharges")
+
+
+class FlorestaCompilada:
+    """Floresta em arrays contíguos; todas as árvores avançam juntas, um nível por passo."""
+
+    def __init__(self, feature, limiar, esquerda, direita, valor, raizes, profundidade):
+        self.feature = feature
+        self.limiar = limiar
+        self.esquerda = esquerda
+        self.direita = direita
+        self.valor = valor
+        self.raizes = raizes
+        self.profundidade = profundidade
+
+    @classmethod
+    def de_sklearn(cls, floresta, classe=1):
+        indice = int(np.flatnonzero(floresta.classes_ == classe)[0])
+        features, limiares, esquerdas, direitas, valores, raizes = [], [], [], [], [], []
+        deslocamento = 0
+        profundidade = 0
+        for estimador in floresta.estimators_:
+            arvore = estimador.tree_
+            n = arvore.node_count
+            folha = arvore.children_left == -1
+            proprio = np.arange(n)
+            # Folhas apontam para si mesmas: percorrer mais níveis que a árvore tem não muda o resultado
+            esquerdas.append(np.where(folha, proprio, arvore.children_left) + deslocamento)
+            direitas.append(np.where(folha, proprio, arvore.children_right) + deslocamento)
+            features.append(np.where(folha, 0, arvore.feature))
+            limiares.append(np.where(folha, np.inf, arvore.threshold))
+            contagens = arvore.value[:, 0, :]
+            valores.append(contagens[:, indice] / contagens.sum(axis=1))
+            raizes.append(deslocamento)
+            deslocamento += n
+            profundidade = max(profundidade, arvore.max_depth)
+        return cls(
+            np.concatenate(features).astype(np.intp),
+            np.concatenate(limiares),
+            np.concatenate(esquerdas).astype(np.intp),
+            np.concatenate(direitas).astype(np.intp),
+            np.concatenate(valores),
+            np.asarray(raizes, dtype=np.intp),
+            profundidade,
+        )
+
+    def prever(self, X):
+        """Probabilidade média das árvores para cada linha de X (n, n_features)."""
+        # float32 como no scikit-learn, para que as comparações com os limiares sejam idênticas
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        linhas = np.arange(len(X))[:, None]
+        nos = np.broadcast_to(self.raizes, (len(X), len(self.raizes)))
+        for _ in range(self.profundidade):
+            vai_esquerda = X[linhas, self.feature[nos]] <= self.limiar[nos]
+            nos = np.where(vai_esquerda, self.esquerda[nos], self.direita[nos])
+        return self.valor[nos].mean(axis=1)
+
+
+class CodificadorSimulador:
+    """
+    Gera o vetor de features do simulador sem pandas: um vetor base por
+    (contrato, internet), já consistente com os serviços, e só os campos
+    numéricos são preenchidos a cada consulta.
+    """
+
+    def __init__(self, perfil):
+        self.bases = {}
+        for contrato in CONTRATOS:
+            for internet in INTERNET:
+                cliente = montar_cliente(perfil, Contract=contrato, InternetService=internet)
+                self.bases[contrato, internet] = codificar(cliente)[0]
+
+    def vetor(self, meses, valor, contrato, internet):
+        x = self.bases[contrato, internet].copy()
+        x[_I_TENURE] = meses
+        x[_I_MENSAL] = valor
+        x[_I_TOTAL] = meses * valor
+        return x
+
+    def grade(self):
+        """Matriz com todas as combinações (meses x valor x contrato x internet)."""
+        m, v = np.meshgrid(MESES, VALORES, indexing="ij")
+        blocos = []
+        for contrato in CONTRATOS:
+            for internet in INTERNET:
+                bloco = np.repeat(self.bases[contrato, internet][None, :], m.size, axis=0)
+                bloco[:, _I_TENURE] = m.ravel()
+                bloco[:, _I_MENSAL] = v.ravel()
+                bloco[:, _I_TOTAL] = (m * v).ravel()
+                blocos.append(bloco)
+        # Ordem final: (contrato, internet, meses, valor)
+        return np.concatenate(blocos)
+
+
+class GradeProbabilidade:
+    """Probabilidades pré-calculadas sobre todo o domínio do simulador."""
+
+    def __init__(self, probabilidades):
+        self.probabilidades = probabilidades.reshape(len(CONTRATOS), len(INTERNET), len(MESES), len(VALORES))
+
+    @classmethod
+    def calcular(cls, prever_matriz, codificador):
+        return cls(np.asarray(prever_matriz(codificador.grade())))
+
+    def consultar(self, meses, valor, contrato, internet):
+        return float(self.probabilidades[
+            CONTRATOS.index(contrato), INTERNET.index(internet),
+            int(meses) - MESES[0], int(valor) - VALORES[0],
+        ])
+
+
+class InferenciaRapida:
+    """Agrupa floresta compilada, codificador e grade de um PipelineChurn treinado."""
+
+    def __init__(self, pipeline, perfil):
+        self.pipeline = pipeline
+        self.perfil = perfil
+        self.floresta = FlorestaCompilada.de_sklearn(pipeline.modelo)
+        self.codificador = CodificadorSimulador(perfil)
+        indice = int(np.flatnonzero(pipeline.modelo.classes_ == 1)[0])
+        # A grade é calculada uma vez com o predict_proba em C (multithread) do scikit-learn
+        self.grade = GradeProbabilidade.calcular(
+            lambda X: pipeline.modelo.predict_proba(X)[:, indice], self.codificador
+        )
+
+    def prever(self, meses, valor, contrato, internet):
+        """Consulta a grade; fora do domínio dos sliders usa a floresta compilada."""
+        if MESES[0] <= meses <= MESES[-1] and VALORES[0] <= valor <= VALORES[-1] and float(meses).is_integer() and float(valor).is_integer():
+            return self.grade.consultar(meses, valor, contrato, internet)
+        return float(self.floresta.prever(self.codificador.vetor(meses, valor, contrato, internet))[0])
+
+    def comparar_latencia(self, repeticoes=200, semente=0):
+        """
+        Latência mediana (µs) por consulta em cada caminho, para entradas aleatórias do simulador,
+        e a maior diferença absoluta entre as probabilidades do caminho rápido e do original.
+        """
+        rng = np.random.default_rng(semente)
+        entradas = [
+            (int(rng.choice(MESES)), int(rng.choice(VALORES)), CONTRATOS[rng.integers(3)], INTERNET[rng.integers(3)])
+            for _ in range(repeticoes)
+        ]
+        indice = int(np.flatnonzero(self.pipeline.modelo.classes_ == 1)[0])
+        modelo = self.pipeline.modelo
+
+        caminhos = {
+            "Original (DataFrame + predict_proba)": lambda m, v, c, i: self.pipeline.prever_proba(
+                montar_cliente(self.perfil, tenure=m, MonthlyCharges=v, Contract=c, InternetService=i))[0],
+            "Vetor NumPy + predict_proba": lambda m, v, c, i: modelo.predict_proba(
+                self.codificador.vetor(m, v, c, i)[None, :])[0, indice],
+            "Floresta compilada (NumPy)": lambda m, v, c, i: self.floresta.prever(
+                self.codificador.vetor(m, v, c, i))[0],
+            "Grade pré-calculada": self.grade.consultar,
+        }
+        resultados = {}
+        respostas = {}
+        for nome, funcao in caminhos.items():
+            tempos = np.empty(repeticoes)
+            valores = np.empty(repeticoes)
+            for k, entrada in enumerate(entradas):
+                inicio = time.perf_counter()
+                valores[k] = funcao(*entrada)
+                tempos[k] = time.perf_counter() - inicio
+            resultados[nome] = float(np.median(tempos) * 1e6)
+            respostas[nome] = valores
+        referencia = respostas["Original (DataFrame + predict_proba)"]
+        divergencia = max(float(np.abs(v - referencia).max()) for v in respostas.values())
+        return resultados, divergencia
+
+
+def main():
+    from portfolio.churn.pipeline import carregar_telco, perfil_base, treinar_ou_carregar
+
+    df = carregar_telco()
+    pipeline, _ = treinar_ou_carregar(df)
+    inicio = time.perf_counter()
+    rapida = InferenciaRapida(pipeline, perfil_base(df))
+    print(f"Preparação (compilação + grade de {rapida.grade.probabilidades.size:,} células): "
+          f"{time.perf_counter() - inicio:.2f} s")
+    latencias, divergencia = rapida.comparar_latencia()
+    base = latencias["Original (DataFrame + predict_proba)"]
+    for nome, micros in latencias.items():
+        print(f"{nome:<40} {micros:>10.1f} µs  ({base / micros:,.0f}x)")
+    print(f"Maior diferença de probabilidade vs. original: {divergencia:.2e}")
+
+
+if __name__ == "__main__":
+    main()
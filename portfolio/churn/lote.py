@@ -0,0 +1,169 @@
+"""
+Pontuação em lote de arquivos no layout Telco (CSV ou Parquet).
+
+O arquivo é lido em pedaços de tamanho fixo, cada pedaço é pontuado em um pool
+de processos e as probabilidades são gravadas em ordem no arquivo de saída,
+sem nunca carregar a base inteira em memória.
+
+Uso (linha de comando):
+    python -m portfolio.churn.lote clientes.csv probabilidades.csv --lote 100000 --jobs 4
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import joblib
+import pandas as pd
+
+from portfolio.churn.pipeline import COLUNA_ID, DTYPES_LEITURA, carregar_telco, tipar
+
+COLUNA_SAIDA = "Probabilidade_Churn"
+TAMANHO_LOTE_PADRAO = 100_000
+
+
+@dataclass
+class ResultadoLote:
+    linhas: int
+    lotes: int
+    segundos: float
+
+    @property
+    def linhas_por_segundo(self):
+        return self.linhas / self.segundos if self.segundos > 0 else float("nan")
+
+
+def _formato(caminho):
+    return "parquet" if caminho.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def ler_em_lotes(caminho, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """Gera DataFrames tipados de até `tamanho_lote` linhas."""
+    if _formato(caminho) == "csv":
+        yield from carregar_telco(caminho, chunksize=tamanho_lote)
+        return
+
+    import pyarrow.parquet as pq
+
+    arquivo = pq.ParquetFile(caminho)
+    colunas = [c for c in arquivo.schema_arrow.names if c in DTYPES_LEITURA]
+    for batch in arquivo.iter_batches(batch_size=tamanho_lote, columns=colunas):
+        yield tipar(batch.to_pandas())
+
+
+class _Escritor:
+    """Grava os resultados de forma incremental (append em CSV ou row groups em Parquet)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.formato = _formato(caminho)
+        self._parquet = None
+        self._primeiro = True
+
+    def escrever(self, df):
+        if self.formato == "csv":
+            df.to_csv(self.caminho, mode="w" if self._primeiro else "a", header=self._primeiro, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.caminho, tabela.schema)
+            self._parquet.write_table(tabela)
+        self._primeiro = False
+
+    def fechar(self):
+        if self._primeiro:
+            # Arquivo de entrada vazio: ainda assim gera a saída, com cabeçalho (CSV) ou esquema (Parquet)
+            self.escrever(pd.DataFrame(columns=[COLUNA_ID, COLUNA_SAIDA]).astype({COLUNA_ID: "string", COLUNA_SAIDA: "float64"}))
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+# --- Execução nos processos do pool ---
+_PIPELINE = None
+
+
+def _iniciar_processo(pipeline):
+    global _PIPELINE
+    _PIPELINE = pipeline
+    # O paralelismo já vem do pool: cada processo usa 1 núcleo na floresta
+    if hasattr(_PIPELINE.modelo, "n_jobs"):
+        _PIPELINE.modelo.n_jobs = 1
+
+
+def _pontuar(df, pipeline=None):
+    pipeline = pipeline or _PIPELINE
+    saida = pd.DataFrame({COLUNA_SAIDA: pipeline.prever_proba(df)})
+    if COLUNA_ID in df.columns:
+        saida.insert(0, COLUNA_ID, df[COLUNA_ID].to_numpy())
+    return saida
+
+
+def pontuar_arquivo(pipeline, entrada, saida, tamanho_lote=TAMANHO_LOTE_PADRAO, n_jobs=-1, progresso=None):
+    """
+    Pontua `entrada` e grava `customerID, Probabilidade_Churn` em `saida`.
+    No máximo 2 lotes por processo ficam em memória ao mesmo tempo.
+    `progresso(linhas_processadas)` é chamado a cada lote gravado.
+    """
+    n_jobs = os.cpu_count() if n_jobs in (None, -1) else max(1, n_jobs)
+    escritor = _Escritor(saida)
+    linhas = lotes = 0
+    inicio = time.perf_counter()
+
+    def gravar(resultado):
+        nonlocal linhas, lotes
+        escritor.escrever(resultado)
+        linhas += len(resultado)
+        lotes += 1
+        if progresso:
+            progresso(linhas)
+
+    try:
+        if n_jobs == 1:
+            for df in ler_em_lotes(entrada, tamanho_lote):
+                gravar(_pontuar(df, pipeline))
+        else:
+            with ProcessPoolExecutor(n_jobs, initializer=_iniciar_processo, initargs=(pipeline,)) as pool:
+                pendentes = deque()
+                for df in ler_em_lotes(entrada, tamanho_lote):
+                    pendentes.append(pool.submit(_pontuar, df))
+                    # Contrapressão: espera o lote mais antigo antes de ler mais do disco
+                    if len(pendentes) >= 2 * n_jobs:
+                        gravar(pendentes.popleft().result())
+                while pendentes:
+                    gravar(pendentes.popleft().result())
+    finally:
+        escritor.fechar()
+
+    return ResultadoLote(linhas, lotes, time.perf_counter() - inicio)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pontuação de churn em lote (CSV/Parquet, layout Telco).")
+    parser.add_argument("entrada", help="Arquivo de clientes (.csv ou .parquet)")
+    parser.add_argument("saida", help="Arquivo de saída (.csv ou .parquet)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO, help="Linhas por lote")
+    parser.add_argument("--jobs", type=int, default=-1, help="Processos em paralelo (-1 = todos os núcleos)")
+    parser.add_argument("--modelo", help="Artefato .joblib do registro (padrão: modelo treinado em telco.csv)")
+    args = parser.parse_args(argv)
+
+    if args.modelo:
+        pipeline = joblib.load(args.modelo)["modelo"]
+    else:
+        from portfolio.churn.pipeline import treinar_ou_carregar
+
+        pipeline, _ = treinar_ou_carregar()
+
+    resultado = pontuar_arquivo(pipeline, args.entrada, args.saida, args.lote, args.jobs)
+    print(
+        f"{resultado.linhas:,} linhas em {resultado.lotes} lotes | "
+        f"{resultado.segundos:.2f} s | {resultado.linhas_por_segundo:,.0f} linhas/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
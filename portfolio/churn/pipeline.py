@@ -0,0 +1,212 @@
+"""
+Ingestão e engenharia de features da base Telco (`projeto-1-churn/telco.csv`).
+
+Tudo é feito coluna a coluna com pandas/NumPy (sem laços por linha), com
+categorias fixas: a mesma codificação vale para a amostra de 7 mil clientes,
+para um arquivo de milhões de linhas e para cada pedaço (chunk) lido em lote.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+CAMINHO_TELCO = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "projeto-1-churn", "telco.csv",
+)
+
+# Hiperparâmetros de partida do modelo servido pela página (até uma busca promover outros,
+# ver `portfolio.churn.busca`).
+# min_samples_leaf limita o tamanho das árvores quando a base cresce para milhões de linhas.
+PARAMS_PADRAO = {"n_estimators": 50, "min_samples_leaf": 5, "random_state": 42, "n_jobs": -1}
+NOME_MODELO = "churn_telco"
+
+COLUNA_ID = "customerID"
+COLUNA_ALVO = "Churn"
+
+SEM_INTERNET = "No internet service"
+
+# Colunas binárias: a segunda categoria vira 1
+BINARIAS = {
+    "gender": ["Female", "Male"],
+    "Partner": ["No", "Yes"],
+    "Dependents": ["No", "Yes"],
+    "PhoneService": ["No", "Yes"],
+    "PaperlessBilling": ["No", "Yes"],
+}
+
+# Colunas nominais: one-hot com categorias fixas (valor desconhecido -> tudo zero)
+NOMINAIS = {
+    "MultipleLines": ["No", "Yes", "No phone service"],
+    "InternetService": ["DSL", "Fiber optic", "No"],
+    "OnlineSecurity": ["No", "Yes", SEM_INTERNET],
+    "OnlineBackup": ["No", "Yes", SEM_INTERNET],
+    "DeviceProtection": ["No", "Yes", SEM_INTERNET],
+    "TechSupport": ["No", "Yes", SEM_INTERNET],
+    "StreamingTV": ["No", "Yes", SEM_INTERNET],
+    "StreamingMovies": ["No", "Yes", SEM_INTERNET],
+    "Contract": ["Month-to-month", "One year", "Two year"],
+    "PaymentMethod": [
+        "Electronic check", "Mailed check",
+        "Bank transfer (automatic)", "Credit card (automatic)",
+    ],
+}
+
+SERVICOS_INTERNET = [col for col, cats in NOMINAIS.items() if SEM_INTERNET in cats]
+
+NUMERICAS = ["SeniorCitizen", "tenure", "MonthlyCharges", "TotalCharges"]
+
+# Tipos aplicados já na leitura do CSV (categorias ocupam 1 byte por linha)
+DTYPES_LEITURA = {
+    COLUNA_ID: "string",
+    "SeniorCitizen": "int8",
+    "tenure": "int16",
+    "MonthlyCharges": "float32",
+    # TotalCharges vem com espaços em branco para clientes novos: lido como texto e convertido depois
+    "TotalCharges": "string",
+    COLUNA_ALVO: pd.CategoricalDtype(["No", "Yes"]),
+    **{col: pd.CategoricalDtype(cats) for col, cats in {**BINARIAS, **NOMINAIS}.items()},
+}
+
+COLUNAS = list(DTYPES_LEITURA)
+
+NOMES_FEATURES = (
+    NUMERICAS
+    + list(BINARIAS)
+    + [f"{col}={cat}" for col, cats in NOMINAIS.items() for cat in cats]
+)
+
+
+def tipar(df):
+    """Garante os tipos da base (categorias fixas e TotalCharges numérico)."""
+    df = df.copy()
+    for col, dtype in DTYPES_LEITURA.items():
+        if col == "TotalCharges" or col not in df.columns:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            if df[col].dtype != dtype:
+                df[col] = df[col].astype(str).astype(dtype)
+        elif col != COLUNA_ID:
+            df[col] = df[col].astype(dtype)
+
+    # Coerção vetorizada: valores vazios/ inválidos viram NaN e são estimados por
+    # meses x mensalidade (0 para clientes com tenure = 0, como na base original)
+    total = pd.to_numeric(df["TotalCharges"], errors="coerce") if "TotalCharges" in df.columns else np.nan
+    estimado = df["tenure"].astype("float32") * df["MonthlyCharges"].astype("float32")
+    df["TotalCharges"] = pd.Series(total, index=df.index).fillna(estimado).astype("float32")
+    return df
+
+
+def carregar_telco(caminho=CAMINHO_TELCO, chunksize=None, **kwargs):
+    """
+    Lê um arquivo no layout Telco com colunas e tipos explícitos.
+    Com `chunksize`, devolve um iterador de DataFrames já tipados.
+    """
+    leitor = pd.read_csv(
+        caminho,
+        usecols=lambda c: c in DTYPES_LEITURA,
+        dtype=DTYPES_LEITURA,
+        chunksize=chunksize,
+        **kwargs,
+    )
+    if chunksize is None:
+        return tipar(leitor)
+    return (tipar(chunk) for chunk in leitor)
+
+
+def codificar(df):
+    """Converte o DataFrame tipado na matriz de features (float32, ordem de NOMES_FEATURES)."""
+    n = len(df)
+    X = np.zeros((n, len(NOMES_FEATURES)), dtype=np.float32)
+    j = 0
+    for col in NUMERICAS:
+        X[:, j] = df[col].to_numpy(dtype=np.float32, na_value=0)
+        j += 1
+    for col in BINARIAS:
+        X[:, j] = df[col].cat.codes.to_numpy() == 1
+        j += 1
+    linhas = np.arange(n)
+    for col, cats in NOMINAIS.items():
+        codigos = df[col].cat.codes.to_numpy()
+        validos = codigos >= 0
+        X[linhas[validos], j + codigos[validos]] = 1
+        j += len(cats)
+    return X
+
+
+def alvo(df):
+    return (df[COLUNA_ALVO].cat.codes.to_numpy() == 1).astype(np.int8)
+
+
+def perfil_base(df):
+    """Perfil 'típico' da base: moda das categorias e mediana dos números."""
+    perfil = {col: df[col].mode().iloc[0] for col in {**BINARIAS, **NOMINAIS}}
+    perfil.update({col: df[col].median() for col in NUMERICAS})
+    return perfil
+
+
+def montar_cliente(perfil, **valores):
+    """
+    Monta um cliente (DataFrame de 1 linha) a partir do perfil base, mantendo a
+    consistência da base: sem internet -> serviços 'No internet service' e
+    TotalCharges = meses x mensalidade.
+    """
+    linha = {**perfil, **valores}
+    sem_internet = linha["InternetService"] == "No"
+    for col in SERVICOS_INTERNET:
+        if sem_internet:
+            linha[col] = SEM_INTERNET
+        elif linha[col] == SEM_INTERNET:
+            linha[col] = "No"
+    linha["TotalCharges"] = linha["tenure"] * linha["MonthlyCharges"]
+    return tipar(pd.DataFrame([linha]))
+
+
+class PipelineChurn:
+    """
+    Codificação + RandomForest em um único objeto (é ele que vai para o registro de modelos).
+    Recebe DataFrames no layout Telco e devolve probabilidades de churn.
+    """
+
+    def __init__(self, **params):
+        self.params = params
+        self.modelo = None
+        self.features = NOMES_FEATURES
+
+    def fit(self, df, y):
+        from sklearn.ensemble import RandomForestClassifier
+
+        self.modelo = RandomForestClassifier(**self.params)
+        self.modelo.fit(codificar(df), np.asarray(y))
+        return self
+
+    def predict_proba(self, df):
+        return self.modelo.predict_proba(codificar(tipar(df)))
+
+    def prever_proba(self, df):
+        """Probabilidade da classe 1 (cancelou)."""
+        indice = int(np.flatnonzero(self.modelo.classes_ == 1)[0])
+        return self.predict_proba(df)[:, indice]
+
+
+def params_modelo(registro=None):
+    """Hiperparâmetros do modelo servido: os da última busca promovida ou PARAMS_PADRAO."""
+    from portfolio.registro import RegistroModelos
+
+    promovido = (registro or RegistroModelos()).promovido(NOME_MODELO)
+    return promovido["params"] if promovido else PARAMS_PADRAO
+
+
+def treinar_ou_carregar(df=None, params=None, registro=None):
+    """
+    Devolve (PipelineChurn, InfoModelo) para a base informada (padrão: telco.csv),
+    treinando apenas se o registro ainda não tiver essa versão.
+    Sem `params`, usa os hiperparâmetros promovidos (`params_modelo`).
+    """
+    from portfolio.registro import RegistroModelos
+
+    df = carregar_telco() if df is None else df
+    X = df.drop(columns=[COLUNA_ID, COLUNA_ALVO], errors="ignore")
+    registro = registro or RegistroModelos()
+    params = params or params_modelo(registro)
+    return registro.carregar_ou_treinar(NOME_MODELO, PipelineChurn, X, alvo(df), params)
@@ -0,0 +1 @@
+"""Motores espaciais do projeto de Geomarketing (cobertura, agregação do mapa e expansão)."""
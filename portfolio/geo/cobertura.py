@@ -0,0 +1,149 @@
+"""
+Análise de cobertura loja x demanda com índice espacial.
+
+As coordenadas viram vetores unitários 3D e vão para um KD-tree: a distância
+euclidiana (corda) é convertida exatamente na distância de grande círculo
+(haversine), com o custo de um KD-tree comum - bem mais rápido que um
+BallTree com métrica haversine para milhões de pontos.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+RAIO_TERRA_KM = 6371.0088
+
+# Acima deste volume, a população por loja é somada em células de 100 m (KD-tree sobre as células)
+LIMIAR_PONTO_A_PONTO = 100_000
+RESOLUCAO_AGREGADA_KM = 0.1
+
+
+def vetores_unitarios(lat, lon):
+    """Latitude/longitude em graus -> pontos (x, y, z) na esfera unitária."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def corda_para_km(corda):
+    return 2 * np.arcsin(np.clip(corda / 2, 0, 1)) * RAIO_TERRA_KM
+
+
+def km_para_corda(km):
+    return 2 * np.sin(km / RAIO_TERRA_KM / 2)
+
+
+def indice_espacial(lat, lon):
+    from sklearn.neighbors import KDTree
+
+    return KDTree(vetores_unitarios(lat, lon))
+
+
+def agregar_em_celulas(lat, lon, peso, resolucao_km):
+    """
+    Soma `peso` em células quadradas de ~`resolucao_km` (centroide ponderado por célula).
+    Reduz milhões de pontos a alguns milhares de células antes das consultas por raio.
+    """
+    passo = resolucao_km / 111.32  # graus por km (aprox., suficiente para o tamanho da célula)
+    lin = np.floor(np.asarray(lat) / passo).astype(np.int64)
+    col = np.floor(np.asarray(lon) / passo).astype(np.int64)
+    _, celula = np.unique(lin * 4_000_003 + col, return_inverse=True)
+    peso = np.asarray(peso, dtype=float)
+    total = np.bincount(celula, weights=peso)
+    # Células sem peso (população 0) usam a média simples como centroide
+    divisor = np.where(total > 0, total, 1)
+    lat_c = np.where(total > 0, np.bincount(celula, weights=lat * peso) / divisor,
+                     np.bincount(celula, weights=lat) / np.bincount(celula))
+    lon_c = np.where(total > 0, np.bincount(celula, weights=lon * peso) / divisor,
+                     np.bincount(celula, weights=lon) / np.bincount(celula))
+    return lat_c, lon_c, total
+
+
+def somar_no_raio(arvore, pesos, lat, lon, raio_km):
+    """Para cada consulta (lat, lon), soma dos `pesos` dos pontos indexados até `raio_km`."""
+    if len(lat) == 0:
+        return np.zeros(0)
+    vizinhos = arvore.query_radius(vetores_unitarios(lat, lon), r=km_para_corda(raio_km))
+    tamanhos = np.fromiter((len(v) for v in vizinhos), dtype=np.int64, count=len(vizinhos))
+    if tamanhos.sum() == 0:
+        return np.zeros(len(lat))
+    consulta = np.repeat(np.arange(len(lat)), tamanhos)
+    return np.bincount(consulta, weights=np.asarray(pesos)[np.concatenate(vizinhos)], minlength=len(lat))
+
+
+@dataclass
+class ResultadoCobertura:
+    raio_km: float
+    loja_proxima: np.ndarray       # índice (posição em df_lojas) da loja mais próxima de cada ponto
+    distancia_km: np.ndarray       # distância até essa loja
+    coberto: np.ndarray            # ponto a até raio_km de alguma loja
+    populacao_por_loja: np.ndarray  # população a até raio_km de cada loja (sobreposição conta em ambas)
+    populacao_total: float
+    populacao_coberta: float
+
+    @property
+    def populacao_descoberta(self):
+        return self.populacao_total - self.populacao_coberta
+
+    @property
+    def taxa_cobertura(self):
+        return self.populacao_coberta / self.populacao_total if self.populacao_total else 0.0
+
+
+def calcular_cobertura(df_pop, df_lojas, raio_km, resolucao_km=None):
+    """
+    Loja mais próxima e distância para cada ponto de demanda, população no raio
+    de cada loja e totais de demanda coberta/descoberta.
+
+    Com `resolucao_km`, a população por loja é calculada sobre células agregadas
+    (erro de posição <= meia diagonal da célula); sem ela, ponto a ponto.
+    """
+    lat = df_pop["Latitude"].to_numpy()
+    lon = df_pop["Longitude"].to_numpy()
+    pop = df_pop["Populacao"].to_numpy(dtype=float)
+    lat_l = df_lojas["Latitude"].to_numpy()
+    lon_l = df_lojas["Longitude"].to_numpy()
+
+    if len(df_lojas) == 0 or len(df_pop) == 0:
+        return ResultadoCobertura(
+            raio_km, np.full(len(df_pop), -1), np.full(len(df_pop), np.inf),
+            np.zeros(len(df_pop), dtype=bool), np.zeros(len(df_lojas)), pop.sum(), 0.0,
+        )
+
+    # 1. Loja mais próxima de cada ponto (KD-tree das lojas)
+    corda, idx = indice_espacial(lat_l, lon_l).query(vetores_unitarios(lat, lon), k=1)
+    distancia = corda_para_km(corda[:, 0])
+    coberto = distancia <= raio_km
+
+    # 2. População no raio de cada loja (KD-tree dos pontos ou das células)
+    if resolucao_km:
+        lat_c, lon_c, pop_c = agregar_em_celulas(lat, lon, pop, resolucao_km)
+        por_loja = somar_no_raio(indice_espacial(lat_c, lon_c), pop_c, lat_l, lon_l, raio_km)
+    else:
+        por_loja = somar_no_raio(indice_espacial(lat, lon), pop, lat_l, lon_l, raio_km)
+
+    return ResultadoCobertura(
+        raio_km, idx[:, 0], distancia, coberto, por_loja, pop.sum(), pop[coberto].sum(),
+    )
+
+
+def vazios_de_mercado(df_pop, resultado, n=10):
+    """Pontos descobertos com maior potencial (população x renda), com a distância até a loja mais próxima."""
+    descobertos = df_pop.assign(
+        Distancia_Loja_km=resultado.distancia_km,
+        Potencial=df_pop["Populacao"].to_numpy(dtype=float) * df_pop["Renda_Media"].to_numpy(),
+    )[~resultado.coberto]
+    return descobertos.nlargest(n, "Potencial")
+
+
+def demanda_por_zona(df_pop, resultado):
+    """População total e descoberta por zona."""
+    pop = df_pop["Populacao"].to_numpy(dtype=float)
+    resumo = pd.DataFrame({
+        "Zona": df_pop["Zona"].to_numpy(),
+        "Populacao": pop,
+        "Descoberta": np.where(resultado.coberto, 0.0, pop),
+    }).groupby("Zona", observed=True).sum()
+    resumo["% Descoberta"] = resumo["Descoberta"] / resumo["Populacao"]
+    return resumo.reset_index()
@@ -0,0 +1,80 @@
+"""
+Seleção de pontos para novas lojas (Site Selection) por cobertura máxima.
+
+Escolhe K locais que maximizam a demanda ponderada por renda (População x
+Renda_Media) a até R km, desconsiderando o que as lojas atuais já cobrem.
+Algoritmo guloso preguiçoso (lazy greedy): como o ganho marginal de um
+candidato só diminui, basta recalcular o ganho do topo do heap; os demais
+ficam com o valor antigo (limite superior) até chegarem ao topo.
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from portfolio.geo.cobertura import (
+    agregar_em_celulas, corda_para_km, indice_espacial, km_para_corda, vetores_unitarios,
+)
+
+
+def selecionar_novas_lojas(df_pop, df_lojas, k, raio_km, resolucao_km=0.25, max_candidatos=5_000):
+    """
+    Devolve um DataFrame com as K lojas sugeridas, na ordem de escolha, com a
+    população e o potencial (pop x renda) que cada uma passa a cobrir.
+
+    A demanda é agregada em células de `resolucao_km` (os centroides são também
+    os candidatos); os `max_candidatos` com maior potencial no raio são avaliados.
+    """
+    colunas = ["Ordem", "Latitude", "Longitude", "Populacao_Nova", "Potencial_Novo", "Potencial_Acumulado"]
+    if k <= 0 or len(df_pop) == 0:
+        return pd.DataFrame(columns=colunas)
+
+    lat = df_pop["Latitude"].to_numpy()
+    lon = df_pop["Longitude"].to_numpy()
+    pop = df_pop["Populacao"].to_numpy(dtype=float)
+    potencial = pop * df_pop["Renda_Media"].to_numpy()
+
+    # 1. Demanda agregada em células (a mesma grade vale para pop e pop x renda)
+    lat_c, lon_c, pop_c = agregar_em_celulas(lat, lon, pop, resolucao_km)
+    _, _, pot_c = agregar_em_celulas(lat, lon, potencial, resolucao_km)
+
+    # 2. O que as lojas atuais já cobrem não conta como ganho
+    pontos = vetores_unitarios(lat_c, lon_c)
+    if len(df_lojas):
+        corda, _ = indice_espacial(df_lojas["Latitude"], df_lojas["Longitude"]).query(pontos, k=1)
+        coberto = corda_para_km(corda[:, 0]) <= raio_km
+    else:
+        coberto = np.zeros(len(pontos), dtype=bool)
+
+    # 3. Matriz de incidência candidato -> células no raio (formato CSR: indptr + indices)
+    arvore = indice_espacial(lat_c, lon_c)
+    vizinhos = arvore.query_radius(pontos, r=km_para_corda(raio_km))
+    tamanhos = np.fromiter((len(v) for v in vizinhos), dtype=np.int64, count=len(vizinhos))
+    indptr = np.concatenate([[0], np.cumsum(tamanhos)])
+    indices = np.concatenate(vizinhos) if tamanhos.sum() else np.zeros(0, dtype=np.int64)
+
+    livre = np.where(coberto, 0.0, pot_c)
+    ganhos = np.add.reduceat(livre[indices], indptr[:-1]) if len(indices) else np.zeros(len(pontos))
+    ganhos[tamanhos == 0] = 0.0
+
+    # Poda: só os candidatos mais promissores entram no heap
+    candidatos = np.argsort(-ganhos)[:max_candidatos]
+    heap = [(-ganhos[c], int(c)) for c in candidatos if ganhos[c] > 0]
+    heapq.heapify(heap)
+
+    escolhidos = []
+    acumulado = 0.0
+    while heap and len(escolhidos) < k:
+        _, c = heapq.heappop(heap)
+        vizinhas = indices[indptr[c]:indptr[c + 1]]
+        ganho = livre[vizinhas].sum()
+        if ganho <= 0:
+            continue
+        if heap and ganho < -heap[0][0]:
+            heapq.heappush(heap, (-ganho, c))  # Valor desatualizado: volta para o heap com o ganho real
+            continue
+        acumulado += ganho
+        escolhidos.append((len(escolhidos) + 1, lat_c[c], lon_c[c], pop_c[vizinhas][livre[vizinhas] > 0].sum(), ganho, acumulado))
+        livre[vizinhas] = 0.0
+
+    return pd.DataFrame(escolhidos, columns=colunas).astype({"Populacao_Nova": np.int64})
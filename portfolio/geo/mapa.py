@@ -0,0 +1,145 @@
+"""
+Renderização do mapa de demanda com nível de detalhe (LOD).
+
+Em vez de enviar todos os pontos ao navegador, a demanda é pré-agregada em
+grades de vários tamanhos (População somada, Renda_Media ponderada pela
+população, centroide ponderado). A grade mais fina é calculada a partir dos
+pontos; as demais, a partir dela (as medidas são aditivas). Abaixo de um
+limiar de pontos, o mapa continua usando os pontos brutos.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from portfolio.preguicoso import importar_preguicoso
+
+# Plotly Express só é importado quando uma figura é montada
+px = importar_preguicoso("plotly.express")
+
+KM_POR_GRAU = 111.32
+
+# Células da grade: a base e múltiplos dela (cada nível agrega 2x2 células do anterior)
+TAMANHO_BASE_KM = 0.25
+NIVEIS = {"250 m": 1, "500 m": 2, "1 km": 4, "2 km": 8, "4 km": 16}
+NIVEL_BRUTO = "Pontos brutos"
+
+LIMIAR_PONTOS_BRUTOS = 20_000
+
+ESCALA_CORES = ["#ffeba4", "#ff8c00", "#d30b0b", "#4a0404"]
+
+
+def _agregar(lin, col, pop, pop_renda, pop_lat, pop_lon, pontos):
+    """Soma as medidas aditivas por célula (lin, col) da grade."""
+    _, primeira, celula = np.unique(lin * 4_000_003 + col, return_index=True, return_inverse=True)
+    return {
+        "lin": lin[primeira], "col": col[primeira],
+        "pop": np.bincount(celula, weights=pop),
+        "pop_renda": np.bincount(celula, weights=pop_renda),
+        "pop_lat": np.bincount(celula, weights=pop_lat),
+        "pop_lon": np.bincount(celula, weights=pop_lon),
+        "pontos": np.bincount(celula, weights=pontos),
+    }
+
+
+def _para_dataframe(celulas):
+    pop = celulas["pop"]
+    divisor = np.where(pop > 0, pop, 1)
+    return pd.DataFrame({
+        "Latitude": celulas["pop_lat"] / divisor,
+        "Longitude": celulas["pop_lon"] / divisor,
+        "Populacao": pop.astype(np.int64),
+        "Renda_Media": (celulas["pop_renda"] / divisor).round().astype(np.int64),
+        "Pontos": celulas["pontos"].astype(np.int64),
+    })
+
+
+def preparar_niveis(df_pop):
+    """Pré-agrega a demanda em todos os níveis de `NIVEIS` (um DataFrame por nível)."""
+    passo = TAMANHO_BASE_KM / KM_POR_GRAU
+    lat = df_pop["Latitude"].to_numpy()
+    lon = df_pop["Longitude"].to_numpy()
+    pop = df_pop["Populacao"].to_numpy(dtype=float)
+    celulas = _agregar(
+        np.floor(lat / passo).astype(np.int64), np.floor(lon / passo).astype(np.int64),
+        pop, pop * df_pop["Renda_Media"].to_numpy(), pop * lat, pop * lon, np.ones(len(lat)),
+    )
+
+    niveis = {}
+    fator_atual = 1
+    for nome, fator in sorted(NIVEIS.items(), key=lambda item: item[1]):
+        if fator != fator_atual:
+            k = fator // fator_atual
+            celulas = _agregar(
+                np.floor_divide(celulas["lin"], k), np.floor_divide(celulas["col"], k),
+                celulas["pop"], celulas["pop_renda"], celulas["pop_lat"], celulas["pop_lon"], celulas["pontos"],
+            )
+            fator_atual = fator
+        niveis[nome] = _para_dataframe(celulas)
+    return niveis
+
+
+def escolher_nivel(n_pontos, niveis, limiar=LIMIAR_PONTOS_BRUTOS):
+    """Pontos brutos até o limiar; acima dele, o nível mais detalhado com no máximo `limiar` células."""
+    if n_pontos <= limiar:
+        return NIVEL_BRUTO
+    for nome in sorted(niveis, key=NIVEIS.get):
+        if len(niveis[nome]) <= limiar:
+            return nome
+    return max(niveis, key=NIVEIS.get)
+
+
+def figura_mapa(camada, df_lojas, agregado=False, novas_lojas=None):
+    """Mapa de demanda (pontos brutos ou células agregadas) com as lojas atuais e sugeridas sobrepostas."""
+    hover = ["Renda_Media", "Populacao"] + (["Pontos"] if agregado else [])
+    fig = px.scatter_mapbox(
+        camada,
+        lat="Latitude",
+        lon="Longitude",
+        size="Populacao",
+        color="Renda_Media",
+        color_continuous_scale=ESCALA_CORES,
+        size_max=25,
+        zoom=10.5,
+        center={"lat": -1.38, "lon": -48.43},
+        hover_name=None if agregado else "Zona",
+        hover_data=hover,
+        mapbox_style="carto-positron",
+        title="Distribuição de Potencial de Consumo (RMB)",
+    )
+    fig.add_scattermapbox(
+        lat=df_lojas["Latitude"],
+        lon=df_lojas["Longitude"],
+        mode="markers",
+        marker=dict(size=14, color="blue", symbol="circle"),
+        text=df_lojas["Loja_ID"],
+        name="Lojas Físicas",
+    )
+    if novas_lojas is not None and len(novas_lojas):
+        fig.add_scattermapbox(
+            lat=novas_lojas["Latitude"],
+            lon=novas_lojas["Longitude"],
+            mode="markers+text",
+            marker=dict(size=18, color="#00a65a"),
+            text=novas_lojas["Ordem"].astype(str),
+            textposition="top center",
+            name="Novas Lojas (Sugestão)",
+        )
+    fig.update_layout(margin={"r": 0, "t": 30, "l": 0, "b": 0}, height=600)
+    return fig
+
+
+def medir_niveis(df_pop, df_lojas, niveis):
+    """Tamanho do JSON da figura e tempo para montá-la e serializá-la, por nível."""
+    camadas = {NIVEL_BRUTO: df_pop, **niveis}
+    linhas = []
+    for nome, camada in camadas.items():
+        inicio = time.perf_counter()
+        payload = figura_mapa(camada, df_lojas, agregado=nome != NIVEL_BRUTO).to_json()
+        linhas.append({
+            "Nível": nome,
+            "Marcadores": len(camada),
+            "Payload (KB)": round(len(payload.encode()) / 1024, 1),
+            "Montagem + Serialização (ms)": round((time.perf_counter() - inicio) * 1000, 1),
+        })
+    return pd.DataFrame(linhas)
@@ -0,0 +1 @@
+"""Camada analítica do Dashboard de KPIs de Vendas (cubo pré-agregado e KPIs de série temporal)."""
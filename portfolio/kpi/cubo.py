@@ -0,0 +1,180 @@
+"""
+Cubo OLAP das vendas no grão Região x Categoria x dia.
+
+As medidas aditivas (Vendas, Lucro, soma e contagem do Score_Qualidade) são
+somadas uma única vez por base em arrays densos (regiões, categorias, dias).
+Filtros da barra lateral viram seleções nos eixos do cubo e os KPIs/gráficos
+são somas sobre ele: o custo depende do número de membros das dimensões
+(5 x 4 x ~1000 células), não do número de linhas da base.
+
+Dias novos não exigem reler a base: `anexar` monta o cubo só das vendas que
+chegaram e o combina com o existente.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+MEDIDAS = ["Vendas", "Lucro", "Score_Soma", "Contagem"]
+
+
+def _codigos(serie, membros):
+    return pd.Categorical(serie, categories=membros).codes.astype(np.int64)
+
+
+def _membros(series):
+    """Membros de uma dimensão na ordem das categorias (novos membros de lotes seguintes vão ao final)."""
+    membros = []
+    for serie in series:
+        membros += [m for m in pd.Categorical(serie).categories if m not in membros]
+    return membros
+
+
+def _celulas(df):
+    """Medidas somadas por (Região, Categoria, dia), só para as células com vendas."""
+    if len(df) == 0:
+        return pd.DataFrame()
+    regioes = pd.Categorical(df["Região"])
+    categorias = pd.Categorical(df["Categoria"])
+    dia = df["Data"].to_numpy().astype("datetime64[D]")
+    inicio = dia.min()
+    n_dias = int((dia.max() - inicio).astype(np.int64)) + 1
+    forma = (len(regioes.categories), len(categorias.categories), n_dias)
+    posicao = (regioes.codes.astype(np.int64) * forma[1] + categorias.codes) * n_dias + (dia - inicio).astype(np.int64)
+
+    contagem = np.bincount(posicao, minlength=np.prod(forma))
+    ocupadas = np.flatnonzero(contagem)
+    r, c, d = np.unravel_index(ocupadas, forma)
+
+    def somar(coluna):
+        return np.bincount(posicao, weights=df[coluna].to_numpy(dtype=float), minlength=np.prod(forma))[ocupadas]
+
+    return pd.DataFrame({
+        "Região": regioes.categories[r],
+        "Categoria": categorias.categories[c],
+        "Dia": inicio + d,
+        "Vendas": somar("Vendas"),
+        "Lucro": somar("Lucro"),
+        "Score_Soma": somar("Score_Qualidade"),
+        "Contagem": contagem[ocupadas].astype(float),
+    })
+
+
+@dataclass
+class CuboVendas:
+    regioes: list
+    categorias: list
+    dias: np.ndarray   # datetime64[D], um por posição do 3º eixo (dias sem venda ficam zerados)
+    medidas: dict      # nome -> array (regiões, categorias, dias)
+
+    @classmethod
+    def de_vendas(cls, df):
+        """Monta o cubo a partir das linhas de venda (uma passada com `np.bincount`)."""
+        return cls.de_lotes([df])
+
+    @classmethod
+    def de_lotes(cls, lotes):
+        """
+        Monta o cubo lendo a base em lotes (ex.: `Armazem.lotes`): cada lote vira
+        só as suas células não vazias, então a base inteira nunca fica em memória.
+        """
+        celulas = [_celulas(df) for df in lotes]
+        celulas = [c for c in celulas if len(c)]
+        if not celulas:
+            return cls([], [], np.array([], dtype="datetime64[D]"), {m: np.zeros((0, 0, 0)) for m in MEDIDAS})
+
+        regioes = _membros(c["Região"] for c in celulas)
+        categorias = _membros(c["Categoria"] for c in celulas)
+        todas = pd.concat(celulas, ignore_index=True)
+        dia = todas["Dia"].to_numpy().astype("datetime64[D]")
+        inicio = dia.min()
+        n_dias = int((dia.max() - inicio).astype(np.int64)) + 1
+        forma = (len(regioes), len(categorias), n_dias)
+        posicao = (
+            _codigos(todas["Região"], regioes) * forma[1] + _codigos(todas["Categoria"], categorias)
+        ) * n_dias + (dia - inicio).astype(np.int64)
+        medidas = {
+            m: np.bincount(posicao, weights=todas[m].to_numpy(), minlength=np.prod(forma)).reshape(forma)
+            for m in MEDIDAS
+        }
+        return cls(regioes, categorias, inicio + np.arange(n_dias), medidas)
+
+    def combinar(self, outro):
+        """
+        Cubo com as medidas dos dois somadas: os eixos viram a união dos membros e dos dias
+        (membros novos vão ao final). O custo é o tamanho dos cubos, não o das bases.
+        """
+        if not len(outro.dias):
+            return self
+        if not len(self.dias):
+            return outro
+        regioes = self.regioes + [m for m in outro.regioes if m not in self.regioes]
+        categorias = self.categorias + [m for m in outro.categorias if m not in self.categorias]
+        inicio, fim = min(self.dias[0], outro.dias[0]), max(self.dias[-1], outro.dias[-1])
+        dias = np.arange(inicio, fim + 1)
+        forma = (len(regioes), len(categorias), len(dias))
+        medidas = {m: np.zeros(forma) for m in MEDIDAS}
+        for cubo in (self, outro):
+            r = [regioes.index(m) for m in cubo.regioes]
+            c = [categorias.index(m) for m in cubo.categorias]
+            d = int((cubo.dias[0] - inicio).astype(np.int64))
+            for m in MEDIDAS:
+                medidas[m][np.ix_(r, c, np.arange(d, d + len(cubo.dias)))] += cubo.medidas[m]
+        return CuboVendas(regioes, categorias, dias, medidas)
+
+    def anexar(self, lotes):
+        """Novo cubo com as vendas de `lotes` incorporadas (ex.: os dias que chegaram), sem reler a base."""
+        return self.combinar(CuboVendas.de_lotes(lotes))
+
+    def _selecao(self, regioes=None, categorias=None):
+        r = np.isin(self.regioes, list(regioes)) if regioes is not None else np.ones(len(self.regioes), bool)
+        c = np.isin(self.categorias, list(categorias)) if categorias is not None else np.ones(len(self.categorias), bool)
+        return np.ix_(r, c)
+
+    def rollup(self, eixo, regioes=None, categorias=None):
+        """Medidas somadas sobre o filtro, mantendo só o eixo 'Região', 'Categoria' ou 'Data' (None = total)."""
+        manter = {"Região": 0, "Categoria": 1, "Data": 2, None: None}[eixo]
+        selecao = self._selecao(regioes, categorias)
+        eixos = tuple(e for e in range(3) if e != manter)
+        return {m: v[selecao].sum(axis=eixos) for m, v in self.medidas.items()}
+
+    def totais(self, regioes=None, categorias=None):
+        """Faturamento, lucro e Score médio (média das linhas) do filtro."""
+        t = self.rollup(None, regioes, categorias)
+        return {
+            "Vendas": float(t["Vendas"]),
+            "Lucro": float(t["Lucro"]),
+            "Score_Qualidade": float(t["Score_Soma"] / t["Contagem"]) if t["Contagem"] else float("nan"),
+            "Linhas": int(t["Contagem"]),
+        }
+
+    def por_dimensao(self, eixo, regioes=None, categorias=None):
+        """DataFrame com Vendas, Lucro e Score_Qualidade (média) por membro de `eixo`."""
+        t = self.rollup(eixo, regioes, categorias)
+        if eixo == "Data":
+            membros = self.dias
+        else:
+            todos = self.regioes if eixo == "Região" else self.categorias
+            filtro = regioes if eixo == "Região" else categorias
+            membros = [m for m in todos if filtro is None or m in filtro]
+        contagem = t["Contagem"]
+        df = pd.DataFrame({
+            eixo: membros,
+            "Vendas": t["Vendas"],
+            "Lucro": t["Lucro"],
+            "Score_Qualidade": np.divide(t["Score_Soma"], contagem, out=np.full(len(contagem), np.nan), where=contagem > 0),
+            "Linhas": contagem.astype(np.int64),
+        })
+        return df[df["Linhas"] > 0].reset_index(drop=True)
+
+    def dia_de_corte(self, n, regioes=None, categorias=None):
+        """Dia mais antigo necessário para cobrir as `n` vendas mais recentes do filtro (None se não houver vendas)."""
+        por_dia = self.rollup("Data", regioes, categorias)["Contagem"]
+        acumulado = np.cumsum(por_dia[::-1])
+        if len(acumulado) == 0 or acumulado[-1] == 0:
+            return None
+        return self.dias[len(por_dia) - 1 - min(np.searchsorted(acumulado, n), len(por_dia) - 1)]
+
+    @property
+    def nbytes(self):
+        return sum(v.nbytes for v in self.medidas.values())
@@ -0,0 +1,105 @@
+"""
+KPIs de série temporal a partir do cubo de vendas (grão dia).
+
+O filtro de Região/Categoria vira a série diária do cubo (rollup do eixo Data)
+e dela saem as somas acumuladas de cada medida. Qualquer janela - móvel de 7 ou
+30 dias, mês até a data (MTD), período anterior para comparação - é a diferença
+de duas posições das somas acumuladas: O(1) por janela e O(dias) para a série
+móvel inteira, sem voltar às linhas de venda.
+
+Quando chegam dias novos, o cubo é atualizado com `CuboVendas.anexar` e a série
+é só recortada de novo.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+JANELAS = (7, 30)
+META_SCORE = 6.0
+
+
+@dataclass
+class SerieKPI:
+    dias: np.ndarray   # datetime64[D], contínuos (dias sem venda ficam zerados)
+    somas: dict        # medida -> somas acumuladas com um zero na frente (len(dias) + 1)
+
+    @classmethod
+    def de_cubo(cls, cubo, regioes=None, categorias=None):
+        por_dia = cubo.rollup("Data", regioes, categorias)
+        somas = {m: np.concatenate([[0.0], np.cumsum(v)]) for m, v in por_dia.items()}
+        return cls(cubo.dias, somas)
+
+    @property
+    def ultimo_dia(self):
+        return self.dias[-1] if len(self.dias) else None
+
+    def _posicao(self, dia):
+        # Índice (exclusivo) do fim da janela que termina em `dia`, limitado à série
+        return int(np.clip((np.datetime64(dia, "D") - self.dias[0]).astype(np.int64) + 1, 0, len(self.dias)))
+
+    def janela(self, inicio, fim):
+        """Vendas, Lucro, Score_Qualidade (média das linhas) e Linhas entre os dias `inicio` e `fim` (inclusive)."""
+        if not len(self.dias):
+            return {"Vendas": 0.0, "Lucro": 0.0, "Score_Qualidade": float("nan"), "Linhas": 0}
+        a, b = self._posicao(np.datetime64(inicio, "D") - 1), self._posicao(fim)
+        t = {m: float(s[b] - s[a]) if b > a else 0.0 for m, s in self.somas.items()}
+        return {
+            "Vendas": t["Vendas"],
+            "Lucro": t["Lucro"],
+            "Score_Qualidade": t["Score_Soma"] / t["Contagem"] if t["Contagem"] else float("nan"),
+            "Linhas": int(t["Contagem"]),
+        }
+
+    def ultimos(self, n, fim=None):
+        """Janela dos `n` dias que terminam em `fim` (padrão: o último dia da série)."""
+        fim = np.datetime64(self.ultimo_dia if fim is None else fim, "D")
+        return self.janela(fim - (n - 1), fim)
+
+    def mes_ate_hoje(self, fim=None):
+        """Do primeiro dia do mês de `fim` até `fim`."""
+        fim = np.datetime64(self.ultimo_dia if fim is None else fim, "D")
+        return self.janela(fim.astype("datetime64[M]").astype("datetime64[D]"), fim)
+
+    def periodo_anterior(self, n, fim=None):
+        """(últimos n dias, n dias imediatamente anteriores)."""
+        fim = np.datetime64(self.ultimo_dia if fim is None else fim, "D")
+        return self.ultimos(n, fim), self.ultimos(n, fim - n)
+
+    def mes_anterior_ate_hoje(self, fim=None):
+        """(MTD, mesmos dias do mês anterior - limitados ao fim daquele mês)."""
+        fim = np.datetime64(self.ultimo_dia if fim is None else fim, "D")
+        mes = fim.astype("datetime64[M]")
+        inicio_anterior = (mes - 1).astype("datetime64[D]")
+        dia_do_mes = (fim - mes.astype("datetime64[D]")).astype(np.int64)
+        fim_anterior = min(inicio_anterior + dia_do_mes, mes.astype("datetime64[D]") - 1)
+        return self.mes_ate_hoje(fim), self.janela(inicio_anterior, fim_anterior)
+
+    def movel(self, janelas=JANELAS):
+        """
+        DataFrame diário com Vendas e Score_Qualidade do dia e as médias móveis de cada janela
+        (Vendas por dia e Score médio das linhas da janela), por diferença das somas acumuladas.
+        """
+        vendas, score, contagem = self.somas["Vendas"], self.somas["Score_Soma"], self.somas["Contagem"]
+        fim = np.arange(1, len(self.dias) + 1)
+        df = pd.DataFrame({
+            "Data": self.dias,
+            "Vendas": np.diff(vendas),
+            "Score_Qualidade": _razao(np.diff(score), np.diff(contagem)),
+        })
+        for n in janelas:
+            inicio = np.maximum(fim - n, 0)
+            df[f"Vendas_MM{n}"] = (vendas[fim] - vendas[inicio]) / (fim - inicio)
+            df[f"Score_MM{n}"] = _razao(score[fim] - score[inicio], contagem[fim] - contagem[inicio])
+        return df
+
+
+def _razao(numerador, denominador):
+    return np.divide(numerador, denominador, out=np.full(len(numerador), np.nan), where=denominador > 0)
+
+
+def variacao(atual, anterior):
+    """Variação relativa (None quando o período anterior é zero ou vazio)."""
+    if not anterior or np.isnan(anterior):
+        return None
+    return atual / anterior - 1
@@ -0,0 +1 @@
+"""Fontes de dados e estatísticas do projeto de Logística (base pública da Olist)."""
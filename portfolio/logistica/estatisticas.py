@@ -0,0 +1,250 @@
+"""
+Estatísticas do lead time em fluxo (sem manter as linhas em memória).
+
+Os pedidos são lidos em lotes e cada lote atualiza acumuladores combináveis,
+um por (Ano, Status_Prazo):
+
+- contagem, média e variância (Welford, combinadas pela fórmula de Chan);
+- mínimo e máximo;
+- histograma de bins fixos de 1 dia (com um bin final de estouro);
+- sketch de quantis KLL para mediana e quartis.
+
+Como os acumuladores são combináveis, os filtros da página (anos e status)
+são respondidos juntando os acumuladores selecionados, sem reler dados.
+
+Uso (linha de comando):
+    python -m portfolio.logistica.estatisticas pedidos.parquet --lote 500000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# Bins de 1 dia de 0 a 365 e um último bin para tudo acima disso
+LIMITES_HISTOGRAMA = np.arange(0, 367, dtype=float)
+COLUNAS = ["Dias_Entrega", "Status_Prazo", "Ano"]
+
+
+class SketchKLL:
+    """
+    Sketch de quantis KLL (Karnin, Lang e Liberty): níveis de compactadores em
+    que cada item do nível h representa 2^h valores. Ao encher, um nível é
+    ordenado e metade dos itens (pares ou ímpares, ao acaso) sobe um nível.
+    Erro de posto ~ 1/k com memória O(k log(n/k)).
+    """
+
+    def __init__(self, k=2_000, seed=0):
+        self.k = k
+        self.niveis = [np.empty(0)]
+        self.n = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacidade(self, nivel):
+        # Níveis mais baixos (mais recentes) ficam menores: fator 2/3 por nível abaixo do topo
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.niveis) - 1 - nivel))))
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) > self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+                itens = np.sort(itens)
+                # Com número ímpar de itens, o último fica no nível atual
+                par = len(itens) - len(itens) % 2
+                subir = itens[self._rng.integers(0, 2):par:2]
+                self.niveis[nivel] = itens[par:]
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], subir])
+            nivel += 1
+
+    def atualizar(self, valores):
+        valores = np.asarray(valores, dtype=float)
+        if len(valores) == 0:
+            return self
+        self.n += len(valores)
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self._compactar()
+        return self
+
+    def combinar(self, outro):
+        novo = SketchKLL(self.k)
+        novo.n = self.n + outro.n
+        altura = max(len(self.niveis), len(outro.niveis))
+        novo.niveis = [
+            np.concatenate([
+                self.niveis[h] if h < len(self.niveis) else np.empty(0),
+                outro.niveis[h] if h < len(outro.niveis) else np.empty(0),
+            ])
+            for h in range(altura)
+        ]
+        novo._compactar()
+        return novo
+
+    def quantis(self, qs):
+        """Quantis `qs` (0 a 1), com a mesma interpolação linear do pandas sobre os itens ponderados."""
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        valores = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(itens), 2.0 ** h) for h, itens in enumerate(self.niveis)])
+        ordem = np.argsort(valores, kind="stable")
+        valores, pesos = valores[ordem], pesos[ordem]
+        # Posição (0 a n-1) do centro de cada item no ranking completo
+        posicao = (np.cumsum(pesos) - pesos) + (pesos - 1) / 2
+        return np.interp(np.asarray(qs, dtype=float) * (self.n - 1), posicao, valores)
+
+    @property
+    def itens(self):
+        return sum(len(itens) for itens in self.niveis)
+
+
+class Acumulador:
+    """Resumo combinável de uma série numérica (contagem, média, variância, extremos, histograma e quantis)."""
+
+    def __init__(self, limites=LIMITES_HISTOGRAMA, k=2_000):
+        self.limites = limites
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0  # Soma dos quadrados dos desvios (Welford)
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.contagens = np.zeros(len(limites), dtype=np.int64)  # len(limites)-1 bins + estouro
+        self.sketch = SketchKLL(k)
+
+    def _juntar_momentos(self, n, media, m2):
+        # Fórmula de Chan et al. para combinar (n, média, M2) de dois grupos
+        total = self.n + n
+        delta = media - self.media
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.media += delta * n / total
+        self.n = total
+
+    def atualizar(self, valores):
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+        media = valores.mean()
+        self._juntar_momentos(len(valores), media, ((valores - media) ** 2).sum())
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+        bins = np.clip(np.searchsorted(self.limites, valores, side="right") - 1, 0, len(self.limites) - 1)
+        self.contagens += np.bincount(bins, minlength=len(self.limites))
+        self.sketch.atualizar(valores)
+        return self
+
+    def combinar(self, outro):
+        novo = Acumulador(self.limites, self.sketch.k)
+        novo.n, novo.media, novo.m2 = self.n, self.media, self.m2
+        if outro.n:
+            novo._juntar_momentos(outro.n, outro.media, outro.m2)
+        novo.minimo = min(self.minimo, outro.minimo)
+        novo.maximo = max(self.maximo, outro.maximo)
+        novo.contagens = self.contagens + outro.contagens
+        novo.sketch = self.sketch.combinar(outro.sketch)
+        return novo
+
+    @property
+    def variancia(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+
+    def quantis(self, qs):
+        return self.sketch.quantis(qs)
+
+    def resumo(self):
+        """Mesmos campos do `describe()` do pandas."""
+        q1, q2, q3 = self.quantis([0.25, 0.5, 0.75]) if self.n else (np.nan,) * 3
+        return {
+            "count": self.n,
+            "mean": float(self.media) if self.n else np.nan,
+            "std": float(np.sqrt(self.variancia)) if self.n > 1 else np.nan,
+            "min": float(self.minimo) if self.n else np.nan,
+            "25%": float(q1),
+            "50%": float(q2),
+            "75%": float(q3),
+            "max": float(self.maximo) if self.n else np.nan,
+        }
+
+
+class EstatisticasLeadTime:
+    """Acumuladores de Dias_Entrega por (Ano, Status_Prazo), atualizados lote a lote."""
+
+    def __init__(self, limites=LIMITES_HISTOGRAMA, k=2_000):
+        self.limites = limites
+        self.k = k
+        self.grupos = {}
+        self.linhas = 0
+
+    def atualizar(self, df):
+        """Incorpora um lote com as colunas Dias_Entrega, Status_Prazo e Ano."""
+        if len(df) == 0:
+            return self
+        dias = df["Dias_Entrega"].to_numpy(dtype=float)
+        chaves = pd.MultiIndex.from_arrays([df["Ano"].to_numpy(), df["Status_Prazo"].astype(str).to_numpy()])
+        codigos, unicos = pd.factorize(chaves)
+        ordem = np.argsort(codigos, kind="stable")
+        cortes = np.flatnonzero(np.diff(codigos[ordem])) + 1
+        for (ano, status), posicoes in zip(unicos, np.split(ordem, cortes)):
+            chave = (int(ano), status)
+            if chave not in self.grupos:
+                self.grupos[chave] = Acumulador(self.limites, self.k)
+            self.grupos[chave].atualizar(dias[posicoes])
+        self.linhas += len(df)
+        return self
+
+    @classmethod
+    def de_lotes(cls, lotes, **kwargs):
+        estatisticas = cls(**kwargs)
+        for df in lotes:
+            estatisticas.atualizar(df)
+        return estatisticas
+
+    @property
+    def anos(self):
+        return sorted({ano for ano, _ in self.grupos})
+
+    @property
+    def status(self):
+        return sorted({status for _, status in self.grupos})
+
+    def combinar(self, anos=None, status=None):
+        """Acumulador único dos grupos selecionados (None = todos)."""
+        total = Acumulador(self.limites, self.k)
+        for (ano, st), acumulador in self.grupos.items():
+            if (anos is None or ano in anos) and (status is None or st in status):
+                total = total.combinar(acumulador)
+        return total
+
+    def por_status(self, anos=None):
+        return {st: self.combinar(anos, [st]) for st in self.status}
+
+    def resumo(self, anos=None):
+        return self.combinar(anos).resumo()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estatísticas do lead time em fluxo (Parquet ou CSV tratado).")
+    parser.add_argument("arquivo", help="Pedidos com Dias_Entrega, Status_Prazo e Ano (.parquet ou .csv)")
+    parser.add_argument("--lote", type=int, default=500_000, help="Linhas lidas por vez")
+    args = parser.parse_args(argv)
+
+    if args.arquivo.lower().endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        lotes = (b.to_pandas() for b in pq.ParquetFile(args.arquivo).iter_batches(args.lote, columns=COLUNAS))
+    else:
+        lotes = pd.read_csv(args.arquivo, usecols=COLUNAS, chunksize=args.lote)
+
+    inicio = time.perf_counter()
+    estatisticas = EstatisticasLeadTime.de_lotes(lotes)
+    segundos = time.perf_counter() - inicio
+    print(f"{estatisticas.linhas:,} pedidos em {segundos:.2f} s ({estatisticas.linhas / max(segundos, 1e-9):,.0f} linhas/s)")
+    for ano in estatisticas.anos:
+        r = estatisticas.resumo([ano])
+        print(f"{ano}: n={r['count']:,} média={r['mean']:.2f} dp={r['std']:.2f} "
+              f"q1={r['25%']:.1f} mediana={r['50%']:.1f} q3={r['75%']:.1f} máx={r['max']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Fonte local e cacheada da base pública da Olist (Brazilian E-Commerce).
+
+A origem é plugável: uma URL base (o GitHub da Olist por padrão, ou um servidor
+HTTP local em testes) ou uma pasta com os CSVs. Cada arquivo é lido uma única
+vez com tipos explícitos (`usecols`, `dtype` e formato fixo das datas) e
+convertido para Parquet em `<dados>/cache_olist/`, com a chave derivada do
+conteúdo (sha256). Nas cargas seguintes:
+
+- pasta local: se tamanho e data de modificação não mudaram, o Parquet é lido direto;
+- HTTP: um GET condicional (ETag / Last-Modified) evita baixar de novo; sem rede, usa o último
+  cache válido, então a página não fica vazia offline.
+
+Uso (linha de comando, mede carga fria e quente):
+    python -m portfolio.logistica.fonte
+    python -m portfolio.logistica.fonte /caminho/para/csvs
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from portfolio.armazenamento import DIRETORIO_PADRAO
+
+URL_OLIST = "https://raw.githubusercontent.com/olist/work-at-olist-data/master/datasets/"
+# Origem padrão (pode ser trocada pela variável de ambiente: URL base ou pasta local)
+ORIGEM_PADRAO = os.environ.get("OLIST_FONTE", URL_OLIST)
+DIRETORIO_CACHE = os.path.join(DIRETORIO_PADRAO, "cache_olist")
+
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+# Esquema de leitura de cada arquivo: colunas usadas, tipos e colunas de data
+ESQUEMAS = {
+    "olist_orders_dataset.csv": {
+        "usecols": [
+            "order_id", "customer_id", "order_status", "order_purchase_timestamp",
+            "order_delivered_customer_date", "order_estimated_delivery_date",
+        ],
+        "dtype": {"order_id": "string", "customer_id": "string", "order_status": "category"},
+        "datas": ["order_purchase_timestamp", "order_delivered_customer_date", "order_estimated_delivery_date"],
+    },
+    "olist_order_items_dataset.csv": {
+        "usecols": ["order_id", "order_item_id", "product_id", "seller_id", "price", "freight_value"],
+        "dtype": {"order_id": "string", "order_item_id": "int16", "product_id": "string", "seller_id": "string",
+                  "price": "float64", "freight_value": "float64"},
+        "datas": [],
+    },
+    "olist_customers_dataset.csv": {
+        "usecols": ["customer_id", "customer_state"],
+        "dtype": {"customer_id": "string", "customer_state": "category"},
+        "datas": [],
+    },
+    "olist_sellers_dataset.csv": {
+        "usecols": ["seller_id", "seller_state"],
+        "dtype": {"seller_id": "string", "seller_state": "category"},
+        "datas": [],
+    },
+    "olist_products_dataset.csv": {
+        "usecols": ["product_id", "product_category_name"],
+        "dtype": {"product_id": "string", "product_category_name": "category"},
+        "datas": [],
+    },
+}
+ARQUIVO_PEDIDOS = "olist_orders_dataset.csv"
+
+
+@dataclass
+class InfoCarga:
+    arquivo: str
+    origem: str   # URL ou caminho de onde o CSV veio
+    chave: str    # sha256 do conteúdo do CSV
+    modo: str     # 'download' / 'arquivo' (CSV lido e convertido), 'cache' (Parquet reaproveitado)
+                  # ou 'offline' (sem rede: último cache válido)
+    segundos: float
+    linhas: int
+    instante: float = field(default_factory=time.time)
+
+
+def _eh_url(origem):
+    return origem.startswith(("http://", "https://"))
+
+
+def _sha256(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def ler_csv(caminho, arquivo):
+    """
+    CSV tipado: só as colunas do esquema, categorias e datas com formato explícito.
+    O leitor do pyarrow (multithread) já converte as datas ISO; as que vierem como texto
+    são convertidas com o formato fixo, sem inferência linha a linha.
+    """
+    esquema = ESQUEMAS[arquivo]
+    df = pd.read_csv(caminho, usecols=esquema["usecols"], dtype=esquema["dtype"], engine="pyarrow")
+    for coluna in esquema["datas"]:
+        if not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = pd.to_datetime(df[coluna], format=FORMATO_DATA, errors="coerce")
+    return df
+
+
+class CacheOlist:
+    """Parquet por (arquivo, chave do conteúdo) e um índice com a validação de cada origem."""
+
+    def __init__(self, diretorio=None):
+        self.diretorio = diretorio or DIRETORIO_CACHE
+        self._indice_caminho = os.path.join(self.diretorio, "indice.json")
+        # Vários arquivos podem ser carregados em paralelo (threads) com o mesmo índice
+        self._trava = threading.Lock()
+
+    def caminho(self, arquivo, chave):
+        return os.path.join(self.diretorio, f"{arquivo.rsplit('.', 1)[0]}-{chave[:16]}.parquet")
+
+    def _indice(self):
+        try:
+            with open(self._indice_caminho, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _registrar(self, origem, **dados):
+        with self._trava:
+            indice = self._indice()
+            indice[origem] = dados
+            os.makedirs(self.diretorio, exist_ok=True)
+            temporario = f"{self._indice_caminho}.{os.getpid()}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(indice, f, indent=2)
+            os.replace(temporario, self._indice_caminho)
+
+    def _converter(self, csv, arquivo, chave):
+        df = ler_csv(csv, arquivo)
+        destino = self.caminho(arquivo, chave)
+        os.makedirs(self.diretorio, exist_ok=True)
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        df.to_parquet(temporario, index=False)
+        os.replace(temporario, destino)
+        return df
+
+    def _ler_cache(self, arquivo, chave):
+        caminho = self.caminho(arquivo, chave)
+        return pd.read_parquet(caminho) if os.path.exists(caminho) else None
+
+    def carregar(self, arquivo, origem=None, timeout=30):
+        """Retorna (DataFrame tipado, InfoCarga) de `arquivo` na origem (URL base ou pasta)."""
+        origem = origem or ORIGEM_PADRAO
+        inicio = time.perf_counter()
+        if _eh_url(origem):
+            df, chave, modo, local = self._carregar_url(arquivo, origem.rstrip("/") + "/" + arquivo, timeout)
+        else:
+            df, chave, modo, local = self._carregar_arquivo(arquivo, os.path.join(origem, arquivo))
+        return df, InfoCarga(arquivo, local, chave, modo, time.perf_counter() - inicio, len(df))
+
+    def _carregar_arquivo(self, arquivo, caminho):
+        estado = os.stat(caminho)
+        anterior = self._indice().get(caminho, {})
+        if anterior.get("tamanho") == estado.st_size and anterior.get("modificado") == estado.st_mtime:
+            df = self._ler_cache(arquivo, anterior["chave"])
+            if df is not None:
+                return df, anterior["chave"], "cache", caminho
+
+        chave = _sha256(caminho)
+        df = self._ler_cache(arquivo, chave)
+        modo = "cache"
+        if df is None:
+            df = self._converter(caminho, arquivo, chave)
+            modo = "arquivo"
+        self._registrar(caminho, chave=chave, tamanho=estado.st_size, modificado=estado.st_mtime)
+        return df, chave, modo, caminho
+
+    def _carregar_url(self, arquivo, url, timeout):
+        anterior = self._indice().get(url, {})
+        pedido = urllib.request.Request(url)
+        if anterior and os.path.exists(self.caminho(arquivo, anterior["chave"])):
+            if anterior.get("etag"):
+                pedido.add_header("If-None-Match", anterior["etag"])
+            if anterior.get("modificado"):
+                pedido.add_header("If-Modified-Since", anterior["modificado"])
+        try:
+            with urllib.request.urlopen(pedido, timeout=timeout) as resposta:
+                with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+                    while bloco := resposta.read(1 << 20):
+                        f.write(bloco)
+                etag = resposta.headers.get("ETag")
+                modificado = resposta.headers.get("Last-Modified")
+        except urllib.error.HTTPError as erro:
+            if erro.code == 304:
+                return self._ler_cache(arquivo, anterior["chave"]), anterior["chave"], "cache", url
+            raise
+        except (urllib.error.URLError, TimeoutError, OSError):
+            # Sem rede: usa o último Parquet válido desta URL, se houver
+            df = self._ler_cache(arquivo, anterior["chave"]) if anterior else None
+            if df is None:
+                raise
+            return df, anterior["chave"], "offline", url
+
+        try:
+            chave = _sha256(f.name)
+            df = self._ler_cache(arquivo, chave)
+            modo = "cache"
+            if df is None:
+                df = self._converter(f.name, arquivo, chave)
+                modo = "download"
+        finally:
+            os.remove(f.name)
+        self._registrar(url, chave=chave, etag=etag, modificado=modificado)
+        return df, chave, modo, url
+
+
+def preparar_pedidos(df, manter=()):
+    """
+    Lead time dos pedidos entregues: Dias_Entrega, Status_Prazo e Ano da compra (vetorizado).
+    `manter` são colunas do CSV levadas junto (ex.: customer_id, para a junção com os clientes).
+    """
+    entregues = df[
+        (df["order_status"] == "delivered")
+        & df["order_delivered_customer_date"].notna()
+        & df["order_purchase_timestamp"].notna()
+    ]
+    atrasado = (entregues["order_delivered_customer_date"] > entregues["order_estimated_delivery_date"]).to_numpy()
+    return pd.DataFrame({
+        "order_id": entregues["order_id"].to_numpy(),
+        "order_status": entregues["order_status"].to_numpy(),
+        "Dias_Entrega": (entregues["order_delivered_customer_date"] - entregues["order_purchase_timestamp"]).dt.days.to_numpy(),
+        "Status_Prazo": pd.Categorical.from_codes(atrasado.astype("int8"), categories=["No Prazo", "Atrasado"]),
+        "order_purchase_timestamp": entregues["order_purchase_timestamp"].to_numpy(),
+        "Ano": entregues["order_purchase_timestamp"].dt.year.to_numpy(),
+        **{coluna: entregues[coluna].to_numpy() for coluna in manter},
+    })
+
+
+def carregar_pedidos(origem=None, cache=None):
+    """Pedidos da Olist tipados (DataFrame, InfoCarga), com cache local."""
+    return (cache or CacheOlist()).carregar(ARQUIVO_PEDIDOS, origem)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga cacheada da base da Olist (mede carga fria e quente).")
+    parser.add_argument("origem", nargs="?", default=ORIGEM_PADRAO, help="URL base ou pasta com os CSVs")
+    parser.add_argument("--arquivo", default=ARQUIVO_PEDIDOS, choices=sorted(ESQUEMAS))
+    args = parser.parse_args(argv)
+
+    # Carga fria num cache vazio, para não depender do que já existe em disco
+    with tempfile.TemporaryDirectory() as pasta:
+        cache = CacheOlist(pasta)
+        # Caminho original da página: todas as colunas como texto e datas inferidas
+        inicio = time.perf_counter()
+        bruto = pd.read_csv(args.origem.rstrip("/") + "/" + args.arquivo if _eh_url(args.origem)
+                            else os.path.join(args.origem, args.arquivo))
+        for coluna in ESQUEMAS[args.arquivo]["datas"]:
+            bruto[coluna] = pd.to_datetime(bruto[coluna], errors="coerce")
+        segundos_ingenuo = time.perf_counter() - inicio
+        _, frio = cache.carregar(args.arquivo, args.origem)
+        _, quente = cache.carregar(args.arquivo, args.origem)
+
+    print(f"{frio.linhas:,} linhas | chave {frio.chave[:16]}")
+    print(f"original (read_csv sem tipos + to_datetime): {segundos_ingenuo * 1000:.1f} ms")
+    print(f"carga fria ({frio.modo}): {frio.segundos * 1000:.1f} ms")
+    print(f"carga quente ({quente.modo}): {quente.segundos * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
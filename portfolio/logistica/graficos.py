@@ -0,0 +1,109 @@
+"""
+Figuras do lead time montadas a partir de resumos, não das linhas.
+
+O histograma recebe só as contagens por bin e o box plot só os quartis, as
+cercas de Tukey e os valores distintos fora delas (com a quantidade de pedidos
+em cada um). O JSON enviado ao navegador passa a ter o tamanho do resumo
+(algumas centenas de números), e não o de ~100 mil pedidos.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from portfolio.preguicoso import importar_preguicoso
+
+# Plotly Express só é usado na comparação com as figuras sobre as linhas brutas
+px = importar_preguicoso("plotly.express")
+
+COR_HISTOGRAMA = "#00a65a"
+# Paleta padrão do Plotly (px.colors.qualitative.Plotly), a mesma do px.box original
+CORES_STATUS = ["#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A", "#19D3F3", "#FF6692", "#B6E880", "#FF97FF", "#FECB52"]
+
+
+def resumo_histograma(acumulador):
+    """(início do bin, contagem) até o último bin com pedidos; o bin de estouro vai para o valor máximo."""
+    contagens = acumulador.contagens
+    ultimo = np.flatnonzero(contagens)
+    if len(ultimo) == 0:
+        return pd.DataFrame({"Dias_Entrega": [], "Pedidos": []})
+    ultimo = ultimo[-1]
+    inicio = acumulador.limites[: ultimo + 1].copy()
+    if ultimo == len(contagens) - 1:
+        inicio[-1] = acumulador.maximo
+    return pd.DataFrame({"Dias_Entrega": inicio, "Pedidos": contagens[: ultimo + 1]})
+
+
+def resumo_box(acumulador):
+    """Quartis, cercas de Tukey (1,5 x IQR, ajustadas ao valor observado mais próximo) e outliers agrupados por valor."""
+    q1, mediana, q3 = acumulador.quantis([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    hist = resumo_histograma(acumulador)
+    valores = hist["Dias_Entrega"].to_numpy()
+    presentes = hist["Pedidos"].to_numpy() > 0
+    dentro = presentes & (valores >= q1 - 1.5 * iqr) & (valores <= q3 + 1.5 * iqr)
+    fora = presentes & ~dentro
+    return {
+        "q1": q1, "mediana": mediana, "q3": q3, "media": acumulador.media,
+        "cerca_inferior": valores[dentro].min() if dentro.any() else q1,
+        "cerca_superior": valores[dentro].max() if dentro.any() else q3,
+        "outliers": hist[fora].reset_index(drop=True),
+    }
+
+
+def figura_histograma(acumulador, titulo="Distribuição Real dos Prazos de Entrega"):
+    hist = resumo_histograma(acumulador)
+    fig = go.Figure(go.Bar(
+        x=hist["Dias_Entrega"] + 0.5, y=hist["Pedidos"], width=1.0,
+        marker_color=COR_HISTOGRAMA, name="Pedidos",
+        hovertemplate="%{customdata} dias: %{y:,} pedidos<extra></extra>", customdata=hist["Dias_Entrega"],
+    ))
+    fig.update_layout(title=titulo, xaxis_title="Dias_Entrega", yaxis_title="Quantidade de Pedidos", bargap=0)
+    return fig
+
+
+def figura_box(por_status, titulo="Dispersão: Entregas no Prazo vs. Atrasadas"):
+    """Um box por status (estatísticas pré-calculadas) e os outliers como pontos, um por valor distinto."""
+    fig = go.Figure()
+    for i, (status, acumulador) in enumerate(por_status.items()):
+        if acumulador.n == 0:
+            continue
+        r = resumo_box(acumulador)
+        cor = CORES_STATUS[i % len(CORES_STATUS)]
+        fig.add_trace(go.Box(
+            x=[status], q1=[r["q1"]], median=[r["mediana"]], q3=[r["q3"]], mean=[r["media"]],
+            lowerfence=[r["cerca_inferior"]], upperfence=[r["cerca_superior"]],
+            name=status, marker_color=cor, legendgroup=status, boxpoints=False,
+        ))
+        if len(r["outliers"]):
+            fig.add_trace(go.Scatter(
+                x=[status] * len(r["outliers"]), y=r["outliers"]["Dias_Entrega"], mode="markers",
+                marker=dict(color=cor, size=5), name=f"{status} (outliers)", legendgroup=status, showlegend=False,
+                customdata=r["outliers"]["Pedidos"], hovertemplate="%{y} dias: %{customdata:,} pedidos<extra></extra>",
+            ))
+    fig.update_layout(title=titulo, xaxis_title="Status_Prazo", yaxis_title="Dias_Entrega", legend_title_text="Status_Prazo")
+    return fig
+
+
+def _medir(montar):
+    inicio = time.perf_counter()
+    payload = montar().to_json()
+    return round(len(payload.encode()) / 1024, 1), round((time.perf_counter() - inicio) * 1000, 1)
+
+
+def medir_figuras(df, acumulador, por_status):
+    """Payload (KB) e tempo de montagem + serialização: figuras com as linhas brutas vs. com os resumos."""
+    casos = {
+        ("Histograma", "Linhas brutas (px.histogram)"):
+            lambda: px.histogram(df, x="Dias_Entrega", nbins=100, color_discrete_sequence=[COR_HISTOGRAMA]),
+        ("Histograma", "Resumo (contagens por bin)"): lambda: figura_histograma(acumulador),
+        ("Box Plot", "Linhas brutas (px.box)"):
+            lambda: px.box(df, x="Status_Prazo", y="Dias_Entrega", color="Status_Prazo", points="outliers"),
+        ("Box Plot", "Resumo (quartis + outliers)"): lambda: figura_box(por_status),
+    }
+    linhas = []
+    for (figura, versao), montar in casos.items():
+        kb, ms = _medir(montar)
+        linhas.append({"Figura": figura, "Versão": versao, "Payload (KB)": kb, "Montagem + Serialização (ms)": ms})
+    return pd.DataFrame(linhas)
@@ -0,0 +1,165 @@
+"""
+Base relacional da Olist (pedidos, itens, clientes, vendedores e produtos)
+desnormalizada em uma tabela fato: um item de pedido entregue por linha.
+
+- Os cinco CSVs são carregados em paralelo num pool de threads, cada um pelo
+  cache Parquet de `fonte` (download, leitura do pyarrow e gravação liberam o GIL).
+- As chaves de texto (hashes de 32 caracteres) viram códigos inteiros uma única
+  vez por tabela de dimensão; as junções são feitas por posição nesses códigos
+  (`take`), sem hash joins de strings.
+- O fato é gravado no `Armazem` particionado por ano, com nome derivado das
+  versões (sha256) dos cinco arquivos: só é remontado quando algum CSV muda.
+
+Uso (linha de comando, compara carga sequencial e paralela):
+    python -m portfolio.logistica.relacional /caminho/para/csvs
+"""
+import argparse
+import hashlib
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from portfolio.logistica.fonte import ARQUIVO_PEDIDOS, ORIGEM_PADRAO, CacheOlist, preparar_pedidos
+
+ARQUIVOS = {
+    "pedidos": ARQUIVO_PEDIDOS,
+    "itens": "olist_order_items_dataset.csv",
+    "clientes": "olist_customers_dataset.csv",
+    "vendedores": "olist_sellers_dataset.csv",
+    "produtos": "olist_products_dataset.csv",
+}
+# Dimensões de análise do lead time (rótulo na página -> coluna do fato)
+DIMENSOES = {
+    "Estado do Cliente": "customer_state",
+    "Vendedor": "seller_id",
+    "Categoria do Produto": "product_category_name",
+}
+SEM_CATEGORIA = "sem_categoria"
+
+
+def carregar_tabelas(origem=None, cache=None, paralelo=True):
+    """({nome: DataFrame}, {nome: InfoCarga}) dos cinco arquivos, carregados em paralelo."""
+    cache = cache or CacheOlist()
+    if paralelo:
+        with ThreadPoolExecutor(len(ARQUIVOS)) as pool:
+            futuros = {nome: pool.submit(cache.carregar, arquivo, origem) for nome, arquivo in ARQUIVOS.items()}
+            resultados = {nome: futuro.result() for nome, futuro in futuros.items()}
+    else:
+        resultados = {nome: cache.carregar(arquivo, origem) for nome, arquivo in ARQUIVOS.items()}
+    return {nome: df for nome, (df, _) in resultados.items()}, {nome: info for nome, (_, info) in resultados.items()}
+
+
+def chave_fato(infos):
+    """Versão do fato: hash das chaves (sha256 do conteúdo) dos cinco arquivos."""
+    return hashlib.sha256("|".join(infos[nome].chave for nome in ARQUIVOS).encode()).hexdigest()
+
+
+def codificar(chaves, vocabulario):
+    """Código inteiro de cada chave = posição em `vocabulario` (chaves únicas); -1 se não existir."""
+    return pd.Index(vocabulario).get_indexer(chaves).astype(np.int32)
+
+
+def _levar(codigos, coluna):
+    """Coluna da dimensão levada ao fato pelos códigos (categórica; -1 vira ausente)."""
+    categorias = pd.Categorical(coluna)
+    valores = categorias.codes[np.where(codigos >= 0, codigos, 0)] if len(categorias) else np.full(len(codigos), -1)
+    return pd.Categorical.from_codes(np.where(codigos >= 0, valores, -1), categories=categorias.categories)
+
+
+def montar_fato(tabelas):
+    """Itens dos pedidos entregues com lead time, estado do cliente, vendedor e categoria do produto."""
+    pedidos = preparar_pedidos(tabelas["pedidos"], manter=["customer_id"])
+    itens = tabelas["itens"]
+    clientes = tabelas["clientes"].drop_duplicates("customer_id")
+    vendedores = tabelas["vendedores"].drop_duplicates("seller_id")
+    produtos = tabelas["produtos"].drop_duplicates("product_id")
+
+    # Chaves de texto -> códigos (posição na tabela de dimensão), uma vez por tabela
+    cod_pedido = codificar(itens["order_id"], pedidos["order_id"])
+    itens = itens[cod_pedido >= 0]
+    cod_pedido = cod_pedido[cod_pedido >= 0]
+    cod_cliente = codificar(pedidos["customer_id"], clientes["customer_id"])
+    cod_vendedor = codificar(itens["seller_id"], vendedores["seller_id"])
+    cod_produto = codificar(itens["product_id"], produtos["product_id"])
+
+    # Junções por posição: pedido -> cliente, item -> pedido, item -> vendedor, item -> produto
+    estado_cliente = _levar(cod_cliente, clientes["customer_state"])
+    categoria = _levar(cod_produto, produtos["product_category_name"].astype("string"))
+    if SEM_CATEGORIA not in categoria.categories:
+        categoria = categoria.add_categories(SEM_CATEGORIA)
+    return pd.DataFrame({
+        "order_id": pedidos["order_id"].to_numpy()[cod_pedido],
+        "order_item_id": itens["order_item_id"].to_numpy(),
+        "Cod_Pedido": cod_pedido,
+        "Dias_Entrega": pedidos["Dias_Entrega"].to_numpy()[cod_pedido],
+        "Status_Prazo": pedidos["Status_Prazo"].array.take(cod_pedido),
+        "Ano": pedidos["Ano"].to_numpy()[cod_pedido],
+        "order_purchase_timestamp": pedidos["order_purchase_timestamp"].to_numpy()[cod_pedido],
+        "customer_state": estado_cliente.take(cod_pedido),
+        "seller_id": pd.Categorical.from_codes(np.where(cod_vendedor >= 0, cod_vendedor, -1),
+                                               categories=pd.Index(vendedores["seller_id"].astype(str))),
+        "seller_state": _levar(cod_vendedor, vendedores["seller_state"]),
+        "product_category_name": categoria.fillna(SEM_CATEGORIA),
+        "price": itens["price"].to_numpy(),
+        "freight_value": itens["freight_value"].to_numpy(),
+    })
+
+
+def carregar_fato(armazem, origem=None, cache=None):
+    """Nome do dataset do fato no `armazem` (montado e gravado só se a versão dos CSVs for nova) e as InfoCarga."""
+    tabelas, infos = carregar_tabelas(origem, cache)
+    nome = f"olist_fato_{chave_fato(infos)[:16]}"
+    armazem.obter_ou_gravar(nome, lambda: montar_fato(tabelas), particoes=["Ano"])
+    return nome, infos
+
+
+def lead_time_por(fato, dimensao):
+    """
+    Pedidos, lead time (médio e mediano) e taxa de atraso por membro de `dimensao`.
+    Cada pedido conta uma vez por membro (um pedido com dois itens do mesmo vendedor vale 1).
+    """
+    base = fato[["Cod_Pedido", dimensao, "Dias_Entrega", "Status_Prazo"]].drop_duplicates(["Cod_Pedido", dimensao])
+    return (
+        base.assign(Atrasado=(base["Status_Prazo"] == "Atrasado").astype(float))
+        .groupby(dimensao, observed=True)
+        .agg(Pedidos=("Cod_Pedido", "size"), Lead_Time_Medio=("Dias_Entrega", "mean"),
+             Lead_Time_Mediano=("Dias_Entrega", "median"), Taxa_Atraso=("Atrasado", "mean"))
+        .sort_values("Pedidos", ascending=False)
+        .reset_index()
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga da base relacional da Olist (sequencial vs. paralela).")
+    parser.add_argument("origem", nargs="?", default=ORIGEM_PADRAO, help="URL base ou pasta com os CSVs")
+    args = parser.parse_args(argv)
+
+    # Carga fria em caches vazios, um para cada modo
+    tempos = {}
+    for paralelo in (False, True):
+        with tempfile.TemporaryDirectory() as pasta:
+            inicio = time.perf_counter()
+            tabelas, infos = carregar_tabelas(args.origem, CacheOlist(pasta), paralelo=paralelo)
+            tempos[paralelo] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    fato = montar_fato(tabelas)
+    segundos_fato = time.perf_counter() - inicio
+
+    for nome, info in infos.items():
+        print(f"{nome:<10} {info.linhas:>9,} linhas | {info.segundos * 1000:7.1f} ms ({info.modo})")
+    print(f"carga sequencial: {tempos[False] * 1000:.1f} ms | paralela: {tempos[True] * 1000:.1f} ms")
+    print(f"fato: {len(fato):,} itens entregues em {segundos_fato * 1000:.1f} ms "
+          f"({fato.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+    for rotulo, coluna in DIMENSOES.items():
+        r = lead_time_por(fato, coluna)
+        print(f"{rotulo}: {len(r)} membros | maior volume: {r.iloc[0][coluna]} "
+              f"({r.iloc[0]['Pedidos']:,} pedidos, {r.iloc[0]['Lead_Time_Medio']:.1f} dias, "
+              f"{r.iloc[0]['Taxa_Atraso']:.1%} atrasados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+Runtime comum das páginas Streamlit.
+
+- `recursos`: registro das funções cacheadas de dados e modelos, com ganchos de aquecimento;
+- `memoria`: memória compartilhada dos recursos (uma cópia por processo, visões sem cópia, orçamento e LRU);
+- `ativos`: leitura cacheada de READMEs e outros arquivos estáticos;
+- `tabelas`: top-N por seleção parcial e tabelas paginadas no servidor;
+- `rastreio`: instrumentação opcional (etapas, cache e gráficos de cada execução) e o painel de diagnóstico;
+- `perfil`: perfil de importação e de primeira execução de cada página;
+- um módulo por projeto (`churn`, `geo`, `auditoria`, `kpi`, `logistica`) com os recursos da página.
+"""
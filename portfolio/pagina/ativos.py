@@ -0,0 +1,44 @@
+"""
+Arquivos estáticos das páginas (READMEs), lidos uma vez e cacheados.
+
+O conteúdo fica em cache pela data de modificação do arquivo: cada interação
+custa só um `os.stat`, e uma edição no README aparece na próxima execução.
+Caminhos relativos são resolvidos a partir da raiz do repositório, então a
+página funciona qualquer que seja a pasta de onde o Streamlit foi iniciado.
+"""
+import os
+
+import streamlit as st
+
+from portfolio.pagina.rastreio import etapa
+from portfolio.pagina.recursos import recurso
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def caminho_ativo(caminho):
+    return caminho if os.path.isabs(caminho) else os.path.join(RAIZ, caminho)
+
+
+@recurso("ativos.texto", tipo="dados", show_spinner=False, max_entries=64)
+def _ler(caminho, modificado):
+    with open(caminho, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def ler_texto(caminho):
+    """Conteúdo do arquivo (cacheado pela data de modificação). FileNotFoundError se não existir."""
+    caminho = caminho_ativo(caminho)
+    return _ler(caminho, os.stat(caminho).st_mtime_ns)
+
+
+def exibir_readme(caminho):
+    with etapa("README"):
+        try:
+            conteudo = ler_texto(caminho)
+        except FileNotFoundError:
+            st.error("Documentação não encontrada.")
+            return
+        # Usamos um expander "fechado" para não esticar demais a página
+        with st.expander("📖 Detalhes Técnicos e Metodologia (README)", expanded=False):
+            st.markdown(conteudo)
@@ -0,0 +1,79 @@
+"""
+Recursos da página de auditoria: transações sintéticas, pré-filtro de regras, Isolation Forest
+global e motor segmentado.
+"""
+import numpy as np
+
+from portfolio import sintetico
+from portfolio.auditoria.modelo import ajustar_floresta
+from portfolio.auditoria.regras import SCORE_DECIDIDO, aplicar_regras
+from portfolio.auditoria.segmentos import MotorSegmentado
+from portfolio.pagina.recursos import aquecimento, recurso
+
+# Volumes disponíveis para teste de carga do painel
+VOLUMES = [500, 5_000, 50_000, 500_000, 5_000_000]
+VOLUME_PADRAO = 500
+
+# O modelo olha apenas para o 'Valor' neste exemplo simples
+# Em casos reais, olharia Categoria, Hora, etc.
+FEATURES = ['Valor']
+
+
+@recurso("auditoria.transacoes", tipo="dados")
+def gerar_transacoes(n_transacoes=500):
+    # Transações "normais" (média R$ 1.200) com ~3% de anomalias injetadas (R$ 5.000 a R$ 15.000).
+    # Volumes maiores mantêm o mesmo período (~500 horas), com mais transações por hora.
+    return sintetico.gerar_transacoes(n_transacoes, seed=42, por_hora=max(1, n_transacoes // 500))
+
+
+@recurso("auditoria.modelo", show_spinner="Treinando Isolation Forest...")
+def ajustar_modelo(n_transacoes):
+    # Isolation Forest: Algoritmo excelente para achar outliers sem treino prévio
+    # Ajustado uma única vez por base (compartilhado entre sessões)
+    return ajustar_floresta(gerar_transacoes(n_transacoes)[FEATURES])
+
+
+@recurso("auditoria.scores", tipo="dados", show_spinner="Pontuando transações...")
+def calcular_scores(n_transacoes):
+    # Scores brutos de isolamento: quanto menor, mais anômala a transação
+    return ajustar_modelo(n_transacoes).score_samples(gerar_transacoes(n_transacoes)[FEATURES])
+
+
+# Versão multivariada: um modelo por (Departamento, Categoria) com valor, horário e dia da semana,
+# ajustados em paralelo (pool de processos). Segmentos pequenos caem no modelo global.
+@recurso("auditoria.motor_segmentado", show_spinner="Treinando um modelo por segmento...")
+def ajustar_motor_segmentado(n_transacoes):
+    return MotorSegmentado().fit(gerar_transacoes(n_transacoes))
+
+
+@recurso("auditoria.scores_segmentados", tipo="dados", show_spinner="Pontuando transações por segmento...")
+def calcular_scores_segmentados(n_transacoes):
+    return ajustar_motor_segmentado(n_transacoes).pontuar(gerar_transacoes(n_transacoes))
+
+
+# Pré-filtro: regras determinísticas O(n) antes da floresta. Só o residual (ambíguo) é pontuado;
+# as transações decididas pelas regras recebem SCORE_DECIDIDO e ficam fora do limiar, que é o
+# quantil só dos scores do residual (`detectar_anomalias(..., candidatos=regras.residual)`).
+@recurso("auditoria.regras", tipo="dados", show_spinner="Aplicando regras de auditoria...")
+def avaliar_regras(n_transacoes):
+    return aplicar_regras(gerar_transacoes(n_transacoes))
+
+
+@recurso("auditoria.scores_residuais", tipo="dados", show_spinner="Pontuando o residual das regras...")
+def calcular_scores_residuais(n_transacoes, segmentado=False):
+    df = gerar_transacoes(n_transacoes)
+    residual = avaliar_regras(n_transacoes).residual
+    scores = np.full(len(df), SCORE_DECIDIDO)
+    if not residual.any():
+        return scores  # as regras decidiram todas as transações: não há o que pontuar
+    if segmentado:
+        scores[residual] = ajustar_motor_segmentado(n_transacoes).pontuar(df[residual])
+    else:
+        scores[residual] = ajustar_modelo(n_transacoes).score_samples(df.loc[residual, FEATURES])
+    return scores
+
+
+@aquecimento("auditoria")
+def aquecer():
+    # Só o motor padrão da tela (com o pré-filtro); o segmentado (pool de processos) é ajustado quando escolhido
+    calcular_scores_residuais(VOLUME_PADRAO)
@@ -0,0 +1,50 @@
+"""Recursos da página de churn: base Telco, pipeline do registro de modelos e simulador pré-calculado."""
+from portfolio.churn.inferencia import InferenciaRapida
+from portfolio.churn.pipeline import (
+    CAMINHO_TELCO, COLUNA_ALVO, COLUNA_ID, NOME_MODELO, PipelineChurn, alvo, carregar_telco, params_modelo, perfil_base,
+)
+from portfolio.pagina.recursos import aquecimento, recurso
+from portfolio.registro import RegistroModelos, calcular_chave
+
+
+# --- 1. CARREGAR A BASE REAL (Telco: 7.043 clientes, 21 colunas) ---
+@recurso("churn.base", tipo="dados", show_spinner="Lendo base Telco...")
+def carregar_base():
+    # Leitura tipada e vetorizada (categorias fixas + coerção do TotalCharges)
+    return carregar_telco(CAMINHO_TELCO)
+
+
+def entradas_modelo(df):
+    """Features, alvo e perfil típico do cliente (valores padrão do simulador)."""
+    X = df.drop(columns=[COLUNA_ID, COLUNA_ALVO])
+    return X, alvo(df), perfil_base(X)
+
+
+# --- 2. TREINAR O MODELO (uma vez por versão dos dados/hiperparâmetros) ---
+@recurso("churn.modelo", show_spinner="Carregando modelo de churn...")
+def carregar_modelo(chave, _X, _y, _params):
+    # Cache de processo: todas as sessões compartilham o mesmo pipeline (codificação + floresta).
+    # A chave (hash dos dados + parâmetros) é o que decide se há retreino; com os parâmetros
+    # promovidos pela busca (portfolio.churn.busca), o artefato já está no registro.
+    return RegistroModelos().carregar_ou_treinar(
+        NOME_MODELO, PipelineChurn, _X, _y, _params, chave=chave
+    )
+
+
+def modelo_servido(X, y):
+    """(pipeline, InfoModelo) com os hiperparâmetros promovidos (ou os padrão)."""
+    params = params_modelo()
+    return carregar_modelo(calcular_chave(X, y, params), X, y, params)
+
+
+@recurso("churn.inferencia", show_spinner="Preparando simulador...")
+def carregar_inferencia(chave, _pipeline, _perfil):
+    # Floresta compilada em arrays + grade com todas as combinações dos controles
+    return InferenciaRapida(_pipeline, _perfil)
+
+
+@aquecimento("churn")
+def aquecer():
+    X, y, perfil = entradas_modelo(carregar_base())
+    modelo, info_modelo = modelo_servido(X, y)
+    carregar_inferencia(info_modelo.chave, modelo, perfil)
@@ -0,0 +1,89 @@
+"""Recursos da página de geomarketing: base geográfica em Parquet, camadas do mapa, cobertura e expansão."""
+from portfolio.armazenamento import Armazem
+from portfolio.geo.cobertura import (
+    LIMIAR_PONTO_A_PONTO, RESOLUCAO_AGREGADA_KM, calcular_cobertura, demanda_por_zona, vazios_de_mercado,
+)
+from portfolio.geo.expansao import selecionar_novas_lojas
+from portfolio.geo.mapa import preparar_niveis
+from portfolio.pagina.recursos import aquecimento, recurso
+from portfolio.sintetico import gerar_dados_geo
+
+# Volume da simulação (55 bairros / 18 lojas reproduz o cenário original) e controles padrão da tela
+PONTOS_DEMANDA = [55, 10_000, 100_000, 1_000_000]
+LOJAS = [18, 180, 1_000, 10_000]
+N_BAIRROS_PADRAO, N_LOJAS_PADRAO = 55, 18
+RAIO_PADRAO_KM = 1.5
+NOVAS_LOJAS_PADRAO = 3
+
+
+# FUNÇÃO GERADORA DE DADOS (COM CORREÇÃO GEOGRÁFICA)
+def gerar_dados_belem_ananindeua_v2(n_bairros=55, n_lojas=18):
+    """
+    Gera dados fictícios restritos às manchas urbanas reais de Belém e Ananindeua.
+    Técnica: Geração baseada em Centroides de Bairros Reais com ajuste fino para evitar áreas de água.
+    A geração é vetorizada (portfolio.sintetico) e escala de dezenas a milhões de pontos.
+    """
+    return gerar_dados_geo(n_bairros, n_lojas, seed=42)
+
+
+# ARMAZENAMENTO COLUNAR (Parquet na pasta dados/, bairros particionados por Zona)
+# Gravado uma única vez; o filtro de zonas é aplicado pelo leitor, que só abre as partições selecionadas.
+armazem = Armazem()
+COLUNAS_DEMANDA = ['Latitude', 'Longitude', 'Populacao', 'Renda_Media']
+
+
+@recurso("geo.datasets", show_spinner="Gravando a base geográfica em Parquet...")
+def datasets_geo(n_bairros, n_lojas):
+    bairros, lojas = f"geo_bairros_{n_bairros}_s42", f"geo_lojas_{n_bairros}_{n_lojas}_s42"
+    if not (armazem.existe(bairros) and armazem.existe(lojas)):
+        df_pop, df_lojas = gerar_dados_belem_ananindeua_v2(n_bairros, n_lojas)
+        armazem.gravar(bairros, df_pop, particoes=['Zona'])
+        armazem.gravar(lojas, df_lojas)
+    return bairros, lojas
+
+
+def ler_bairros(n_bairros, n_lojas, zonas=None, colunas=None):
+    filtros = {'Zona': None if zonas is None else list(zonas)}
+    return armazem.ler(datasets_geo(n_bairros, n_lojas)[0], colunas, filtros)
+
+
+@recurso("geo.lojas", tipo="dados")
+def ler_lojas(n_bairros, n_lojas):
+    return armazem.ler(datasets_geo(n_bairros, n_lojas)[1])
+
+
+def zonas_disponiveis(n_bairros, n_lojas):
+    # As zonas vêm dos nomes das partições, sem ler os dados
+    return armazem.valores_particao(datasets_geo(n_bairros, n_lojas)[0], 'Zona')
+
+
+# CAMADAS AGREGADAS DO MAPA (uma grade por nível de detalhe, cacheadas por seleção de zonas)
+@recurso("geo.niveis", tipo="dados", show_spinner="Agregando demanda para o mapa...", max_entries=32)
+def niveis_do_mapa(zonas, n_bairros, n_lojas):
+    return preparar_niveis(ler_bairros(n_bairros, n_lojas, zonas, COLUNAS_DEMANDA))
+
+
+# ANÁLISE DE COBERTURA (cacheada por seleção de zonas, raio e volume)
+@recurso("geo.cobertura", tipo="dados", show_spinner="Calculando cobertura das lojas...", max_entries=32)
+def analisar_cobertura(zonas, raio_km, n_bairros, n_lojas):
+    df_lojas = ler_lojas(n_bairros, n_lojas)
+    df_filtrado = ler_bairros(n_bairros, n_lojas, zonas)
+    resolucao = None if len(df_filtrado) <= LIMIAR_PONTO_A_PONTO else RESOLUCAO_AGREGADA_KM
+    resultado = calcular_cobertura(df_filtrado, df_lojas, raio_km, resolucao_km=resolucao)
+    return resultado, vazios_de_mercado(df_filtrado, resultado), demanda_por_zona(df_filtrado, resultado)
+
+
+# SELEÇÃO DE NOVOS PONTOS (guloso preguiçoso de cobertura máxima, cacheado por filtro)
+@recurso("geo.novas_lojas", tipo="dados", show_spinner="Buscando os melhores pontos para novas lojas...", max_entries=32)
+def sugerir_novas_lojas(zonas, raio_km, k, n_bairros, n_lojas):
+    df_demanda = ler_bairros(n_bairros, n_lojas, zonas, COLUNAS_DEMANDA)
+    return selecionar_novas_lojas(df_demanda, ler_lojas(n_bairros, n_lojas), k, raio_km)
+
+
+@aquecimento("geo")
+def aquecer():
+    # Mesmos argumentos da primeira execução da tela (todas as zonas, raio e novas lojas padrão)
+    zonas = tuple(sorted(zonas_disponiveis(N_BAIRROS_PADRAO, N_LOJAS_PADRAO)))
+    niveis_do_mapa(zonas, N_BAIRROS_PADRAO, N_LOJAS_PADRAO)
+    analisar_cobertura(zonas, RAIO_PADRAO_KM, N_BAIRROS_PADRAO, N_LOJAS_PADRAO)
+    sugerir_novas_lojas(zonas, RAIO_PADRAO_KM, NOVAS_LOJAS_PADRAO, N_BAIRROS_PADRAO, N_LOJAS_PADRAO)
@@ -0,0 +1,41 @@
+"""Recursos da página de KPIs: base de vendas em Parquet e cubo pré-agregado."""
+from portfolio import sintetico
+from portfolio.armazenamento import Armazem
+from portfolio.kpi.cubo import CuboVendas
+from portfolio.pagina.recursos import aquecimento, recurso
+
+# Volumes disponíveis para teste de carga do painel
+VOLUMES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+VOLUME_PADRAO = 1_000
+
+# Base em Parquet particionado por Região/Categoria (pasta dados/), gravada uma única vez
+armazem = Armazem()
+COLUNAS_CUBO = ['Data', 'Região', 'Categoria', 'Vendas', 'Lucro', 'Score_Qualidade']
+
+
+def gerar_dados_vendas(rows=1000, tamanho_lote=1_000_000):
+    # Hierarquia: Região -> Categoria; Vendas entre 100 e 5000, margem entre 5% e 30%,
+    # Lucro em R$ e Score de Qualidade (0 a 10) derivado da margem.
+    # Volumes maiores mantêm o mesmo período (~1000 dias), com mais vendas por dia,
+    # e são gerados em lotes (a base inteira nunca fica em memória).
+    por_dia = max(1, rows // 1000)
+    if rows <= tamanho_lote:
+        return [sintetico.gerar_vendas(rows, seed=42, por_dia=por_dia)]
+    return sintetico.em_lotes(sintetico.gerar_vendas, rows, tamanho_lote, seed=42, por_dia=por_dia)
+
+
+@recurso("kpi.dataset_vendas", show_spinner="Gravando a base de vendas em Parquet...")
+def dataset_vendas(rows):
+    return armazem.obter_ou_gravar(f"vendas_{rows}_s42", lambda: gerar_dados_vendas(rows), particoes=['Região', 'Categoria'])
+
+
+@recurso("kpi.cubo", show_spinner="Montando o cubo de vendas...")
+def montar_cubo(rows):
+    # Vendas, Lucro e Score (soma e contagem) por Região x Categoria x dia, uma vez por base,
+    # lendo o Parquet em lotes. Filtros, KPIs e gráficos leem só o cubo.
+    return CuboVendas.de_lotes(armazem.lotes(dataset_vendas(rows), colunas=COLUNAS_CUBO))
+
+
+@aquecimento("kpi")
+def aquecer():
+    montar_cubo(VOLUME_PADRAO)
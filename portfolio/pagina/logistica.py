@@ -0,0 +1,77 @@
+"""Recursos da página de logística: pedidos da Olist, estatísticas em fluxo e fato relacional."""
+from portfolio.armazenamento import Armazem
+from portfolio.logistica.estatisticas import COLUNAS as COLUNAS_ESTATISTICAS, EstatisticasLeadTime
+from portfolio.logistica.fonte import carregar_pedidos, preparar_pedidos
+from portfolio.logistica.relacional import carregar_fato, lead_time_por
+from portfolio.pagina.recursos import aquecimento, recurso
+
+# Armazenamento colunar: a base tratada é gravada uma única vez por versão do CSV em Parquet
+# particionado por ano (pasta dados/). O leitor abre só os anos selecionados e só as colunas usadas.
+armazem = Armazem()
+COLUNAS = ['order_id', 'order_status', 'Dias_Entrega', 'Status_Prazo', 'order_purchase_timestamp']
+COLUNAS_FATO = ['Cod_Pedido', 'Dias_Entrega', 'Status_Prazo', 'customer_state', 'seller_id', 'product_category_name']
+
+
+@recurso("logistica.pedidos", tipo="dados", show_spinner=False)
+def carregar_dados_olist():
+    """
+    Carrega o dataset oficial da Olist (Brazilian E-Commerce): olist_orders_dataset.csv.
+    A origem (GitHub por padrão, ou uma pasta/servidor local via OLIST_FONTE) passa por um cache
+    local em Parquet chaveado pelo conteúdo: o CSV só é baixado e lido de novo se mudar, e sem
+    rede a página usa o último cache válido. Em caso de erro, devolve (None, mensagem).
+    """
+    try:
+        pedidos, info = carregar_pedidos()
+    except Exception as e:
+        return None, str(e)
+
+    # --- 2. ENGENHARIA DE DADOS (Cálculo do Lead Time) ---
+    # Só pedidos entregues; Dias_Entrega = entrega - compra; Status_Prazo compara com a data estimada
+    return preparar_pedidos(pedidos), info
+
+
+def dataset_olist(df, info):
+    nome = f"olist_pedidos_{info.chave[:16]}"
+    if not armazem.existe(nome):
+        armazem.gravar(nome, df, particoes=['Ano'])
+    return nome
+
+
+# Estatísticas em fluxo: o Parquet é lido em lotes e cada lote atualiza acumuladores combináveis
+# por (Ano, Status_Prazo) — média/variância de Welford, extremos, histograma e sketch KLL de quantis.
+# O filtro de anos só junta acumuladores; nenhuma linha bruta fica em memória para o describe().
+@recurso("logistica.estatisticas", show_spinner="Calculando estatísticas do lead time...")
+def estatisticas_lead_time(dataset):
+    return EstatisticasLeadTime.de_lotes(armazem.lotes(dataset, COLUNAS_ESTATISTICAS))
+
+
+# Base relacional (pedidos, itens, clientes, vendedores e produtos): os cinco CSVs são carregados em
+# paralelo, as chaves viram códigos inteiros e o fato desnormalizado (um item entregue por linha) é
+# gravado uma única vez por versão dos arquivos, particionado por ano.
+@recurso("logistica.fato", tipo="dados", show_spinner="Montando a base relacional da Olist...")
+def carregar_fato_olist():
+    try:
+        return carregar_fato(armazem)
+    except Exception as e:
+        return None, str(e)
+
+
+@recurso("logistica.membros_fato", tipo="dados", show_spinner=False)
+def membros_fato(fato, coluna):
+    return sorted(armazem.ler(fato, [coluna])[coluna].dropna().unique())
+
+
+@recurso("logistica.resumo_dimensao", tipo="dados", show_spinner=False)
+def resumo_por_dimensao(fato, coluna, anos, estados, categorias):
+    # Filtros empurrados para o leitor (anos = partições; estados e categorias = predicados)
+    filtros = {'Ano': list(anos), 'customer_state': list(estados) or None, 'product_category_name': list(categorias) or None}
+    return lead_time_por(armazem.ler(fato, COLUNAS_FATO, filtros), coluna)
+
+
+@aquecimento("logistica")
+def aquecer():
+    df, info = carregar_dados_olist()
+    if df is None:
+        raise RuntimeError(info)
+    estatisticas_lead_time(dataset_olist(df, info))
+    carregar_fato_olist()
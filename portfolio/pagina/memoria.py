@@ -0,0 +1,228 @@
+"""
+Memória compartilhada das páginas: cada resultado fica uma única vez no processo.
+
+O `st.cache_data` serializa o resultado e devolve uma cópia nova a cada chamada,
+em cada sessão: com muitos usuários, a memória cresce com usuários x tamanho da
+base. Aqui o valor calculado é guardado uma vez e as sessões recebem visões:
+
+- DataFrame/Series: cópia rasa (`copy(deep=False)`). Os buffers NumPy/Arrow são os
+  mesmos, e uma coluna só é copiada quando a sessão a altera: isso exige o
+  Copy-on-Write do pandas, padrão a partir do pandas 3 e ligado por este módulo no
+  pandas 2.x. Sem ele, uma alteração na visão escreveria na entrada compartilhada;
+- arrays NumPy: guardados como somente leitura e devolvidos como visões;
+- tuplas, listas e dicts: as mesmas regras item a item;
+- demais objetos (modelos, cubos, acumuladores): o próprio objeto, compartilhado
+  como no `st.cache_resource`. As páginas só os leem.
+
+Todas as entradas, de dados e de modelos das cinco páginas, dividem um orçamento
+de memória (`PORTFOLIO_MEMORIA_MB`). Quando ele estoura, as entradas usadas há mais
+tempo são despejadas (LRU) e recalculadas se forem pedidas de novo. `resumo()`
+mostra o tamanho residente de cada entrada.
+"""
+import os
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# O isolamento das sessões depende do Copy-on-Write (sempre ativo no pandas >= 3; opcional no 2.x)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+ORCAMENTO_PADRAO_MB = float(os.environ.get("PORTFOLIO_MEMORIA_MB", "2048"))
+LARGURA_ARGUMENTOS = 80
+
+_SEM_TAMANHO = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def tamanho_bytes(obj, _vistos=None):
+    """Bytes residentes de `obj`: buffers de DataFrames/arrays, contêineres e atributos, sem contar duas vezes."""
+    # id -> objeto: manter a referência impede que um estado temporário liberado tenha o id reaproveitado
+    vistos = {} if _vistos is None else _vistos
+    if id(obj) in vistos or isinstance(obj, _SEM_TAMANHO):
+        return 0
+    vistos[id(obj)] = obj
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        # Visões de outro array contam o buffer de origem (uma vez), que é o que fica residente;
+        # buffers de outros donos (ex.: nós de uma árvore em Cython) contam o próprio tamanho
+        if isinstance(obj.base, np.ndarray):
+            return sys.getsizeof(obj) + tamanho_bytes(obj.base, vistos)
+        return sys.getsizeof(obj) + int(obj.nbytes)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return sys.getsizeof(obj)
+    if isinstance(getattr(obj, "nbytes", None), int):
+        return obj.nbytes  # tabelas e arrays do pyarrow
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(tamanho_bytes(k, vistos) + tamanho_bytes(v, vistos) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(tamanho_bytes(v, vistos) for v in obj)
+    # Objetos: atributos (__dict__) ou o estado de pickle (ex.: árvores do scikit-learn em Cython)
+    estado = getattr(obj, "__dict__", None)
+    if estado is None:
+        try:
+            estado = obj.__getstate__()
+        except Exception:
+            estado = None
+    return sys.getsizeof(obj) + (tamanho_bytes(estado, vistos) if estado is not None else 0)
+
+
+def _congelar(valor):
+    """Torna somente leitura os arrays guardados (os DataFrames são protegidos pelo Copy-on-Write, ligado no import)."""
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    elif isinstance(valor, (list, tuple)):
+        for item in valor:
+            _congelar(item)
+    elif isinstance(valor, dict):
+        for item in valor.values():
+            _congelar(item)
+    return valor
+
+
+def visao(valor):
+    """Visão sem cópia dos buffers de `valor` para uma sessão."""
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return valor.copy(deep=False)
+    if isinstance(valor, np.ndarray):
+        return valor.view()
+    if isinstance(valor, tuple):
+        itens = [visao(item) for item in valor]
+        return type(valor)(*itens) if hasattr(valor, "_fields") else tuple(itens)
+    if isinstance(valor, list):
+        return [visao(item) for item in valor]
+    if isinstance(valor, dict):
+        return {k: visao(v) for k, v in valor.items()}
+    return valor
+
+
+def chave_argumentos(valor):
+    """Chave hashable dos argumentos (listas viram tuplas, dicts viram pares ordenados)."""
+    if isinstance(valor, (list, tuple)):
+        return tuple(chave_argumentos(v) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, chave_argumentos(v)) for k, v in valor.items()))
+    if isinstance(valor, (set, frozenset)):
+        return frozenset(chave_argumentos(v) for v in valor)
+    return valor
+
+
+@dataclass
+class Entrada:
+    nome: str
+    argumentos: str     # repr abreviado, para o resumo
+    valor: object
+    bytes: int
+    somente_leitura: bool
+    segundos: float     # tempo de cálculo
+    criado_em: float = field(default_factory=time.time)
+    ultimo_acesso: float = field(default_factory=time.time)
+    acessos: int = 0
+
+
+class MemoriaCompartilhada:
+    """Resultados por (nome, argumentos), uma cópia por processo, com orçamento global e despejo LRU."""
+
+    def __init__(self, orcamento_mb=ORCAMENTO_PADRAO_MB):
+        self.orcamento = int(orcamento_mb * 1024 ** 2)
+        self.despejos = 0
+        self._entradas = OrderedDict()   # do menos para o mais recentemente usado
+        self._calculando = {}            # chave -> trava (duas sessões não calculam a mesma entrada)
+        self._trava = threading.Lock()
+
+    @property
+    def usados(self):
+        return sum(e.bytes for e in self._entradas.values())
+
+    def _acessar(self, chave):
+        entrada = self._entradas.get(chave)
+        if entrada is not None:
+            self._entradas.move_to_end(chave)
+            entrada.acessos += 1
+            entrada.ultimo_acesso = time.time()
+        return entrada
+
+    def _entregar(self, entrada):
+        return visao(entrada.valor) if entrada.somente_leitura else entrada.valor
+
+    def obter(self, nome, argumentos, calcular, somente_leitura=True, max_entradas=None):
+        """Valor de `nome` para `argumentos` (dict); `calcular()` só roda se ele não estiver na memória."""
+        chave = (nome, chave_argumentos(argumentos))
+        with self._trava:
+            entrada = self._acessar(chave)
+            if entrada is not None:
+                return self._entregar(entrada)
+            trava = self._calculando.setdefault(chave, threading.Lock())
+
+        with trava:
+            try:
+                with self._trava:
+                    entrada = self._acessar(chave)  # outra sessão pode ter acabado de calcular
+                if entrada is None:
+                    entrada = self._calcular(nome, argumentos, calcular, somente_leitura)
+                    with self._trava:
+                        self._entradas[chave] = entrada
+                        self._despejar(chave, nome, max_entradas)
+            finally:
+                with self._trava:
+                    self._calculando.pop(chave, None)
+        return self._entregar(entrada)
+
+    @staticmethod
+    def _calcular(nome, argumentos, calcular, somente_leitura):
+        inicio = time.perf_counter()
+        valor = calcular()
+        segundos = time.perf_counter() - inicio
+        if somente_leitura:
+            _congelar(valor)
+        descricao = ", ".join(f"{k}={v!r}" for k, v in argumentos.items())
+        if len(descricao) > LARGURA_ARGUMENTOS:
+            descricao = descricao[:LARGURA_ARGUMENTOS - 1] + "…"
+        return Entrada(nome, descricao, valor, tamanho_bytes(valor), somente_leitura, segundos, acessos=1)
+
+    def _despejar(self, protegida, nome, max_entradas):
+        # Limite por função (max_entries) e, depois, o orçamento global; a entrada recém-criada fica
+        if max_entradas is not None:
+            do_nome = [c for c in self._entradas if c[0] == nome and c != protegida]
+            for chave in do_nome[: max(0, len(do_nome) + 1 - max_entradas)]:
+                del self._entradas[chave]
+                self.despejos += 1
+        usados = self.usados
+        for chave in list(self._entradas):
+            if usados <= self.orcamento:
+                break
+            if chave == protegida:
+                continue
+            usados -= self._entradas.pop(chave).bytes
+            self.despejos += 1
+
+    def limpar(self, nome=None):
+        """Remove as entradas de `nome` (ou todas)."""
+        with self._trava:
+            for chave in [c for c in self._entradas if nome is None or c[0] == nome]:
+                del self._entradas[chave]
+
+    def resumo(self):
+        """DataFrame com uma linha por entrada (mais recente primeiro): tamanho residente, acessos e idade."""
+        agora = time.time()
+        with self._trava:
+            entradas = list(reversed(self._entradas.values()))
+        return pd.DataFrame(
+            [{"Recurso": e.nome, "Argumentos": e.argumentos, "MB": e.bytes / 1024 ** 2, "Acessos": e.acessos,
+              "Último Acesso (s)": agora - e.ultimo_acesso, "Cálculo (s)": e.segundos,
+              "Visão": "somente leitura" if e.somente_leitura else "compartilhado"}
+             for e in entradas],
+            columns=["Recurso", "Argumentos", "MB", "Acessos", "Último Acesso (s)", "Cálculo (s)", "Visão"],
+        )
+
+
+# Instância do processo: todas as sessões e páginas usam a mesma
+MEMORIA = MemoriaCompartilhada()
@@ -0,0 +1,105 @@
+"""
+Perfil de inicialização do portfólio: custo de importação e de execução de cada página.
+
+Para cada página registrada no `app.py` (e para o próprio `app.py`):
+
+- importação: as importações do script rodam num processo Python novo com
+  `-X importtime`; o relatório traz o tempo total e os pacotes mais pesados;
+- execução (`--execucao`): a página roda no `AppTest` do Streamlit, uma vez com
+  os caches vazios (primeira pintura) e outra logo em seguida (reexecução).
+
+Uso (linha de comando):
+    python -m portfolio.pagina.perfil
+    python -m portfolio.pagina.perfil --execucao --top 8
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from portfolio.pagina.ativos import RAIZ
+
+APP = os.path.join(RAIZ, "app.py")
+
+
+def paginas(app=APP):
+    """Scripts das páginas registradas em `st.navigation` (primeiro argumento de cada `st.Page`)."""
+    with open(app, encoding="utf-8") as f:
+        arvore = ast.parse(f.read())
+    return [
+        no.args[0].value for no in ast.walk(arvore)
+        if isinstance(no, ast.Call) and getattr(no.func, "attr", None) == "Page"
+        and no.args and isinstance(no.args[0], ast.Constant)
+    ]
+
+
+def importacoes(script):
+    """Código-fonte só com as importações de nível superior do script."""
+    with open(os.path.join(RAIZ, script), encoding="utf-8") as f:
+        arvore = ast.parse(f.read())
+    return "\n".join(ast.unparse(no) for no in arvore.body if isinstance(no, (ast.Import, ast.ImportFrom)))
+
+
+def medir_importacao(script):
+    """(milissegundos totais, DataFrame por pacote de topo) das importações do script num processo novo."""
+    ambiente = {**os.environ, "PYTHONPATH": RAIZ + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", importacoes(script)],
+        cwd=RAIZ, env=ambiente, capture_output=True, text=True, check=True,
+    ).stderr
+    linhas = []
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha.split("|")
+        # Só os módulos de topo (sem recuo): o acumulado deles já inclui os submódulos
+        nome = nome[1:]
+        if not nome.startswith(" "):
+            linhas.append({"Pacote": nome.strip(), "ms": int(acumulado) / 1000})
+    por_pacote = pd.DataFrame(linhas, columns=["Pacote", "ms"])
+    por_pacote = por_pacote.groupby("Pacote", as_index=False)["ms"].sum().sort_values("ms", ascending=False)
+    return por_pacote["ms"].sum(), por_pacote.reset_index(drop=True)
+
+
+def medir_execucao(script, timeout=600):
+    """(primeira execução, reexecução) da página em segundos, com o `AppTest` do Streamlit."""
+    from streamlit.testing.v1 import AppTest
+
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    teste = AppTest.from_file(os.path.join(RAIZ, script), default_timeout=timeout)
+    inicio = time.perf_counter()
+    teste.run()
+    primeira = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    teste.run()
+    return primeira, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfil de importação (e execução) das páginas do portfólio.")
+    parser.add_argument("--execucao", action="store_true", help="Também mede a primeira execução e a reexecução")
+    parser.add_argument("--top", type=int, default=5, help="Pacotes mais pesados listados por página")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("PORTFOLIO_AQUECER", "0")
+    resumo = []
+    for script in ["app.py", *paginas()]:
+        total, por_pacote = medir_importacao(script)
+        linha = {"Script": script, "Importação (ms)": round(total, 1)}
+        if args.execucao and script != "app.py":
+            primeira, reexecucao = medir_execucao(script)
+            linha.update({"Primeira Execução (s)": round(primeira, 2), "Reexecução (s)": round(reexecucao, 2)})
+        resumo.append(linha)
+        pesados = ", ".join(f"{p} {ms:.0f} ms" for p, ms in por_pacote.head(args.top).itertuples(index=False))
+        print(f"{script}: {total:.0f} ms | {pesados}")
+    print()
+    print(pd.DataFrame(resumo).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
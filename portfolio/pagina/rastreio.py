@@ -0,0 +1,216 @@
+"""
+Instrumentação opcional das páginas: onde cada execução do script gasta o seu tempo.
+
+Desligada por padrão. Liga com `PORTFOLIO_RASTREIO=1` (todas as sessões) ou
+com `?rastreio=1` na URL (só a sessão). Com ela desligada, cada ponto de
+medição custa só a checagem de que não há rastreio ativo.
+
+- `etapa("Isolation Forest: scores")`: cronometra um trecho da página (aninhável);
+- recursos de `portfolio.pagina.recursos`: cada chamada vira um acerto ou uma falta de cache;
+- `grafico(fig, "Mapa")`: mede o JSON da figura (tamanho e serialização) e a desenha;
+- `painel()`: expander na barra lateral com as etapas, o cache e as figuras da
+  execução, o tamanho residente de cada entrada da memória compartilhada e o
+  download do rastreio no formato Trace Event (chrome://tracing, Perfetto).
+
+O `app.py` abre um rastreio por execução (`iniciar`) antes de rodar a página e
+desenha o painel depois dela.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from portfolio.pagina.memoria import MEMORIA
+
+RASTREIO_PADRAO = os.environ.get("PORTFOLIO_RASTREIO", "0") != "0"
+PARAMETRO_URL = "rastreio"
+CHAVE_SESSAO = "_rastreio_ligado"
+
+# Acertos e faltas de cache por recurso, desde o início do processo (todas as sessões)
+_CONTAGEM = Counter()
+_local = threading.local()
+
+
+@dataclass
+class Evento:
+    nome: str
+    categoria: str     # 'etapa', 'cache' ou 'grafico'
+    inicio: float      # segundos desde o início da execução
+    duracao: float
+    nivel: int         # profundidade de aninhamento
+    detalhes: dict = field(default_factory=dict)
+
+
+@dataclass
+class Rastreio:
+    pagina: str
+    inicio: float = field(default_factory=time.perf_counter)
+    criado_em: datetime = field(default_factory=datetime.now)
+    eventos: list = field(default_factory=list)
+    nivel: int = 0
+
+    def registrar(self, nome, categoria, inicio, detalhes=None):
+        fim = time.perf_counter()
+        self.eventos.append(Evento(nome, categoria, inicio - self.inicio, fim - inicio, self.nivel, detalhes or {}))
+
+    @property
+    def segundos(self):
+        return time.perf_counter() - self.inicio
+
+
+def ativo():
+    if RASTREIO_PADRAO:
+        return True
+    # O parâmetro da URL some ao trocar de página: a escolha fica guardada na sessão
+    valor = st.query_params.get(PARAMETRO_URL)
+    if valor is not None:
+        st.session_state[CHAVE_SESSAO] = valor != "0"
+    return st.session_state.get(CHAVE_SESSAO, False)
+
+
+def iniciar(pagina=""):
+    """Abre o rastreio desta execução (ou nenhum, com a instrumentação desligada)."""
+    _local.rastreio = Rastreio(pagina) if ativo() else None
+    return _local.rastreio
+
+
+def atual():
+    """Rastreio da execução em andamento nesta thread (None fora de uma execução instrumentada)."""
+    return getattr(_local, "rastreio", None)
+
+
+@contextmanager
+def etapa(nome, categoria="etapa"):
+    """Cronometra o bloco como uma etapa da execução."""
+    rastreio = atual()
+    if rastreio is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    rastreio.nivel += 1
+    try:
+        yield
+    finally:
+        rastreio.nivel -= 1
+        rastreio.registrar(nome, categoria, inicio)
+
+
+def cache(nome, acerto, inicio):
+    """Chamada a um recurso cacheado (acerto = o cache respondeu sem rodar a função)."""
+    _CONTAGEM[(nome, acerto)] += 1
+    rastreio = atual()
+    if rastreio is not None:
+        rastreio.registrar(nome, "cache", inicio, {"acerto": acerto})
+
+
+def grafico(fig, nome, **opcoes):
+    """`st.plotly_chart(fig, **opcoes)`; com rastreio, mede antes o JSON que vai ao navegador."""
+    rastreio = atual()
+    if rastreio is None:
+        return st.plotly_chart(fig, **opcoes)
+    inicio = time.perf_counter()
+    kb = len(fig.to_json().encode()) / 1024
+    detalhes = {"kb": kb, "serializacao_ms": (time.perf_counter() - inicio) * 1000}
+    inicio = time.perf_counter()
+    try:
+        return st.plotly_chart(fig, **opcoes)
+    finally:
+        rastreio.registrar(nome, "grafico", inicio, detalhes)
+
+
+def contagem_cache():
+    """DataFrame com acertos, faltas e taxa de acerto por recurso, desde o início do processo."""
+    nomes = sorted({nome for nome, _ in _CONTAGEM})
+    df = pd.DataFrame({
+        "Recurso": nomes,
+        "Acertos": [_CONTAGEM[(nome, True)] for nome in nomes],
+        "Faltas": [_CONTAGEM[(nome, False)] for nome in nomes],
+    })
+    df["Taxa de Acerto"] = df["Acertos"] / (df["Acertos"] + df["Faltas"]).clip(lower=1)
+    return df
+
+
+def tabelas(rastreio):
+    """(etapas, cache, figuras) da execução como DataFrames, na ordem em que começaram."""
+    total_ms = max(rastreio.segundos * 1000, 1e-9)
+    eventos = sorted(rastreio.eventos, key=lambda e: (e.inicio, e.nivel))
+    etapas = pd.DataFrame(
+        [{"Etapa": "   " * e.nivel + ("↳ " if e.nivel else "") + e.nome, "ms": e.duracao * 1000,
+          "% da Execução": e.duracao * 1000 / total_ms}
+         for e in eventos if e.categoria == "etapa"],
+        columns=["Etapa", "ms", "% da Execução"],
+    )
+    caches = pd.DataFrame(
+        [{"Recurso": e.nome, "Resultado": "acerto" if e.detalhes["acerto"] else "falta", "ms": e.duracao * 1000}
+         for e in eventos if e.categoria == "cache"],
+        columns=["Recurso", "Resultado", "ms"],
+    )
+    figuras = pd.DataFrame(
+        [{"Gráfico": e.nome, "JSON (KB)": e.detalhes["kb"], "Serialização (ms)": e.detalhes["serializacao_ms"],
+          "Envio (ms)": e.duracao * 1000}
+         for e in eventos if e.categoria == "grafico"],
+        columns=["Gráfico", "JSON (KB)", "Serialização (ms)", "Envio (ms)"],
+    )
+    return etapas, caches, figuras
+
+
+def exportar(rastreio):
+    """Rastreio no formato Trace Event (JSON), com a execução inteira como evento raiz."""
+    def evento(nome, categoria, inicio, duracao, detalhes):
+        return {"name": nome, "cat": categoria, "ph": "X", "ts": inicio * 1e6, "dur": duracao * 1e6,
+                "pid": 1, "tid": 1, "args": detalhes}
+
+    eventos = [evento(rastreio.pagina or "execução", "execucao", 0.0, rastreio.segundos, {})]
+    eventos += [evento(e.nome, e.categoria, e.inicio, e.duracao, e.detalhes) for e in rastreio.eventos]
+    # Eventos com o mesmo início: o de maior duração (o pai) vem primeiro
+    eventos.sort(key=lambda e: (e["ts"], -e["dur"]))
+    return {
+        "traceEvents": eventos,
+        "displayTimeUnit": "ms",
+        "metadata": {"pagina": rastreio.pagina, "criado_em": rastreio.criado_em.isoformat(timespec="seconds")},
+    }
+
+
+def painel():
+    """Expander de diagnóstico na barra lateral (só com a instrumentação ligada)."""
+    rastreio = atual()
+    if rastreio is None:
+        return
+    total_ms = rastreio.segundos * 1000
+    etapas, caches, figuras = tabelas(rastreio)
+    conteudo = json.dumps(exportar(rastreio), ensure_ascii=False)
+    acertos = int((caches["Resultado"] == "acerto").sum())
+
+    with st.sidebar.expander(f"🛠️ Diagnóstico da Execução ({total_ms:,.0f} ms)", expanded=False):
+        st.caption(f"{rastreio.pagina} | {len(etapas)} etapas | cache {acertos}/{len(caches)} acertos | {len(figuras)} gráficos")
+        st.markdown("**Etapas**")
+        st.dataframe(etapas, hide_index=True, use_container_width=True,
+                     column_config={"ms": st.column_config.NumberColumn(format="%.1f"),
+                                    "% da Execução": st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1)})
+        st.markdown("**Cache (esta execução)**")
+        st.dataframe(caches, hide_index=True, use_container_width=True,
+                     column_config={"ms": st.column_config.NumberColumn(format="%.1f")})
+        st.markdown("**Gráficos**")
+        st.dataframe(figuras, hide_index=True, use_container_width=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.1f") for c in figuras.columns[1:]})
+        st.markdown("**Cache (processo)**")
+        st.dataframe(contagem_cache(), hide_index=True, use_container_width=True,
+                     column_config={"Taxa de Acerto": st.column_config.NumberColumn(format="percent")})
+        st.markdown("**Memória compartilhada (processo)**")
+        memoria = MEMORIA.resumo()
+        st.caption(f"{memoria['MB'].sum():,.1f} de {MEMORIA.orcamento / 1024 ** 2:,.0f} MB | "
+                   f"{len(memoria)} entradas | {MEMORIA.despejos} despejos (LRU)")
+        st.dataframe(memoria, hide_index=True, use_container_width=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.2f")
+                                    for c in ["MB", "Último Acesso (s)", "Cálculo (s)"]})
+        st.download_button(
+            "⬇️ Baixar Rastreio (Trace Event JSON)", conteudo, mime="application/json", on_click="ignore",
+            file_name=f"rastreio_{rastreio.criado_em:%Y%m%d_%H%M%S}.json",
+        )
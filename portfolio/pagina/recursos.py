@@ -0,0 +1,199 @@
+"""
+Registro dos recursos cacheados das páginas e ganchos de aquecimento.
+
+Cada função de dados ou de modelo usada por uma página é declarada com
+`@recurso(nome)`: o resultado fica uma única vez por processo na memória
+compartilhada (`portfolio.pagina.memoria`, com orçamento global e despejo LRU).
+Recursos de 'dados' chegam às sessões como visões somente leitura, sem cópia; os
+de tipo 'recurso' (modelos, cubos) são o próprio objeto compartilhado. O registro
+guarda a função pelo nome, com quantas vezes ela rodou de fato (fora da memória)
+e quanto tempo levou.
+
+Como os recursos ficam em módulos importáveis (e não no script da página), o
+`app.py` consegue prepará-los antes de o usuário abrir a página: cada projeto
+declara um gancho `@aquecimento("kpi")` que chama os seus recursos com os
+valores padrão da tela, e `aquecer()` roda todos os ganchos numa thread de
+fundo, uma única vez por processo. Ao trocar de página, o que já foi aquecido
+sai do cache em memória.
+
+Toda chamada a um recurso é contada como acerto ou falta de cache em
+`portfolio.pagina.rastreio` (e aparece no painel de diagnóstico, se ligado).
+"""
+import functools
+import importlib
+import inspect
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from portfolio.pagina import rastreio
+from portfolio.pagina.memoria import MEMORIA
+
+# Aquecimento em segundo plano ligado por padrão (PORTFOLIO_AQUECER=0 desliga)
+AQUECER_PADRAO = os.environ.get("PORTFOLIO_AQUECER", "1") != "0"
+PREFIXO_THREAD = "aquecimento"
+
+# Tipo -> as sessões recebem visões somente leitura (dados) ou o objeto compartilhado (recurso)
+TIPOS = {"recurso": False, "dados": True}
+
+
+@dataclass
+class Recurso:
+    nome: str
+    tipo: str          # 'recurso' (objeto compartilhado) ou 'dados' (visões somente leitura)
+    funcao: object     # versão cacheada, a que as páginas chamam
+    execucoes: int = 0  # vezes em que a função rodou de fato (cache vazio)
+    segundos: float = 0.0
+
+
+@dataclass
+class Aquecimento:
+    projeto: str
+    gancho: object
+    estado: str = "pendente"  # pendente, rodando, pronto ou erro
+    segundos: float = 0.0
+    erro: str = ""
+
+
+_RECURSOS = {}
+_AQUECIMENTOS = {}
+_trava = threading.Lock()
+_thread = None
+# Se a função rodou na chamada em andamento desta thread (falta de cache)
+_local = threading.local()
+
+
+class _SemAvisoDeContexto(logging.Filter):
+    # As threads de aquecimento não têm sessão: o aviso de "missing ScriptRunContext" é esperado
+    def filter(self, registro):
+        return not threading.current_thread().name.startswith(PREFIXO_THREAD)
+
+
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(_SemAvisoDeContexto())
+
+
+def recurso(nome, tipo="recurso", show_spinner=True, max_entries=None):
+    """
+    Guarda o resultado na memória compartilhada (`tipo` 'recurso' ou 'dados') e registra a função em `nome`.
+    Como no cache do Streamlit, argumentos com nome iniciado por `_` não entram na chave; `show_spinner`
+    (True ou um texto) aparece enquanto a função roda e `max_entries` limita as entradas da função.
+    """
+    somente_leitura = TIPOS[tipo]
+
+    def decorar(funcao):
+        assinatura = inspect.signature(funcao)
+        texto_spinner = show_spinner if isinstance(show_spinner, str) else f"Rodando `{funcao.__name__}(...)`."
+
+        def executar(args, kwargs):
+            # Só roda quando o resultado não está na memória para estes argumentos
+            _local.executou = True
+            inicio = time.perf_counter()
+            try:
+                if show_spinner and get_script_run_ctx() is not None:
+                    with st.spinner(texto_spinner):
+                        return funcao(*args, **kwargs)
+                return funcao(*args, **kwargs)
+            finally:
+                registrado = _RECURSOS[nome]
+                registrado.execucoes += 1
+                registrado.segundos += time.perf_counter() - inicio
+
+        @functools.wraps(funcao)
+        def cacheada(*args, **kwargs):
+            argumentos = assinatura.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            chave = {k: v for k, v in argumentos.arguments.items() if not k.startswith("_")}
+            # Recursos aninhados (um chamando outro) guardam e restauram a marca do chamador
+            anterior, _local.executou = getattr(_local, "executou", False), False
+            inicio = time.perf_counter()
+            try:
+                return MEMORIA.obter(nome, chave, lambda: executar(args, kwargs), somente_leitura, max_entries)
+            finally:
+                rastreio.cache(nome, not _local.executou, inicio)
+                _local.executou = anterior
+
+        cacheada.clear = functools.partial(MEMORIA.limpar, nome)
+        with _trava:
+            anterior = _RECURSOS.get(nome)
+            _RECURSOS[nome] = Recurso(nome, tipo, cacheada)
+            if anterior is not None:
+                _RECURSOS[nome].execucoes, _RECURSOS[nome].segundos = anterior.execucoes, anterior.segundos
+        return cacheada
+
+    return decorar
+
+
+def obter(nome):
+    """A função cacheada registrada em `nome`."""
+    return _RECURSOS[nome].funcao
+
+
+def recursos():
+    return list(_RECURSOS.values())
+
+
+def limpar(nome=None):
+    """Remove da memória as entradas de um recurso (ou de todos)."""
+    for registrado in ([_RECURSOS[nome]] if nome else _RECURSOS.values()):
+        registrado.funcao.clear()
+
+
+def aquecimento(projeto):
+    """Registra `gancho()` como o aquecimento de `projeto` (chama os recursos com os valores padrão da página)."""
+    def decorar(gancho):
+        with _trava:
+            if projeto not in _AQUECIMENTOS:
+                _AQUECIMENTOS[projeto] = Aquecimento(projeto, gancho)
+        return gancho
+
+    return decorar
+
+
+def aquecimentos():
+    return list(_AQUECIMENTOS.values())
+
+
+def _rodar(modulos, projetos):
+    # Importar os módulos dos projetos registra os seus recursos e ganchos
+    for modulo in modulos:
+        try:
+            importlib.import_module(modulo)
+        except Exception:
+            continue
+    for projeto in projetos or list(_AQUECIMENTOS):
+        item = _AQUECIMENTOS.get(projeto)
+        if item is None or item.estado != "pendente":
+            continue
+        item.estado = "rodando"
+        inicio = time.perf_counter()
+        try:
+            item.gancho()
+            item.estado = "pronto"
+        except Exception as e:
+            # Uma página que não aquece (ex.: sem rede) continua funcionando: carrega ao ser aberta
+            item.estado, item.erro = "erro", str(e)
+        item.segundos = time.perf_counter() - inicio
+
+
+def aquecer(modulos=(), projetos=None, em_segundo_plano=True):
+    """
+    Importa `modulos` (os módulos de recursos dos projetos e bibliotecas pesadas) e roda os ganchos
+    pendentes de `projetos` (todos, por padrão), na ordem de registro. Em segundo plano, usa uma
+    única thread por processo: chamadas seguintes (a cada reexecução do app) não fazem nada.
+    """
+    global _thread
+    if not em_segundo_plano:
+        _rodar(modulos, projetos)
+        return None
+    with _trava:
+        if _thread is None:
+            _thread = threading.Thread(
+                target=_rodar, args=(list(modulos), projetos), name=f"{PREFIXO_THREAD}-recursos", daemon=True,
+            )
+            _thread.start()
+    return _thread
@@ -0,0 +1,115 @@
+"""
+Tabelas das páginas: top-N por seleção parcial e paginação no servidor.
+
+Mostrar as N maiores linhas não exige ordenar a tabela inteira: a N-ésima
+chave sai de um `np.partition` (O(n)) e só as N linhas selecionadas são
+ordenadas. Empates no limite são resolvidos pela posição original, então o
+resultado é o mesmo prefixo de uma ordenação estável - e páginas vizinhas
+nunca repetem nem pulam linhas.
+
+`tabela_paginada` usa a mesma seleção para a página pedida e envia ao
+navegador só as linhas dessa página e as colunas escolhidas, qualquer que seja
+o tamanho da tabela.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from portfolio.pagina.rastreio import etapa
+
+TAMANHOS_PAGINA = [25, 50, 100, 500]
+SEM_ORDEM = "(ordem original)"
+
+
+def chave_ordenacao(serie, ascendente=True):
+    """
+    Chave numérica de ordenação da coluna (menor = primeiro), com nulos sempre no final.
+    Datas e inteiros viram int64 exatos; textos e categorias, o posto do valor.
+    """
+    nulos = serie.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(serie) or pd.api.types.is_timedelta64_dtype(serie):
+        chave = serie.to_numpy().view(np.int64).copy()
+    elif (pd.api.types.is_bool_dtype(serie) or pd.api.types.is_integer_dtype(serie)) and not nulos.any():
+        chave = serie.to_numpy(dtype=np.int64).copy()
+    elif pd.api.types.is_numeric_dtype(serie):
+        chave = serie.to_numpy(dtype=np.float64, na_value=np.nan).copy()
+    else:
+        chave = pd.factorize(serie, sort=True)[0].astype(np.int64)
+    if not ascendente:
+        chave = -chave
+    if nulos.any():
+        chave[nulos] = np.inf if chave.dtype.kind == "f" else np.iinfo(np.int64).max
+    return chave
+
+
+def posicoes_ordenadas(chave, fim):
+    """Posições das `fim` primeiras linhas na ordem (estável) de `chave`, sem ordenar as demais."""
+    n = len(chave)
+    if fim >= n:
+        return np.argsort(chave, kind="stable")
+    if fim <= 0:
+        return np.array([], dtype=np.int64)
+    limite = np.partition(chave, fim - 1)[fim - 1]
+    menores = np.flatnonzero(chave < limite)
+    # Empates no limite: entram os primeiros pela posição original, como numa ordenação estável
+    iguais = np.flatnonzero(chave == limite)[: fim - len(menores)]
+    selecionadas = np.concatenate([menores, iguais])
+    return selecionadas[np.argsort(chave[selecionadas], kind="stable")]
+
+
+def topo(df, coluna, n, ascendente=False, colunas=None):
+    """As `n` linhas com os maiores (ou menores) valores de `coluna`, ordenadas, só com `colunas`."""
+    posicoes = posicoes_ordenadas(chave_ordenacao(df[coluna], ascendente), n)
+    return _projetar(df, posicoes, colunas)
+
+
+def _projetar(df, posicoes, colunas):
+    colunas = list(df.columns) if colunas is None else list(colunas)
+    return df.iloc[posicoes, [df.columns.get_loc(c) for c in colunas]]
+
+
+def _voltar_ao_inicio(chave_pagina):
+    st.session_state[chave_pagina] = 1
+
+
+def tabela_paginada(df, chave, colunas=None, ordem=None, ascendente=False, tamanho_pagina=50, **opcoes):
+    """
+    `st.dataframe` de uma página de `df` (só as linhas da página e as `colunas` vão ao navegador),
+    com controles de ordenação, linhas por página e página. `chave` identifica os widgets da tabela.
+    Devolve o DataFrame exibido.
+    """
+    colunas = list(df.columns) if colunas is None else list(colunas)
+    total = len(df)
+    chave_pagina = f"{chave}_pagina"
+
+    c_ordem, c_sentido, c_tamanho, c_pagina = st.columns([2, 1, 1, 1], vertical_alignment="bottom")
+    opcoes_ordem = [SEM_ORDEM, *colunas]
+    ordem = c_ordem.selectbox(
+        "Ordenar por", opcoes_ordem, index=opcoes_ordem.index(ordem) if ordem in colunas else 0,
+        key=f"{chave}_ordem", on_change=_voltar_ao_inicio, args=(chave_pagina,),
+    )
+    ascendente = c_sentido.toggle("Crescente", value=ascendente, key=f"{chave}_sentido",
+                                  on_change=_voltar_ao_inicio, args=(chave_pagina,))
+    tamanho = c_tamanho.selectbox(
+        "Linhas por página", TAMANHOS_PAGINA,
+        index=TAMANHOS_PAGINA.index(tamanho_pagina) if tamanho_pagina in TAMANHOS_PAGINA else 0,
+        key=f"{chave}_tamanho", on_change=_voltar_ao_inicio, args=(chave_pagina,),
+    )
+    paginas = max(1, math.ceil(total / tamanho))
+    # A tabela pode ter encolhido (filtros) desde a última página escolhida
+    if st.session_state.get(chave_pagina, 1) > paginas:
+        st.session_state[chave_pagina] = paginas
+    pagina = c_pagina.number_input("Página", min_value=1, max_value=paginas, key=chave_pagina)
+
+    with etapa(f"Tabela {chave}: página {pagina}"):
+        inicio, fim = (pagina - 1) * tamanho, min(total, pagina * tamanho)
+        if ordem == SEM_ORDEM:
+            posicoes = np.arange(inicio, fim)
+        else:
+            posicoes = posicoes_ordenadas(chave_ordenacao(df[ordem], ascendente), fim)[inicio:]
+        visivel = _projetar(df, posicoes, colunas)
+    st.dataframe(visivel, **opcoes)
+    st.caption(f"Página {pagina:,} de {paginas:,} | linhas {min(inicio + 1, total):,}–{fim:,} de {total:,}".replace(",", "."))
+    return visivel
@@ -0,0 +1,39 @@
+"""
+Importação preguiçosa de bibliotecas pesadas.
+
+`importar_preguicoso("plotly.express")` devolve um módulo substituto: a
+importação real só acontece no primeiro acesso a um atributo (`px.bar`). Assim,
+abrir uma página (ou importar um módulo do núcleo) não paga o custo do Plotly
+ou do scikit-learn se o trecho que os usa não rodar.
+"""
+import importlib
+import sys
+import types
+
+
+class ModuloPreguicoso(types.ModuleType):
+    """Substituto de um módulo que o importa no primeiro acesso a um atributo."""
+
+    def __init__(self, nome):
+        super().__init__(nome)
+        self._modulo = None
+
+    def _carregar(self):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self.__name__)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._carregar(), atributo)
+
+    def __dir__(self):
+        return dir(self._carregar())
+
+    @property
+    def carregado(self):
+        return self._modulo is not None or self.__name__ in sys.modules
+
+
+def importar_preguicoso(nome):
+    """O módulo `nome` se já estiver importado; senão, um substituto que importa no primeiro uso."""
+    return sys.modules.get(nome) or ModuloPreguicoso(nome)
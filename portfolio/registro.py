@@ -0,0 +1,136 @@
+"""
+Registro de modelos treinados.
+
+Cada artefato é salvo em disco com uma chave derivada dos dados de treino e dos
+hiperparâmetros. Enquanto a chave não muda, o modelo é apenas carregado do disco
+(sem novo treino); qualquer mudança nos dados ou nos parâmetros gera uma nova versão.
+
+Uma versão pode ser promovida (`promover`): o ponteiro `<nome>/promovido.json`
+guarda a chave e os hiperparâmetros que as páginas devem servir.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Diretório padrão dos artefatos (pode ser trocado pela variável de ambiente)
+DIRETORIO_PADRAO = os.environ.get(
+    "PORTFOLIO_MODELOS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "modelos"),
+)
+
+
+@dataclass
+class InfoModelo:
+    nome: str
+    chave: str
+    caminho: str
+    origem: str  # 'treino' (gerado agora) ou 'disco' (artefato reaproveitado)
+    segundos: float
+    instante: float = field(default_factory=time.time)
+    metadados: dict = field(default_factory=dict)
+
+
+def _atualizar_hash(h, obj):
+    # Hash vetorizado (uma passada por coluna), sem iterar linha a linha
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+        nomes = obj.columns if isinstance(obj, pd.DataFrame) else [obj.name]
+        h.update(json.dumps([str(c) for c in nomes]).encode())
+    else:
+        arr = np.ascontiguousarray(obj)
+        h.update(str((arr.dtype, arr.shape)).encode())
+        h.update(arr.tobytes())
+
+
+def calcular_chave(X, y, params):
+    """Hash (sha256) dos dados de treino, dos hiperparâmetros e da versão do scikit-learn."""
+    import sklearn
+
+    h = hashlib.sha256()
+    _atualizar_hash(h, X)
+    _atualizar_hash(h, y)
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    h.update(sklearn.__version__.encode())
+    return h.hexdigest()
+
+
+class RegistroModelos:
+    """Armazena artefatos versionados em `<diretorio>/<nome>/<chave>.joblib`."""
+
+    def __init__(self, diretorio=None):
+        self.diretorio = diretorio or DIRETORIO_PADRAO
+
+    def caminho(self, nome, chave):
+        return os.path.join(self.diretorio, nome, f"{chave[:16]}.joblib")
+
+    def carregar(self, nome, chave):
+        """Carrega o artefato da chave informada ou retorna None se ele não existir."""
+        caminho = self.caminho(nome, chave)
+        if not os.path.exists(caminho):
+            return None
+        inicio = time.perf_counter()
+        pacote = joblib.load(caminho)
+        if pacote.get("chave") != chave:
+            return None  # Colisão de prefixo: trata como ausente e retreina
+        info = InfoModelo(nome, chave, caminho, "disco", time.perf_counter() - inicio,
+                          metadados=pacote.get("metadados", {}))
+        return pacote["modelo"], info
+
+    def salvar(self, nome, chave, modelo, metadados=None):
+        caminho = self.caminho(nome, chave)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Escrita atômica: outro processo nunca lê um artefato pela metade
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        joblib.dump({"chave": chave, "modelo": modelo, "metadados": metadados or {}}, temporario)
+        os.replace(temporario, caminho)
+        with open(caminho.replace(".joblib", ".json"), "w", encoding="utf-8") as f:
+            json.dump({"nome": nome, "chave": chave, **(metadados or {})}, f, indent=2, default=str)
+        return caminho
+
+    def promover(self, nome, chave, params, metadados=None):
+        """Marca a versão `chave` (treinada com `params`) como a servida para `nome`."""
+        caminho = os.path.join(self.diretorio, nome, "promovido.json")
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"nome": nome, "chave": chave, "params": params, "promovido_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+                       **(metadados or {})}, f, indent=2, default=str)
+        os.replace(temporario, caminho)
+        return caminho
+
+    def promovido(self, nome):
+        """Ponteiro da versão promovida (dict com chave, params e metadados) ou None."""
+        caminho = os.path.join(self.diretorio, nome, "promovido.json")
+        if not os.path.exists(caminho):
+            return None
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+
+    def carregar_ou_treinar(self, nome, fabrica, X, y, params, chave=None):
+        """
+        Retorna (modelo, InfoModelo). Só executa `fabrica(**params).fit(X, y)`
+        quando não existe artefato para a chave (dados + hiperparâmetros).
+        """
+        chave = chave or calcular_chave(X, y, params)
+        carregado = self.carregar(nome, chave)
+        if carregado is not None:
+            return carregado
+
+        inicio = time.perf_counter()
+        modelo = fabrica(**params)
+        modelo.fit(X, y)
+        segundos = time.perf_counter() - inicio
+        metadados = {
+            "params": params,
+            "n_linhas": int(len(X)),
+            "segundos_treino": round(segundos, 4),
+            "criado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        caminho = self.salvar(nome, chave, modelo, metadados)
+        return modelo, InfoModelo(nome, chave, caminho, "treino", segundos, metadados=metadados)
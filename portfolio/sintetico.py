@@ -0,0 +1,259 @@
+"""
+Geradores de dados sintéticos dos dashboards (Geomarketing, Auditoria, KPI e Logística).
+
+Todos são vetorizados (NumPy, sem laços por linha), usam `np.random.Generator`
+para reprodutibilidade e recebem o número de linhas como parâmetro, de centenas
+a dezenas de milhões. `em_lotes` gera a mesma base em pedaços com sementes
+independentes, e `salvar_em_lotes` grava direto em Parquet sem manter tudo em memória.
+
+Uso (arquivos para teste de carga):
+    python -m portfolio.sintetico vendas 50000000 vendas.parquet --lote 1000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# --- Geomarketing (Região Metropolitana de Belém) ---
+# (Nome, Lat, Lon, Peso, Fator_Renda) - o peso é a fração dos bairros de cada zona
+ZONAS = [
+    ("Belém Centro/Umarizal", -1.450, -48.485, 15, 2.0),  # Alta Renda
+    ("Belém Aug. Montenegro", -1.380, -48.460, 12, 1.2),  # Média Renda
+    ("Icoaraci", -1.295, -48.480, 8, 0.8),                # Mista
+    ("Ananindeua Centro/BR", -1.365, -48.375, 10, 1.0),   # Comercial
+    ("Ananindeua Cid. Nova", -1.340, -48.410, 10, 1.1),   # Residencial Denso
+]
+NOMES_ZONAS = [z[0] for z in ZONAS]
+
+# --- Auditoria ---
+DEPARTAMENTOS = ["TI", "Marketing", "RH", "Operações", "Vendas"]
+CATEGORIAS_DESPESA = ["Software", "Viagem", "Serviços", "Material de Escritório"]
+TAXA_ANOMALIAS = 0.03  # 15 em cada 500 transações
+N_FORNECEDORES = 200
+# Padrões que as regras de auditoria procuram (portfolio.auditoria.regras), por transação
+TAXA_DUPLICADAS = 0.004   # mesmo fornecedor e valor logo em seguida
+TAXA_FRACIONADAS = 0.002  # trios de R$ 3.000 a R$ 4.900 (abaixo da alçada de R$ 5.000) que juntos a superam
+TAXA_REDONDAS = 0.004     # valores redondos (múltiplos de R$ 100)
+
+# --- KPI de Vendas ---
+REGIOES = ["Norte", "Nordeste", "Sudeste", "Sul", "Centro-Oeste"]
+CATEGORIAS_PRODUTO = ["Eletrônicos", "Móveis", "Eletrodomésticos", "Decoração"]
+
+# --- Logística (layout do olist_orders_dataset.csv) ---
+STATUS_PEDIDO = ["delivered", "shipped", "canceled", "invoiced", "processing"]
+TAXA_ENTREGUES = 0.97
+
+
+def _ids(prefixo, inicio, n, largura):
+    """IDs no formato f"{prefixo}{i:0{largura}d}", montados por aritmética de dígitos (sem formatar string a string)."""
+    partes = []
+    fim = inicio + n
+    a = inicio
+    while a < fim:
+        # Faixas contíguas com o mesmo número de dígitos (ex.: 0-999, 1000-9999, ...)
+        digitos = max(largura, len(str(a)))
+        b = min(fim, 10 ** digitos)
+        numeros = np.arange(a, b, dtype=np.int64)
+        potencias = 10 ** np.arange(digitos - 1, -1, -1, dtype=np.int64)
+        matriz = np.empty((len(numeros), len(prefixo) + digitos), dtype=np.uint8)
+        matriz[:, : len(prefixo)] = np.frombuffer(prefixo.encode(), dtype=np.uint8)
+        matriz[:, len(prefixo):] = (numeros[:, None] // potencias) % 10 + ord("0")
+        partes.append(matriz.view(f"S{matriz.shape[1]}").ravel().astype(str))
+        a = b
+    return np.concatenate(partes) if partes else np.array([], dtype=str)
+
+
+def _categoria(rng, valores, n):
+    return pd.Categorical.from_codes(rng.integers(0, len(valores), n), categories=valores)
+
+
+def _instantes(origem, unidade, inicio, n, por_unidade):
+    """`por_unidade` registros por hora/dia a partir de `origem` (segundos de resolução, sem estouro de datas)."""
+    passo = np.timedelta64(1, unidade).astype("timedelta64[s]").astype(np.int64)
+    indice = np.arange(inicio, inicio + n, dtype=np.int64)
+    segundos = (indice // por_unidade) * passo + (indice % por_unidade) * passo // por_unidade
+    return np.datetime64(origem, "s") + segundos.astype("timedelta64[s]")
+
+
+def gerar_bairros(n=55, seed=42, inicio=0):
+    """Pontos de demanda em torno dos centroides reais das zonas (mesma proporção por zona)."""
+    rng = np.random.default_rng(seed)
+    pesos = np.array([z[3] for z in ZONAS], dtype=float)
+    # Distribui n entre as zonas pelos pesos (maiores restos recebem as sobras)
+    cotas = pesos / pesos.sum() * n
+    qtd = np.floor(cotas).astype(int)
+    qtd[np.argsort(qtd - cotas)[: n - qtd.sum()]] += 1
+    zona = np.repeat(np.arange(len(ZONAS)), qtd)
+
+    lat_c = np.array([z[1] for z in ZONAS])
+    lon_c = np.array([z[2] for z in ZONAS])
+    fator = np.array([z[4] for z in ZONAS])
+
+    return pd.DataFrame({
+        "Bairro_ID": _ids("B_", inicio + 1, n, 3),
+        "Zona": pd.Categorical.from_codes(zona, categories=NOMES_ZONAS),
+        # Desvio padrão pequeno mantém os pontos dentro da mancha urbana
+        "Latitude": lat_c[zona] + rng.normal(0, 0.015, n),
+        "Longitude": lon_c[zona] + rng.normal(0, 0.015, n),
+        "Populacao": rng.integers(2000, 35000, n),
+        "Renda_Media": (rng.integers(1200, 5000, n) * fator[zona]).astype(np.int64),
+    })
+
+
+def gerar_lojas(df_pop, n_lojas=18, seed=42):
+    """Lojas sorteadas entre os bairros, levemente deslocadas do ponto do bairro."""
+    rng = np.random.default_rng(seed)
+    idx = rng.choice(len(df_pop), min(n_lojas, len(df_pop)), replace=False)
+    n = len(idx)
+    return pd.DataFrame({
+        "Loja_ID": _ids("LJ_", 1, n, 3),
+        "Latitude": df_pop["Latitude"].to_numpy()[idx] + rng.normal(0, 0.002, n),
+        "Longitude": df_pop["Longitude"].to_numpy()[idx] + rng.normal(0, 0.002, n),
+        "Faturamento": rng.integers(60000, 250000, n),
+    })
+
+
+def gerar_dados_geo(n_bairros=55, n_lojas=18, seed=42):
+    semente_bairros, semente_lojas = np.random.SeedSequence(seed).spawn(2)
+    df_pop = gerar_bairros(n_bairros, semente_bairros)
+    return df_pop, gerar_lojas(df_pop, n_lojas, semente_lojas)
+
+
+def gerar_transacoes(n=500, seed=42, inicio=0, por_hora=1):
+    """
+    Transações corporativas (1 por hora por padrão) com ~3% de anomalias de valor injetadas,
+    além de pagamentos duplicados, fracionados e de valor redondo em taxas pequenas.
+    """
+    rng = np.random.default_rng(seed)
+    valor = rng.normal(1200, 300, n)
+
+    # Anomalias: valores muito acima da média (R$ 5.000 a R$ 15.000)
+    n_anomalias = int(round(TAXA_ANOMALIAS * n))
+    indices_anomalos = rng.choice(n, n_anomalias, replace=False)
+    valor[indices_anomalos] = rng.uniform(5000, 15000, n_anomalias)
+    real = np.zeros(n, dtype=np.int8)
+    real[indices_anomalos] = 1
+
+    departamento = rng.integers(0, len(DEPARTAMENTOS), n)
+    categoria = rng.integers(0, len(CATEGORIAS_DESPESA), n)
+    fornecedor = rng.integers(0, N_FORNECEDORES, n)
+
+    # Padrões de regra: a linha seguinte copia (duplicata) ou continua (fracionamento) a sorteada
+    if n >= 3:
+        copias = rng.choice(n - 1, int(round(TAXA_DUPLICADAS * n)), replace=False)
+        trios = rng.choice(n - 2, int(round(TAXA_FRACIONADAS * n / 3)), replace=False)
+        redondas = rng.choice(n, int(round(TAXA_REDONDAS * n)), replace=False)
+        valor[redondas] = rng.integers(5, 21, len(redondas)) * 100.0
+        for desvio in (1, 2):
+            destino = trios + desvio
+            departamento[destino], categoria[destino], fornecedor[destino] = (
+                departamento[trios], categoria[trios], fornecedor[trios]
+            )
+        valor[np.concatenate([trios, trios + 1, trios + 2])] = rng.uniform(3000, 4900, 3 * len(trios))
+        departamento[copias + 1], categoria[copias + 1], fornecedor[copias + 1] = (
+            departamento[copias], categoria[copias], fornecedor[copias]
+        )
+        valor[copias + 1] = valor[copias]
+
+    return pd.DataFrame({
+        "ID_Transacao": _ids("TRX-", inicio, n, 4),
+        "Departamento": pd.Categorical.from_codes(departamento, categories=DEPARTAMENTOS),
+        "Categoria": pd.Categorical.from_codes(categoria, categories=CATEGORIAS_DESPESA),
+        "Fornecedor": pd.Categorical.from_codes(fornecedor, categories=_ids("FOR-", 1, N_FORNECEDORES, 3)),
+        # Valores em centavos, como num lançamento contábil
+        "Valor": np.round(valor, 2),
+        "Data": _instantes("2024-01-01", "h", inicio, n, por_hora),
+        # Apenas para conferência no gráfico: o modelo não usa esta coluna
+        "Is_Anomaly_Real": real,
+    })
+
+
+def gerar_vendas(n=1000, seed=42, inicio=0, por_dia=1):
+    """Vendas diárias (1 linha por dia por padrão) na hierarquia Região -> Categoria."""
+    rng = np.random.default_rng(seed)
+    margem = rng.uniform(0.05, 0.30, n)
+    vendas = rng.integers(100, 5000, n)
+    return pd.DataFrame({
+        "Data": _instantes("2023-01-01", "D", inicio, n, por_dia),
+        "Região": _categoria(rng, REGIOES, n),
+        "Categoria": _categoria(rng, CATEGORIAS_PRODUTO, n),
+        "Vendas": vendas,
+        "Margem_Lucro": margem,
+        "Lucro": vendas * margem,
+        # Score de Qualidade (0 a 10) derivado da margem
+        "Score_Qualidade": margem * 100 / 3,
+    })
+
+
+def gerar_pedidos_olist(n=1000, seed=42, inicio=0):
+    """
+    Pedidos com as colunas do olist_orders_dataset.csv (sem rede, para teste de carga):
+    ~97% entregues, lead time com cauda longa (gama) e prazo estimado de 15 a 35 dias.
+    """
+    rng = np.random.default_rng(seed)
+    compra = np.datetime64("2016-09-01", "s") + rng.integers(0, 760 * 86_400, n).astype("timedelta64[s]")
+    entregue = rng.random(n) < TAXA_ENTREGUES
+    status = np.where(entregue, 0, rng.integers(1, len(STATUS_PEDIDO), n))
+    entrega = compra + (rng.gamma(2.2, 5.5, n) * 86_400).astype("timedelta64[s]")
+    entrega[~entregue] = np.datetime64("NaT")
+    return pd.DataFrame({
+        "order_id": _ids("PED-", inicio, n, 8),
+        "customer_id": _ids("CLI-", inicio, n, 8),
+        "order_status": pd.Categorical.from_codes(status, categories=STATUS_PEDIDO),
+        "order_purchase_timestamp": compra,
+        "order_delivered_customer_date": entrega,
+        "order_estimated_delivery_date": (compra + rng.integers(15, 36, n).astype("timedelta64[D]")).astype("datetime64[D]"),
+    })
+
+
+GERADORES = {
+    "bairros": gerar_bairros,
+    "transacoes": gerar_transacoes,
+    "vendas": gerar_vendas,
+    "pedidos_olist": gerar_pedidos_olist,
+}
+
+
+def em_lotes(gerador, n_total, tamanho_lote=1_000_000, seed=42, **kwargs):
+    """
+    Gera `n_total` linhas em DataFrames de até `tamanho_lote` linhas.
+    Cada lote tem semente própria (SeedSequence.spawn) e continua a numeração/datas do anterior.
+    """
+    n_lotes = max(1, -(-n_total // tamanho_lote))
+    for k, semente in enumerate(np.random.SeedSequence(seed).spawn(n_lotes)):
+        inicio = k * tamanho_lote
+        yield gerador(min(tamanho_lote, n_total - inicio), seed=semente, inicio=inicio, **kwargs)
+
+
+def salvar_em_lotes(gerador, n_total, caminho, tamanho_lote=1_000_000, seed=42, **kwargs):
+    """Grava a base em um arquivo Parquet, um row group por lote."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for df in em_lotes(gerador, n_total, tamanho_lote, seed, **kwargs):
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, tabela.schema)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return caminho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera bases sintéticas em Parquet para teste de carga.")
+    parser.add_argument("base", choices=sorted(GERADORES))
+    parser.add_argument("linhas", type=int)
+    parser.add_argument("saida", help="Arquivo .parquet de saída")
+    parser.add_argument("--lote", type=int, default=1_000_000, help="Linhas geradas por vez")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    salvar_em_lotes(GERADORES[args.base], args.linhas, args.saida, args.lote, args.seed)
+    print(f"{args.linhas:,} linhas gravadas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
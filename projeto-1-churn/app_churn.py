@@ -1,61 +1,62 @@
+import os
+import shutil
+import tempfile
+import time
+
 import streamlit as st
 import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-
-# --- 1. GERAR DADOS FICTÍCIOS (Para funcionar sem baixar nada) ---
-# Criados 200 clientes falsos para o treinamento do modelo
-np.random.seed(42)
-n_linhas = 200
-
-data = {
-    'Meses_de_Contrato': np.random.randint(1, 48, n_linhas),
-    'Valor_Mensalidade': np.random.randint(50, 150, n_linhas),
-    'Numero_Reclamacoes': np.random.randint(0, 5, n_linhas)
-}
-df = pd.DataFrame(data)
-
-# Criada a resposta (para Quem cancelou) baseada em uma regra lógica
-# Regra: Se reclamou mais de 2 vezes OU paga caro e é cliente novo -> Cancela (1)
-df['Cancelou'] = np.where(
-    (df['Numero_Reclamacoes'] > 2) | 
-    ((df['Valor_Mensalidade'] > 100) & (df['Meses_de_Contrato'] < 6)), 
-    1, 0
-)
-
-# --- 2. TREINAR O MODELO ---
-X = df[['Meses_de_Contrato', 'Valor_Mensalidade', 'Numero_Reclamacoes']]
-y = df['Cancelou']
-
-modelo = RandomForestClassifier(n_estimators=50, random_state=42)
-modelo.fit(X, y)
+
+from portfolio.churn.lote import TAMANHO_LOTE_PADRAO, pontuar_arquivo
+from portfolio.churn.pipeline import NOMINAIS
+from portfolio.pagina.ativos import exibir_readme
+from portfolio.pagina.churn import carregar_base, carregar_inferencia, entradas_modelo, modelo_servido
+from portfolio.pagina.rastreio import etapa
+
+# --- 1. BASE REAL (Telco) E 2. MODELO (uma vez por versão dos dados/hiperparâmetros) ---
+# Leitura tipada, registro de modelos e simulador ficam em portfolio.pagina.churn, registrados no
+# runtime comum (compartilhados entre sessões; o app.py os aquece antes de a página ser aberta).
+with etapa("Base Telco"):
+    df = carregar_base()
+    X, y, perfil = entradas_modelo(df)
+
+inicio_execucao = time.time()
+inicio_carga = time.perf_counter()
+with etapa("Modelo (registro)"):
+    modelo, info_modelo = modelo_servido(X, y)
+tempo_carga = time.perf_counter() - inicio_carga
+# Se o objeto foi criado antes desta execução, veio do cache em memória (carga quente)
+origem_carga = "memória" if info_modelo.instante < inicio_execucao else info_modelo.origem
+with etapa("Inferência rápida"):
+    rapida = carregar_inferencia(info_modelo.chave, modelo, perfil)
 
 # --- 3. A TELA DO APLICATIVO ---
 st.title("Sistema de Predição de Churn")
 st.markdown("Este modelo usa um algoritmo de aprendizagem de máquina para prever a probabilidade de um cliente cancelar o seu contrato (Churn).")
 st.info("Utilize os controles abaixo para simular o perfil do cliente e verificar a retenção.")
 
+c1, c2, c3 = st.columns(3)
+c1.metric("Clientes na Base (Telco)", f"{len(df):,}".replace(",", "."))
+c2.metric("Taxa de Churn Histórica", f"{y.mean():.1%}")
+c3.metric("Variáveis do Modelo", len(modelo.features))
+
 st.divider()
 
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Simular Perfil do Cliente")
-    # Sliders
-    meses = st.slider("Tempo de Casa (Meses)", 1, 48, 12)
-    valor = st.slider("Valor da Mensalidade ($)", 50, 150, 80)
-    reclamacoes = st.slider("Número de Reclamações", 0, 5, 0)
+    # Sliders (variáveis reais da base; as demais seguem o perfil típico do cliente)
+    meses = st.slider("Tempo de Casa (Meses)", 0, 72, 12)
+    valor = st.slider("Valor da Mensalidade ($)", 18, 119, 70)
+    contrato = st.selectbox("Tipo de Contrato", NOMINAIS['Contract'])
+    internet = st.selectbox("Serviço de Internet", NOMINAIS['InternetService'], index=1)
     
     botao = st.button("Calcular Probabilidade", type="primary")
 
 with col2:
     if botao:
-        # Prepara os dados do usuário para o modelo
-        entrada = pd.DataFrame([[meses, valor, reclamacoes]], 
-                             columns=['Meses_de_Contrato', 'Valor_Mensalidade', 'Numero_Reclamacoes'])
-        
-        # O modelo faz a previsão
-        probabilidade = modelo.predict_proba(entrada)[0][1] # Pega a chance de ser 1 (Sim)
+        # Consulta direta na grade pré-calculada (mesmo resultado do modelo, sem montar DataFrame)
+        probabilidade = rapida.prever(meses, valor, contrato, internet) # Chance de ser 1 (Sim)
         
         st.subheader("Resultado da Análise:")
         st.metric(label="Risco Calculado", value=f"{probabilidade:.0%}")
@@ -67,20 +68,76 @@ with col2:
             st.success("RISCO BAIXO: Cliente Fidelizado.")
             st.write("**Situação:** O cliente apresenta comportamento estável.")
 
+# Relatório de inicialização: treino (frio) vs. artefato em disco vs. cache em memória (quente)
+with st.expander("⏱️ Tempo de Inicialização do Modelo", expanded=False):
+    rotulos = {
+        "treino": "Frio — modelo treinado e salvo no registro",
+        "disco": "Morno — artefato carregado do disco",
+        "memória": "Quente — objeto reaproveitado do cache do processo",
+    }
+    st.markdown(f"""
+    | Indicador | Valor |
+    | :--- | :--- |
+    | **Origem** | {rotulos[origem_carga]} |
+    | **Tempo desta execução** | {tempo_carga * 1000:.1f} ms |
+    | **Tempo da carga original** | {info_modelo.segundos * 1000:.1f} ms ({info_modelo.origem}) |
+    | **Versão (chave)** | `{info_modelo.chave[:16]}` |
+    | **Hiperparâmetros** | `{", ".join(f"{k}={v}" for k, v in info_modelo.metadados.get("params", {}).items() if k != "n_jobs")}` |
+    | **AUC (validação cruzada)** | {f"{info_modelo.metadados['auc_cv']:.3f}" if "auc_cv" in info_modelo.metadados else "— (rode `python -m portfolio.churn.busca`)"} |
+    """)
+
+    # Benchmark do clique: caminho original (pandas + sklearn) vs. caminhos rápidos
+    if st.button("Medir Latência da Previsão"):
+        latencias, divergencia = rapida.comparar_latencia()
+        base = latencias["Original (DataFrame + predict_proba)"]
+        st.dataframe(
+            pd.DataFrame({
+                "Caminho": list(latencias),
+                "Latência Mediana (µs)": [round(v, 1) for v in latencias.values()],
+                "Ganho": [f"{base / v:,.0f}x" for v in latencias.values()],
+            }),
+            hide_index=True, use_container_width=True,
+        )
+        st.caption(f"Maior diferença de probabilidade em relação ao caminho original: {divergencia:.1e}")
+
+# --- 4. PONTUAÇÃO EM LOTE (Arquivo de Clientes) ---
+st.divider()
+st.subheader("📂 Pontuação em Lote")
+st.markdown("Envie um arquivo no layout da base Telco (CSV ou Parquet). Ele é lido em lotes, pontuado em paralelo e devolvido com a coluna `Probabilidade_Churn`.")
+
+arquivo = st.file_uploader("Arquivo de clientes", type=["csv", "parquet"])
+cl1, cl2 = st.columns(2)
+tamanho_lote = cl1.number_input("Linhas por lote", min_value=1_000, max_value=1_000_000, value=TAMANHO_LOTE_PADRAO, step=10_000)
+n_jobs = cl2.number_input("Processos em paralelo", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1)
+
+if arquivo is not None and st.button("Pontuar Arquivo"):
+    extensao = os.path.splitext(arquivo.name)[1].lower()
+    with tempfile.TemporaryDirectory() as pasta:
+        # O upload é copiado para disco para ser lido em lotes (e não de uma vez)
+        entrada = os.path.join(pasta, f"entrada{extensao}")
+        saida = os.path.join(pasta, f"probabilidades{extensao}")
+        with open(entrada, "wb") as f:
+            shutil.copyfileobj(arquivo, f)
+
+        status = st.empty()
+        resultado = pontuar_arquivo(
+            modelo, entrada, saida, int(tamanho_lote), int(n_jobs),
+            progresso=lambda linhas: status.caption(f"{linhas:,} clientes pontuados...".replace(",", ".")),
+        )
+        status.empty()
+
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Clientes Pontuados", f"{resultado.linhas:,}".replace(",", "."))
+        m2.metric("Tempo Total", f"{resultado.segundos:.2f} s")
+        m3.metric("Vazão", f"{resultado.linhas_por_segundo:,.0f} linhas/s".replace(",", "."))
+
+        with open(saida, "rb") as f:
+            st.download_button("⬇️ Baixar Probabilidades", f.read(), file_name=f"probabilidades{extensao}", on_click="ignore")
+
 #---------------------------------------
 st.divider() # Uma linha visual para separar o App da documentação
 
 # 2. DOCUMENTAÇÃO (Vem no final)
 PATH_README = "projeto-1-churn/readme.md"
 
-def exibir_readme(caminho):
-    try:
-        with open(caminho, "r", encoding="utf-8") as f:
-            conteudo = f.read()
-        # Usamos um expander "fechado" para não esticar demais a página
-        with st.expander("📖 Detalhes Técnicos e Metodologia (README)", expanded=False):
-            st.markdown(conteudo)
-    except FileNotFoundError:
-        st.error("Documentação não encontrada.")
-
 exibir_readme(PATH_README)
@@ -1,102 +1,53 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
+
+from portfolio.geo.mapa import LIMIAR_PONTOS_BRUTOS, NIVEIS, NIVEL_BRUTO, escolher_nivel, figura_mapa, medir_niveis
+from portfolio.pagina.ativos import exibir_readme
+from portfolio.pagina.geo import (
+    LOJAS, N_BAIRROS_PADRAO, N_LOJAS_PADRAO, NOVAS_LOJAS_PADRAO, PONTOS_DEMANDA, RAIO_PADRAO_KM,
+    analisar_cobertura, ler_bairros, ler_lojas, niveis_do_mapa, sugerir_novas_lojas, zonas_disponiveis,
+)
+from portfolio.pagina.rastreio import etapa, grafico
+from portfolio.pagina.tabelas import tabela_paginada
 
 # Configuração da Página
 st.set_page_config(layout='wide', page_title="Inteligência de Varejo: Geomarketing Dashboard")
 
-# FUNÇÃO GERADORA DE DADOS (COM CORREÇÃO GEOGRÁFICA)
-@st.cache_data
-def gerar_dados_belem_ananindeua_v2():
-    """
-    Gera dados fictícios restritos às manchas urbanas reais de Belém e Ananindeua.
-    Técnica: Geração baseada em Centroides de Bairros Reais com ajuste fino para evitar áreas de água.
-    """
-    np.random.seed(42) # Mantém a semente para reprodutibilidade
-    
-    # Definindo clusters (Zonas Reais)
-    zonas = [
-        # (Nome, Lat, Lon, Qtd_Pontos, Fator_Renda)
-        # Coordenadas ajustadas para dentro da área urbana
-        ("Belém Centro/Umarizal", -1.450, -48.485, 15, 2.0), # Alta Renda (Ajustado)
-        ("Belém Aug. Montenegro", -1.380, -48.460, 12, 1.2), # Média Renda
-        ("Icoaraci", -1.295, -48.480, 8, 0.8),               # Mista
-        ("Ananindeua Centro/BR", -1.365, -48.375, 10, 1.0),  # Comercial
-        ("Ananindeua Cid. Nova", -1.340, -48.410, 10, 1.1),  # Residencial Denso
-    ]
-    
-    lista_bairros = []
-    
-    id_counter = 1
-    for nome, lat_c, lon_c, qtd, fator_renda in zonas:
-        # Gerar pontos ao redor do centroide da zona (Desvio padrão pequeno)
-        # Reduzir o desvio (ex: 0.012) pode ajudar a manter os pontos mais coesos
-        lats = lat_c + np.random.normal(0, 0.015, qtd) 
-        lons = lon_c + np.random.normal(0, 0.015, qtd)
-        
-        # Gerar população e renda baseada na zona
-        pops = np.random.randint(2000, 35000, qtd)
-        rendas = np.random.randint(1200, 5000, qtd) * fator_renda
-        
-        for i in range(qtd):
-            lista_bairros.append({
-                'Bairro_ID': f"B_{id_counter:03d}",
-                'Zona': nome,
-                'Latitude': lats[i],
-                'Longitude': lons[i],
-                'Populacao': pops[i],
-                'Renda_Media': int(rendas[i])
-            })
-            id_counter += 1
-            
-    df_pop = pd.DataFrame(lista_bairros)
-    
-    # 2. Gerar Lojas (Oferta) - Pegar amostra aleatória dos locais gerados acima
-    indices_lojas = np.random.choice(df_pop.index, 18, replace=False)
-    lojas_data = []
-    
-    for idx in indices_lojas:
-        row = df_pop.loc[idx]
-        # Deslocando levemente a loja para não ficar exatamente em cima do ponto do bairro
-        lojas_data.append({
-            'Loja_ID': f"LJ_{np.random.randint(100,999)}",
-            'Latitude': row['Latitude'] + np.random.normal(0, 0.002),
-            'Longitude': row['Longitude'] + np.random.normal(0, 0.002),
-            'Faturamento': np.random.randint(60000, 250000)
-        })
-        
-    df_lojas = pd.DataFrame(lojas_data)
-    
-    return df_pop, df_lojas
+# Geração (vetorizada), Parquet particionado por Zona, camadas do mapa, cobertura e expansão ficam em
+# portfolio.pagina.geo, registrados no runtime comum (o app.py aquece o cenário padrão).
 
 # Página 1: Dados Brutos 
-def pagina_dados_brutos_v2():
+def pagina_dados_brutos_v2(n_bairros, n_lojas):
     st.title('DADOS GEOESPACIAIS - EXPANSÃO METROPOLITANA')
     st.markdown("Base demográfica focada na Região Metropolitana de Belém (RMB).")
     
-    df_pop, df_lojas = gerar_dados_belem_ananindeua_v2()
+    df_pop, df_lojas = ler_bairros(n_bairros, n_lojas), ler_lojas(n_bairros, n_lojas)
     
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("📍 Clusters Demográficos")
-        st.dataframe(df_pop, use_container_width=True)
+        tabela_paginada(df_pop, "geo_bairros", use_container_width=True)
     with col2:
         st.subheader("🏢 Unidades Operacionais")
-        st.dataframe(df_lojas, use_container_width=True)
+        tabela_paginada(df_lojas, "geo_lojas", use_container_width=True)
 
 # Página 2: Dashboard Mapa
-def pagina_dashboard_v2():
+def pagina_dashboard_v2(n_bairros, n_lojas):
     st.title('Inteligência de Varejo: Geomarketing na Região Metropolitana de Belém e Ananindeua')
     st.markdown("Análise de **Densidade de Consumo** na Grande Belém.")
     
-    df_pop, df_lojas = gerar_dados_belem_ananindeua_v2()
+    df_lojas = ler_lojas(n_bairros, n_lojas)
     
-    # Filtros
+    # Filtros (as zonas vêm dos nomes das partições, sem ler os dados)
     st.sidebar.header("Filtros de Mercado")
-    zona_sel = st.sidebar.multiselect("Selecionar Zona", df_pop['Zona'].unique(), default=df_pop['Zona'].unique())
+    zonas = zonas_disponiveis(n_bairros, n_lojas)
+    zona_sel = st.sidebar.multiselect("Selecionar Zona", zonas, default=zonas)
+    raio_km = st.sidebar.slider("Raio de Atendimento da Loja (km)", 0.5, 5.0, RAIO_PADRAO_KM, step=0.5)
+    k_novas = st.sidebar.slider("Novas Lojas Sugeridas", 0, 10, NOVAS_LOJAS_PADRAO)
+    detalhe = st.sidebar.selectbox("Detalhe do Mapa", ["Automático", NIVEL_BRUTO, *NIVEIS])
+    limiar = st.sidebar.number_input("Limite de Pontos Brutos no Mapa", min_value=100, value=LIMIAR_PONTOS_BRUTOS, step=1_000)
     
-    df_filtrado = df_pop[df_pop['Zona'].isin(zona_sel)]
+    with etapa("Leitura dos bairros (Parquet)"):
+        df_filtrado = ler_bairros(n_bairros, n_lojas, zona_sel)
     
     # Métricas Rápidas
     total_pop_visivel = df_filtrado['Populacao'].sum()
@@ -109,46 +60,78 @@ def pagina_dashboard_v2():
 
     st.divider()
     
-    # MAPA COM PLOTLY MAPBOX
-    fig = px.scatter_mapbox(
-        df_filtrado, 
-        lat="Latitude", 
-        lon="Longitude",
-        size="Populacao",
-        color="Renda_Media",
-        color_continuous_scale=["#ffeba4", "#ff8c00", "#d30b0b", "#4a0404"],
-        size_max=25,
-        zoom=10.5,
-        center={"lat": -1.38, "lon": -48.43},
-        hover_name="Zona",
-        hover_data=["Renda_Media", "Populacao"],
-        mapbox_style="carto-positron",
-        title="Distribuição de Potencial de Consumo (RMB)"
-    )
-    
-    # Adicionar Lojas (Pontos Azuis)
-    fig.add_scattermapbox(
-        lat=df_lojas["Latitude"],
-        lon=df_lojas["Longitude"],
-        mode='markers',
-        marker=dict(size=14, color='blue', symbol='circle'),
-        text=df_lojas["Loja_ID"],
-        name="Lojas Físicas"
-    )
-    
-    fig.update_layout(margin={"r":0,"t":30,"l":0,"b":0}, height=600)
-    st.plotly_chart(fig, use_container_width=True)
+    # MAPA COM PLOTLY MAPBOX (pontos brutos ou grade agregada, conforme o volume)
+    with etapa("Camadas do mapa"):
+        niveis = niveis_do_mapa(tuple(sorted(zona_sel)), n_bairros, n_lojas)
+    nivel = escolher_nivel(len(df_filtrado), niveis, limiar) if detalhe == "Automático" else detalhe
+    camada = df_filtrado if nivel == NIVEL_BRUTO else niveis[nivel]
+
+    with etapa("Seleção de novas lojas"):
+        novas_lojas = sugerir_novas_lojas(tuple(sorted(zona_sel)), raio_km, k_novas, n_bairros, n_lojas)
+    with etapa("Montagem do scatter_mapbox"):
+        fig = figura_mapa(camada, df_lojas, agregado=nivel != NIVEL_BRUTO, novas_lojas=novas_lojas)
+    grafico(fig, f"Mapa ({nivel})", use_container_width=True)
+    st.caption(f"Nível exibido: **{nivel}** — {len(camada):,} marcadores de demanda para {len(df_filtrado):,} pontos.".replace(",", "."))
+
+    with st.expander("📦 Payload do Mapa por Nível de Detalhe", expanded=False):
+        st.markdown("Tamanho do JSON enviado ao navegador e tempo de montagem/serialização da figura em cada nível.")
+        if st.button("Medir Níveis"):
+            st.dataframe(medir_niveis(df_filtrado, df_lojas, niveis), use_container_width=True, hide_index=True)
     
-    st.info("**Legenda:** Círculos **Quentes (Vermelhos)** indicam alta renda. Pontos **Azuis** são as lojas atuais.")
+    st.info("**Legenda:** Círculos **Quentes (Vermelhos)** indicam alta renda. Pontos **Azuis** são as lojas atuais e **Verdes** (numerados) as novas lojas sugeridas.")
+
+    # COBERTURA E VAZIOS DE MERCADO
+    st.subheader(f"🎯 Cobertura das Lojas (raio de {raio_km:.1f} km)")
+    with etapa("Cobertura das lojas"):
+        cobertura, vazios, por_zona = analisar_cobertura(tuple(sorted(zona_sel)), raio_km, n_bairros, n_lojas)
+
+    k1, k2, k3 = st.columns(3)
+    k1.metric("População Coberta", f"{cobertura.taxa_cobertura:.1%}")
+    k2.metric("Demanda Descoberta", f"{int(cobertura.populacao_descoberta):,}".replace(",", "."))
+    distancia_media = cobertura.distancia_km.mean() if len(cobertura.distancia_km) else 0.0
+    k3.metric("Distância Média até a Loja", f"{distancia_media:.2f} km")
+
+    col_vazios, col_zonas = st.columns([3, 2])
+    with col_vazios:
+        st.markdown("**Vazios de Mercado** (pontos fora do raio com maior População x Renda)")
+        st.dataframe(
+            vazios[['Bairro_ID', 'Zona', 'Populacao', 'Renda_Media', 'Distancia_Loja_km']],
+            use_container_width=True, hide_index=True,
+        )
+    with col_zonas:
+        st.markdown("**Demanda Descoberta por Zona**")
+        st.dataframe(por_zona, use_container_width=True, hide_index=True,
+                     column_config={"% Descoberta": st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1)})
+
+    # EXPANSÃO: ONDE ABRIR AS PRÓXIMAS LOJAS
+    if k_novas:
+        st.subheader("🚀 Sugestão de Novas Lojas")
+        st.markdown(f"Pontos que maximizam a demanda **População x Renda** ainda não atendida em um raio de {raio_km:.1f} km (ordem de prioridade).")
+        st.dataframe(
+            novas_lojas, use_container_width=True, hide_index=True,
+            column_config={
+                "Latitude": st.column_config.NumberColumn(format="%.4f"),
+                "Longitude": st.column_config.NumberColumn(format="%.4f"),
+                "Potencial_Novo": st.column_config.NumberColumn("Potencial Novo (Pop x Renda)", format="%.3e"),
+                "Potencial_Acumulado": st.column_config.NumberColumn("Potencial Acumulado", format="%.3e"),
+            },
+        )
+        if len(novas_lojas):
+            ganho = novas_lojas['Populacao_Nova'].sum() / max(cobertura.populacao_total, 1)
+            st.success(f"As {len(novas_lojas)} lojas sugeridas elevam a cobertura de {cobertura.taxa_cobertura:.1%} para cerca de {cobertura.taxa_cobertura + ganho:.1%} da população.")
 
 # Navegação
 st.sidebar.title('Navegação')
 pagina = st.sidebar.radio('Ir para:', ['Mapa Analítico', 'Base de Dados'])
 
+# Volume da simulação (55 bairros / 18 lojas reproduz o cenário original)
+n_bairros = st.sidebar.select_slider("Pontos de Demanda", options=PONTOS_DEMANDA, value=N_BAIRROS_PADRAO)
+n_lojas = st.sidebar.select_slider("Lojas", options=LOJAS, value=N_LOJAS_PADRAO)
+
 if pagina == 'Base de Dados':
-    pagina_dados_brutos_v2()
+    pagina_dados_brutos_v2(n_bairros, n_lojas)
 else:
-    pagina_dashboard_v2()
+    pagina_dashboard_v2(n_bairros, n_lojas)
 
 #-----------------------------------------------------------
 st.divider() # Uma linha visual para separar o App da documentação
@@ -156,14 +139,4 @@ st.divider() # Uma linha visual para separar o App da documentação
 # 2. DOCUMENTAÇÃO (Vem no final)
 PATH_README = "projeto-2-geomarketing/readme.md"
 
-def exibir_readme(caminho):
-    try:
-        with open(caminho, "r", encoding="utf-8") as f:
-            conteudo = f.read()
-        # Usamos um expander "fechado" para não esticar demais a página
-        with st.expander("📖 Detalhes Técnicos e Metodologia (README)", expanded=False):
-            st.markdown(conteudo)
-    except FileNotFoundError:
-        st.error("Documentação não encontrada.")
-
 exibir_readme(PATH_README)
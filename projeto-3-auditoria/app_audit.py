@@ -1,58 +1,30 @@
+import numpy as np
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-from sklearn.ensemble import IsolationForest
+
+from portfolio.auditoria.modelo import STATUS_ANOMALIA, detectar_anomalias
+from portfolio.auditoria.regras import marcar_achados
+from portfolio.auditoria.streaming import MonitorContinuo, fonte_sintetica
+from portfolio.pagina.ativos import exibir_readme
+from portfolio.pagina.auditoria import (
+    VOLUMES, VOLUME_PADRAO, ajustar_motor_segmentado, avaliar_regras, calcular_scores, calcular_scores_residuais,
+    calcular_scores_segmentados, gerar_transacoes,
+)
+from portfolio.pagina.rastreio import etapa, grafico
+from portfolio.pagina.tabelas import tabela_paginada
+from portfolio.preguicoso import importar_preguicoso
+
+px = importar_preguicoso("plotly.express")
 
 # Configuração da Página
 st.set_page_config(layout='wide', page_title="Auditoria Financeira e Detecção de Anomalia com IA")
 
-# --- 1. GERAR DADOS FINANCEIROS SINTÉTICOS ---
-@st.cache_data
-def gerar_transacoes():
-    np.random.seed(42)
-    n_transacoes = 500
-    
-    # Gerar dados "Normais"
-    data = {
-        'ID_Transacao': [f'TRX-{i:04d}' for i in range(n_transacoes)],
-        'Departamento': np.random.choice(['TI', 'Marketing', 'RH', 'Operações', 'Vendas'], n_transacoes),
-        'Categoria': np.random.choice(['Software', 'Viagem', 'Serviços', 'Material de Escritório'], n_transacoes),
-        # Valores normais entre 500 e 2000
-        'Valor': np.random.normal(1200, 300, n_transacoes), 
-        'Data': pd.date_range(start='2024-01-01', periods=n_transacoes, freq='H')
-    }
-    
-    df = pd.DataFrame(data)
-    
-    # INJETAR ANOMALIAS (FRAUDES/ERROS)
-    # Vamos criar 15 transações com valores absurdos ou estranhos
-    indices_anomalos = np.random.choice(df.index, 15, replace=False)
-    
-    # Tornar os valores extremos (ex: R$ 8.000,00 ou R$ 50,00 onde a média é 1200)
-    df.loc[indices_anomalos, 'Valor'] = np.random.uniform(5000, 15000, 15)
-    
-    # Marcar (apenas para nós sabermos a verdade no gráfico, mas o modelo não sabe)
-    df['Is_Anomaly_Real'] = 0
-    df.loc[indices_anomalos, 'Is_Anomaly_Real'] = 1
-    
-    return df
-
-# --- 2. MODELAGEM (ISOLATION FOREST) ---
-def detectar_anomalias(df, contaminacao):
-    # O modelo olha apenas para o 'Valor' neste exemplo simples
-    # Em casos reais, olharia Categoria, Hora, etc.
-    X = df[['Valor']]
-    
-    # Isolation Forest: Algoritmo excelente para achar outliers sem treino prévio
-    model = IsolationForest(contamination=contaminacao, random_state=42)
-    df['Anomaly_Score'] = model.fit_predict(X)
-    
-    # O modelo retorna -1 para anomalia e 1 para normal
-    # Vamos converter para texto para ficar bonito no gráfico
-    df['Status'] = df['Anomaly_Score'].apply(lambda x: 'Anomalia Detectada' if x == -1 else 'Normal')
-    
-    return df
+# --- 1. DADOS FINANCEIROS SINTÉTICOS E 2. MODELAGEM (ISOLATION FOREST) ---
+# Transações, florestas e scores ficam em portfolio.pagina.auditoria, registrados no runtime comum
+# (cacheados por volume e compartilhados entre sessões; o app.py aquece o volume padrão).
+# A sensibilidade só move o limiar dos scores (portfolio.auditoria.modelo.detectar_anomalias).
+# Com o pré-filtro, as regras (portfolio.auditoria.regras) rodam antes e só o residual vai à floresta.
+MOTORES = ["Global (Valor)", "Segmentado (Depto x Categoria)"]
 
 # --- 3. INTERFACE STREAMLIT ---
 st.title("Auditoria Financeira e Detecção de Anomalia com IA    ")
@@ -60,17 +32,43 @@ st.markdown("""
 Sistema de auditoria contínua utilizando **Machine Learning Não-Supervisionado (Isolation Forest)** para identificar gastos corporativos desviantes do padrão (Outliers).
 """)
 
-# Carregar dados
-df_raw = gerar_transacoes()
-
 # Sidebar de Controles
 st.sidebar.header("Painel de Auditoria")
+volume = st.sidebar.select_slider("Volume de Dados (Transações)", options=VOLUMES, value=VOLUME_PADRAO)
+
+# Carregar dados
+df_raw = gerar_transacoes(volume)
+
 # O usuário define quão sensível é o auditor (1% a 10% de contaminação esperada)
 sensibilidade = st.sidebar.slider("Sensibilidade do Auditor (% de Outliers)", 0.01, 0.10, 0.03)
 
-# Executar IA
-df_auditado = detectar_anomalias(df_raw.copy(), sensibilidade)
-anomalias = df_auditado[df_auditado['Status'] == 'Anomalia Detectada']
+motor = st.sidebar.radio("Motor de Detecção", MOTORES)
+prefiltro = st.sidebar.toggle(
+    "Pré-filtro de Regras", value=True,
+    help="Duplicidades, fracionamento, valores redondos, horário e Benford antes do modelo: "
+         "só as transações ambíguas são pontuadas pela floresta.",
+)
+
+# Executar regras e IA
+if prefiltro:
+    with etapa("Regras de auditoria"):
+        regras = avaliar_regras(volume)
+    with etapa("Isolation Forest: scores do residual"):
+        scores = calcular_scores_residuais(volume, motor == MOTORES[1])
+else:
+    with etapa("Isolation Forest: scores"):
+        scores = calcular_scores(volume) if motor == MOTORES[0] else calcular_scores_segmentados(volume)
+with etapa("Limiar de anomalias"):
+    # df_raw é uma visão da base compartilhada: as colunas novas ficam só nesta execução
+    # (Copy-on-Write, que portfolio.pagina.memoria garante também no pandas 2.x)
+    # Com o pré-filtro, a sensibilidade é a fração do residual: as linhas decididas pelas regras não entram no quantil
+    df_auditado = detectar_anomalias(df_raw, sensibilidade, scores, regras.residual if prefiltro else None)
+    if prefiltro:
+        marcar_achados(df_auditado, regras)
+posicoes_anomalias = np.flatnonzero(df_auditado['Status'].to_numpy() == STATUS_ANOMALIA)
+anomalias = df_auditado.iloc[posicoes_anomalias]
+if prefiltro:
+    anomalias = anomalias.assign(Motivos=regras.texto(posicoes_anomalias))
 
 # KPIs
 col1, col2, col3 = st.columns(3)
@@ -82,27 +80,28 @@ st.divider()
 
 # GRÁFICO DE DISPERSÃO (SCATTER PLOT)
 st.subheader("🔎 Visualização de Dispersão de Gastos")
-fig = px.scatter(
-    df_auditado, 
-    x="Data", 
-    y="Valor", 
-    color="Status",
-    color_discrete_map={'Normal': 'lightgrey', 'Anomalia Detectada': 'red'},
-    hover_data=['Departamento', 'Categoria', 'ID_Transacao'],
-    title="Monitoramento em Tempo Real (Pontos Vermelhos = Suspeitos)",
-    height=500
-)
-st.plotly_chart(fig, use_container_width=True)
+with etapa("Montagem do scatter"):
+    fig = px.scatter(
+        df_auditado, 
+        x="Data", 
+        y="Valor", 
+        color="Status",
+        color_discrete_map={'Normal': 'lightgrey', 'Anomalia Detectada': 'red'},
+        hover_data=['Departamento', 'Categoria', 'ID_Transacao'],
+        title="Monitoramento em Tempo Real (Pontos Vermelhos = Suspeitos)",
+        height=500
+    )
+grafico(fig, "Dispersão de gastos", use_container_width=True)
 
 # DETALHAMENTO
 col_table1, col_table2 = st.columns([2, 1])
 
 with col_table1:
     st.subheader("📋 Relatório de Transações Suspeitas")
-    st.dataframe(
-        anomalias[['ID_Transacao', 'Data', 'Departamento', 'Categoria', 'Valor']]
-        .sort_values(by='Valor', ascending=False),
-        use_container_width=True
+    tabela_paginada(
+        anomalias, "auditoria_anomalias",
+        colunas=['ID_Transacao', 'Data', 'Departamento', 'Categoria', 'Fornecedor', 'Valor'] + (['Motivos'] if prefiltro else []),
+        ordem='Valor', use_container_width=True,
     )
 
 with col_table2:
@@ -110,24 +109,80 @@ with col_table2:
     # Quem está gastando errado?
     fig_bar = px.bar(anomalias['Departamento'].value_counts(), orientation='h', title="Contagem de Anomalias")
     fig_bar.update_layout(showlegend=False)
-    st.plotly_chart(fig_bar, use_container_width=True)
+    grafico(fig_bar, "Ofensores por departamento", use_container_width=True)
+
+if motor == MOTORES[1]:
+    motor_seg = ajustar_motor_segmentado(volume)
+    with st.expander(f"🧩 Anomalias por Segmento ({motor_seg.n_segmentos} modelos próprios + 1 global)"):
+        # Transações decididas pelas regras não têm score do modelo
+        scores_modelo = np.where(regras.residual, scores, np.nan) if prefiltro else scores
+        st.dataframe(
+            motor_seg.resumo(df_auditado, scores_modelo, df_auditado['Status'].to_numpy()),
+            use_container_width=True
+        )
+
+if prefiltro:
+    with st.expander(f"🧾 Pré-filtro de Regras ({regras.segundos * 1000:,.0f} ms)", expanded=False):
+        conclusivos, normais, residual = regras.conclusivo.sum(), regras.normal.sum(), regras.residual.sum()
+        r1, r2, r3 = st.columns(3)
+        r1.metric("Achados das Regras", f"{conclusivos:,}".replace(",", "."))
+        r2.metric("Decididas como Normais", f"{normais / len(df_auditado):.1%}")
+        r3.metric("Enviadas ao Modelo (residual)", f"{residual:,}".replace(",", "."),
+                  f"{residual / len(df_auditado):.1%} da base", delta_color="off")
+        st.caption(
+            "Achados conclusivos (duplicidade, fracionamento) já são anomalias. Transações sem motivo e com "
+            "valor típico do segmento (mediana ± 3 desvios robustos) são decididas como normais. As demais, "
+            "inclusive as que têm só motivos indicativos, são pontuadas pelo modelo e a sensibilidade atua sobre elas."
+        )
+        st.dataframe(regras.resumo(), hide_index=True, use_container_width=True)
+        st.markdown("**Lei de Benford (primeiro dígito) por Departamento**")
+        st.dataframe(regras.benford, hide_index=True, use_container_width=True)
 
 st.info("**Lógica do Algoritmo:** O modelo aprende o padrão de gasto 'comum' (R$ 500 a R$ 2.000). Valores muito acima (ex: R$ 12.000) ou muito discrepantes são isolados geometricamente.")
 
+# --- 4. MONITORAMENTO CONTÍNUO (STREAMING) ---
+st.divider()
+st.subheader("📡 Monitoramento Contínuo (Streaming)")
+st.caption(
+    "Simula a chegada de transações em micro-lotes: cada lote é pontuado assim que chega e o modelo "
+    "é reajustado periodicamente sobre uma janela deslizante de tamanho fixo (memória constante)."
+)
+
+col_s1, col_s2, col_s3 = st.columns(3)
+tamanho_micro_lote = col_s1.select_slider("Transações por Micro-lote", options=[100, 500, 1_000, 5_000], value=1_000)
+n_micro_lotes = col_s2.number_input("Micro-lotes", min_value=10, max_value=1_000, value=50, step=10)
+reajuste_a_cada = col_s3.number_input("Reajustar a cada N lotes", min_value=1, max_value=100, value=20)
+
+if st.button("Iniciar Monitoramento"):
+    monitor = MonitorContinuo(janela=50_000, reajuste_a_cada=reajuste_a_cada, contaminacao=sensibilidade)
+    painel_metricas = st.empty()
+    painel_latencia = st.empty()
+    painel_alertas = st.empty()
+    latencias = []
+
+    for i, lote in enumerate(fonte_sintetica(tamanho_micro_lote, n_micro_lotes)):
+        latencias.append(monitor.processar(lote).latencia_ms)
+        # Atualiza a tela a cada 5 lotes (e no último) para não gastar o tempo do stream desenhando
+        if (i + 1) % 5 and i + 1 < n_micro_lotes:
+            continue
+        m = monitor.metricas()
+        with painel_metricas.container():
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Transações Processadas", f"{m['transacoes']:,}")
+            c2.metric("Alertas Emitidos", f"{m['alertas']:,}")
+            c3.metric("Latência p50 / p99", f"{m['latencia_p50_ms']:.1f} / {m['latencia_p99_ms']:.1f} ms")
+            c4.metric("Vazão", f"{m['transacoes_por_segundo']:,.0f} trx/s")
+        painel_latencia.line_chart(pd.DataFrame({"Latência por Micro-lote (ms)": latencias}), height=200)
+        painel_alertas.dataframe(
+            monitor.ultimos_alertas(20)[['ID_Transacao', 'Data', 'Departamento', 'Categoria', 'Valor', 'Score']],
+            use_container_width=True,
+        )
+    st.success(f"Stream concluído: {monitor.reajustes} reajustes do modelo (último em {monitor.ultimo_reajuste_ms:.0f} ms).")
+
 #-----------------------------------------------------------------
 st.divider() # Uma linha visual para separar o App da documentação
 
 # 2. DOCUMENTAÇÃO (Vem no final)
 PATH_README = "projeto-3-auditoria/readme.md"
 
-def exibir_readme(caminho):
-    try:
-        with open(caminho, "r", encoding="utf-8") as f:
-            conteudo = f.read()
-        # Usamos um expander "fechado" para não esticar demais a página
-        with st.expander("📖 Detalhes Técnicos e Metodologia (README)", expanded=False):
-            st.markdown(conteudo)
-    except FileNotFoundError:
-        st.error("Documentação não encontrada.")
-
 exibir_readme(PATH_README)
@@ -1,72 +1,79 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
+
+from portfolio.kpi.series import JANELAS, META_SCORE, SerieKPI, variacao
+from portfolio.pagina.ativos import exibir_readme
+from portfolio.pagina.kpi import VOLUMES, VOLUME_PADRAO, armazem, dataset_vendas, montar_cubo
+from portfolio.pagina.rastreio import etapa, grafico
+from portfolio.pagina.tabelas import topo
+from portfolio.preguicoso import importar_preguicoso
+
+px = importar_preguicoso("plotly.express")
 
 # Configuração
 st.set_page_config(layout='wide', page_title="Dashboard de Vendas")
 
-# --- 1. GERAR DADOS SINTÉTICOS (Varejo Nacional) ---
-@st.cache_data
-def gerar_dados_vendas():
-    np.random.seed(42)
-    rows = 1000
-    
-    # Hierarquia: Região -> Gerente -> Categoria
-    regioes = ['Norte', 'Nordeste', 'Sudeste', 'Sul', 'Centro-Oeste']
-    categorias = ['Eletrônicos', 'Móveis', 'Eletrodomésticos', 'Decoração']
-    
-    data = {
-        'Data': pd.date_range('2023-01-01', periods=rows, freq='D'),
-        'Região': np.random.choice(regioes, rows),
-        'Categoria': np.random.choice(categorias, rows),
-        # Vendas variando entre 100 e 5000
-        'Vendas': np.random.randint(100, 5000, rows),
-        # Margem de lucro entre 5% e 30%
-        'Margem_Lucro': np.random.uniform(0.05, 0.30, rows)
-    }
-    
-    df = pd.DataFrame(data)
-    
-    # Calcular Lucro em R$
-    df['Lucro'] = df['Vendas'] * df['Margem_Lucro']
-    
-    # Criar um "Score de Qualidade" (0 a 10) baseado na margem (Para simular uma nota)
-    df['Score_Qualidade'] = (df['Margem_Lucro'] * 100) / 3 
-    # Normalizando para ficar parecido com uma nota 0-10
-    
-    return df
+# --- 1. DADOS SINTÉTICOS (Varejo Nacional) ---
+# Geração, Parquet particionado e cubo pré-agregado ficam em portfolio.pagina.kpi,
+# registrados no runtime comum (o app.py pode aquecê-los antes de a página ser aberta).
 
 # --- 2. INTERFACE E LÓGICA ---
 st.title("Dashboard Estratégico para Vendas: monitoramento de KPI's")
 st.markdown("Monitoramento de performance hierárquica: Região > Categoria > Rentabilidade.")
 
-df = gerar_dados_vendas()
-
 # Sidebar (Filtros Hierárquicos)
 st.sidebar.header("Filtros de Gestão")
-filtro_regiao = st.sidebar.multiselect("Filtrar Região", df['Região'].unique(), default=df['Região'].unique())
-filtro_categoria = st.sidebar.multiselect("Filtrar Categoria", df['Categoria'].unique(), default=df['Categoria'].unique())
+volume = st.sidebar.select_slider("Volume de Dados (Vendas)", options=VOLUMES, value=VOLUME_PADRAO)
 
-# Aplicar Filtros
-df_filtrado = df[
-    (df['Região'].isin(filtro_regiao)) & 
-    (df['Categoria'].isin(filtro_categoria))
-]
+with etapa("Cubo de vendas"):
+    cubo = montar_cubo(volume)
+
+filtro_regiao = st.sidebar.multiselect("Filtrar Região", cubo.regioes, default=cubo.regioes)
+filtro_categoria = st.sidebar.multiselect("Filtrar Categoria", cubo.categorias, default=cubo.categorias)
 
 # --- 3. KPIs (Indicadores Chave) ---
-total_vendas = df_filtrado['Vendas'].sum()
-total_lucro = df_filtrado['Lucro'].sum()
-media_score = df_filtrado['Score_Qualidade'].mean()
+# Os filtros viram uma seleção nos eixos do cubo (rollup), sem máscara sobre as linhas
+with etapa("Rollup dos filtros"):
+    totais = cubo.totais(filtro_regiao, filtro_categoria)
+total_vendas = totais['Vendas']
+total_lucro = totais['Lucro']
+media_score = totais['Score_Qualidade']
 
 col1, col2, col3 = st.columns(3)
 col1.metric("Faturamento Total", f"R$ {total_vendas:,.2f}")
 col2.metric("Lucro Líquido", f"R$ {total_lucro:,.2f}")
 # O Score muda de cor se for baixo (meta < 6.0)
 col3.metric("Score de Qualidade (Média)", f"{media_score:.1f}/10.0", 
-            delta=f"{media_score - 6.0:.1f} vs Meta",
+            delta=f"{media_score - META_SCORE:.1f} vs Meta",
             delta_color="normal")
 
+# --- 3.1 KPIs NO TEMPO (janelas móveis, mês até a data e período anterior) ---
+# Todos saem da série diária do filtro (somas acumuladas sobre o eixo de dias do cubo): cada janela
+# custa duas subtrações, e a série móvel inteira é O(dias), sem reler as linhas de venda.
+with etapa("KPIs de série temporal"):
+    serie = SerieKPI.de_cubo(cubo, filtro_regiao, filtro_categoria)
+    periodos = {n: serie.periodo_anterior(n) for n in JANELAS}
+    mtd, mtd_anterior = serie.mes_anterior_ate_hoje()
+    movel = serie.movel(JANELAS)
+
+def delta_percentual(atual, anterior, rotulo):
+    v = variacao(atual, anterior)
+    return None if v is None else f"{v:+.1%} {rotulo}"
+
+if serie.ultimo_dia is not None:
+    st.caption(f"Janelas terminando no último dia da base: {pd.Timestamp(serie.ultimo_dia):%d/%m/%Y}")
+    t1, t2, t3, t4 = st.columns(4)
+    for coluna, n in zip((t1, t2), JANELAS):
+        atual, anterior = periodos[n]
+        coluna.metric(f"Vendas ({n} dias)", f"R$ {atual['Vendas']:,.2f}",
+                      delta=delta_percentual(atual['Vendas'], anterior['Vendas'], f"vs {n} dias anteriores"))
+    t3.metric("Vendas do Mês (MTD)", f"R$ {mtd['Vendas']:,.2f}",
+              delta=delta_percentual(mtd['Vendas'], mtd_anterior['Vendas'], "vs mesmo período do mês anterior"))
+    score_recente = periodos[JANELAS[-1]][0]['Score_Qualidade']
+    t4.metric(f"Score ({JANELAS[-1]} dias)", "-" if pd.isna(score_recente) else f"{score_recente:.1f}/10.0",
+              delta=None if pd.isna(score_recente) else f"{score_recente - META_SCORE:.1f} vs Meta",
+              delta_color="normal")
+
 st.divider()
 
 # --- 4. GRÁFICOS ESTRATÉGICOS ---
@@ -77,20 +84,20 @@ with col_charts1:
     st.subheader("Performance por Região")
     # Gráfico de Barras: Comparativo de Vendas
     fig_bar = px.bar(
-        df_filtrado.groupby('Região')[['Vendas']].sum().reset_index(),
+        cubo.por_dimensao('Região', filtro_regiao, filtro_categoria),
         x='Região', 
         y='Vendas',
         color='Vendas',
         title="Volume de Vendas (Ranking Regional)",
         color_continuous_scale='Blues'
     )
-    st.plotly_chart(fig_bar, use_container_width=True)
+    grafico(fig_bar, "Vendas por região", use_container_width=True)
 
 with col_charts2:
     st.subheader("Qualidade vs. Volume")
     # Gráfico de Dispersão: Vendas x Score (Onde estamos vendendo mal?)
     # Agrupar por Categoria para ver quem performa melhor
-    df_cat = df_filtrado.groupby('Categoria').agg({'Vendas':'sum', 'Score_Qualidade':'mean'}).reset_index()
+    df_cat = cubo.por_dimensao('Categoria', filtro_regiao, filtro_categoria)
     
     fig_scatter = px.scatter(
         df_cat,
@@ -103,12 +110,46 @@ with col_charts2:
         labels={'Score_Qualidade': 'Score de Qualidade (0-10)', 'Vendas': 'Volume Vendido R$'}
     )
     # Adicionar linha de corte (Meta)
-    fig_scatter.add_hline(y=6.0, line_dash="dot", annotation_text="Meta de Qualidade", annotation_position="bottom right")
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    fig_scatter.add_hline(y=META_SCORE, line_dash="dot", annotation_text="Meta de Qualidade", annotation_position="bottom right")
+    grafico(fig_scatter, "Qualidade x volume", use_container_width=True)
+
+# TENDÊNCIA (médias móveis da série diária)
+col_trend1, col_trend2 = st.columns(2)
+
+with col_trend1:
+    st.subheader("Tendência de Vendas")
+    fig_vendas = px.line(
+        movel, x='Data', y=[f'Vendas_MM{n}' for n in JANELAS],
+        title="Vendas por Dia (Médias Móveis)",
+        labels={'value': 'Vendas por Dia (R$)', 'variable': 'Janela'},
+    )
+    grafico(fig_vendas, "Tendência de vendas", use_container_width=True)
+
+with col_trend2:
+    st.subheader("Tendência do Score")
+    fig_score = px.line(
+        movel, x='Data', y=[f'Score_MM{n}' for n in JANELAS],
+        title="Score de Qualidade (Médias Móveis)",
+        labels={'value': 'Score de Qualidade (0-10)', 'variable': 'Janela'},
+    )
+    fig_score.add_hline(y=META_SCORE, line_dash="dot", annotation_text="Meta de Qualidade", annotation_position="bottom right")
+    grafico(fig_score, "Tendência do score", use_container_width=True)
 
 # Tabela Detalhada
 st.subheader("📋 Detalhamento Operacional")
-st.dataframe(df_filtrado.sort_values(by='Data', ascending=False).head(50), use_container_width=True)
+# O cubo diz a partir de que dia estão as 50 vendas mais recentes do filtro; o leitor do Parquet
+# só abre as partições de Região/Categoria selecionadas e os row groups desses dias.
+with etapa("Leitura das vendas recentes"):
+    corte = cubo.dia_de_corte(50, filtro_regiao, filtro_categoria)
+    if corte is None:
+        df_recentes = pd.DataFrame()
+    else:
+        df_recentes = armazem.ler(
+            dataset_vendas(volume),
+            filtros={'Região': filtro_regiao, 'Categoria': filtro_categoria, 'Data': (pd.Timestamp(corte), None)},
+        )
+        df_recentes = topo(df_recentes, 'Data', 50)
+st.dataframe(df_recentes, use_container_width=True)
 
 st.info("""
 **Análise de Negócio:**
@@ -122,14 +163,4 @@ st.divider() # Uma linha visual para separar o App da documentação
 # 2. DOCUMENTAÇÃO (Vem no final)
 PATH_README = "projeto-4-dashboard-kpi/readme.md"
 
-def exibir_readme(caminho):
-    try:
-        with open(caminho, "r", encoding="utf-8") as f:
-            conteudo = f.read()
-        # Usamos um expander "fechado" para não esticar demais a página
-        with st.expander("📖 Detalhes Técnicos e Metodologia (README)", expanded=False):
-            st.markdown(conteudo)
-    except FileNotFoundError:
-        st.error("Documentação não encontrada.")
-
 exibir_readme(PATH_README)
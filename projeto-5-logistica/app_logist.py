@@ -1,51 +1,26 @@
+import time
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+
+from portfolio.logistica.graficos import figura_box, figura_histograma, medir_figuras
+from portfolio.logistica.relacional import DIMENSOES
+from portfolio.pagina.ativos import exibir_readme
+from portfolio.pagina.logistica import (
+    COLUNAS, armazem, carregar_dados_olist, carregar_fato_olist, dataset_olist, estatisticas_lead_time,
+    membros_fato, resumo_por_dimensao,
+)
+from portfolio.pagina.rastreio import etapa, grafico
+from portfolio.pagina.tabelas import tabela_paginada
+from portfolio.preguicoso import importar_preguicoso
+
+px = importar_preguicoso("plotly.express")
 
 # Configuração da Página
 st.set_page_config(layout='wide', page_title="Logística de Comércio Real: Estatísticas do Tempo de Entrega")
 
-# --- 1. Conexão com os Dados Reais ---
-@st.cache_data
-def carregar_dados_olist():
-    """
-    Carrega o dataset oficial da Olist (Brazilian E-Commerce) direto do GitHub.
-    Arquivo: olist_orders_dataset.csv
-    """
-    # URL RAW do Repositório (Dados Públicos)
-    url = "https://raw.githubusercontent.com/olist/work-at-olist-data/master/datasets/olist_orders_dataset.csv"
-    
-    try:
-        # Carregando direto da nuvem
-        df = pd.read_csv(url)
-        
-        # --- 2. ENGENHARIA DE DADOS (Cálculo do Lead Time) ---
-        # Converter colunas de texto para Data
-        cols_data = ['order_purchase_timestamp', 'order_delivered_customer_date', 'order_estimated_delivery_date']
-        for col in cols_data:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-        
-        # Eliminar pedidos não entregues ou cancelados
-        df = df.dropna(subset=['order_delivered_customer_date', 'order_purchase_timestamp'])
-        df = df[df['order_status'] == 'delivered']
-        
-        # CALCULAR DIAS DE ENTREGA (Lead Time Real)
-        # Diferença entre Compra e Entrega
-        df['Dias_Entrega'] = (df['order_delivered_customer_date'] - df['order_purchase_timestamp']).dt.days
-        
-        # Calcular Atraso (Se entregou depois do estimado)
-        df['Atrasado'] = df['order_delivered_customer_date'] > df['order_estimated_delivery_date']
-        df['Status_Prazo'] = df['Atrasado'].apply(lambda x: 'Atrasado' if x else 'No Prazo')
-        
-        # Selecionar apenas colunas úteis para o dashboard
-        df_final = df[['order_id', 'order_status', 'Dias_Entrega', 'Status_Prazo', 'order_purchase_timestamp']]
-        
-        return df_final
-        
-    except Exception as e:
-        st.error(f"Erro ao conectar no GitHub da Olist: {e}")
-        return pd.DataFrame()
+# --- 1. CONEXÃO COM OS DADOS REAIS E 2. ENGENHARIA DE DADOS ---
+# Carga cacheada da Olist, Parquet por ano, estatísticas em fluxo e fato relacional ficam em
+# portfolio.pagina.logistica, registrados no runtime comum (o app.py os aquece em segundo plano).
 
 # --- 3. DASHBOARD ---
 st.title("Logística de Comércio Real: Estatísticas do Tempo de Entrega")
@@ -56,17 +31,46 @@ Análise focada no **Tempo de Entrega (Lead Time)** de 100k pedidos.
 """)
 
 with st.spinner('Baixando base de dados real (10MB+)...'):
-    df = carregar_dados_olist()
-
-if not df.empty:
+    inicio_execucao = time.time()
+    inicio_carga = time.perf_counter()
+    with etapa("Carga dos pedidos da Olist"):
+        df_pedidos, info_carga = carregar_dados_olist()
+    tempo_carga = time.perf_counter() - inicio_carga
+
+if df_pedidos is None:
+    st.error(f"Erro ao conectar no GitHub da Olist: {info_carga}")
+    info_carga = None
+
+if info_carga is not None:
+    dataset = dataset_olist(df_pedidos, info_carga)
+
+    # Relatório de carga: CSV lido e convertido (frio) vs. Parquet do cache local vs. memória (quente)
+    with st.expander("⏱️ Tempo de Carga dos Dados", expanded=False):
+        rotulos = {
+            "download": "Frio — CSV baixado, tipado e convertido para Parquet",
+            "arquivo": "Frio — CSV local tipado e convertido para Parquet",
+            "cache": "Morno — Parquet do cache local (CSV inalterado)",
+            "offline": "Morno — sem conexão: último Parquet válido do cache local",
+        }
+        # Se a carga aconteceu antes desta execução, os dados vieram do cache em memória (quente)
+        origem = "Quente — reaproveitado da memória do processo" if info_carga.instante < inicio_execucao else rotulos[info_carga.modo]
+        st.markdown(f"""
+        | Indicador | Valor |
+        | :--- | :--- |
+        | **Origem** | {origem} |
+        | **Tempo desta execução** | {tempo_carga * 1000:.1f} ms |
+        | **Tempo da carga original** | {info_carga.segundos * 1000:.1f} ms ({info_carga.modo}) |
+        | **Versão (sha256 do CSV)** | `{info_carga.chave[:16]}` |
+        """)
     
     # KPIs Gerais
     st.sidebar.header("Filtros")
-    # Filtro de Ano para não poluir o gráfico
-    anos = df['order_purchase_timestamp'].dt.year.unique()
+    # Filtro de Ano para não poluir o gráfico (anos lidos dos nomes das partições)
+    anos = armazem.valores_particao(dataset, 'Ano')
     sel_anos = st.sidebar.multiselect("Filtrar Ano da Compra", anos, default=anos)
     
-    df_filtrado = df[df['order_purchase_timestamp'].dt.year.isin(sel_anos)]
+    with etapa("Leitura dos anos (Parquet)"):
+        df_filtrado = armazem.ler(dataset, COLUNAS, {'Ano': sel_anos})
     
     # --- 4. ESTATÍSTICA DESCRITIVA ---
     st.subheader("1. Estatística Descritiva: Tempo de Entrega (Dias)")
@@ -74,8 +78,11 @@ if not df.empty:
     col_stats, col_raw = st.columns([1, 2])
     
     with col_stats:
-        # Média, Std, Min, Max
-        desc = df_filtrado['Dias_Entrega'].describe()
+        # Média, Std, Min, Max (dos acumuladores dos anos selecionados, mesmos campos do describe())
+        with etapa("Estatísticas do lead time"):
+            estatisticas = estatisticas_lead_time(dataset)
+            acumulador = estatisticas.combinar(sel_anos)
+            desc = acumulador.resumo()
         
         st.markdown(f"""
         | Indicador | Valor Real |
@@ -92,12 +99,10 @@ if not df.empty:
             st.error("⚠️ **Outlier Extremo:** Há pedidos que levaram meses para chegar!")
 
     with col_raw:
-        st.caption("Amostra dos Dados Brutos (Raw Data)")
-        st.dataframe(
-            df_filtrado.sort_values(by='Dias_Entrega', ascending=False).head(100), 
-            use_container_width=True, 
-            height=300
-        )
+        st.caption("Dados Brutos (Raw Data), paginados no servidor")
+        # Só a página visível vai ao navegador; a ordem sai de uma seleção parcial, sem ordenar a base inteira
+        tabela_paginada(df_filtrado, "logistica_pedidos", ordem='Dias_Entrega', tamanho_pagina=100,
+                        use_container_width=True, height=300)
 
     st.divider()
 
@@ -106,15 +111,9 @@ if not df.empty:
     
     with col1:
         st.subheader("2. Histograma de Prazos")
-        # Histograma Real
-        fig_hist = px.histogram(
-            df_filtrado, 
-            x="Dias_Entrega", 
-            nbins=100, # Mais bins para ver a cauda longa
-            title="Distribuição Real dos Prazos de Entrega",
-            color_discrete_sequence=['#00a65a']
-        )
-        fig_hist.update_layout(yaxis_title="Quantidade de Pedidos")
+        # Histograma Real, montado com as contagens por dia já calculadas no servidor
+        # (o navegador recebe uma barra por bin, não um ponto por pedido)
+        fig_hist = figura_histograma(acumulador)
         
         # Limitando o eixo X para facilitar visualização (muitos outliers de 200 dias estragam o gráfico)
         fig_hist.update_xaxes(range=[0, 60]) 
@@ -126,21 +125,60 @@ if not df.empty:
         fig_hist.add_vline(x=media, line_dash="dash", line_color="red", annotation_text=f"Média: {media:.1f}", annotation_position="top right")
         fig_hist.add_vline(x=mediana, line_dash="dot", line_color="black", annotation_text=f"Mediana: {mediana:.1f}", annotation_position="top left")
         
-        st.plotly_chart(fig_hist, use_container_width=True)
+        grafico(fig_hist, "Histograma de prazos", use_container_width=True)
         st.caption("Nota: O gráfico foi cortado em 60 dias para melhor visualização, mas a cauda longa existe.")
 
     with col2:
         st.subheader("3. Box Plot (Análise de Atrasos)")
-        # Box Plot comparando quem atrasou vs quem chegou no prazo
-        fig_box = px.box(
-            df_filtrado, 
-            x="Status_Prazo", 
-            y="Dias_Entrega", 
-            color="Status_Prazo",
-            title="Dispersão: Entregas no Prazo vs. Atrasadas",
-            points="outliers"
-        )
-        st.plotly_chart(fig_box, use_container_width=True)
+        # Box Plot comparando quem atrasou vs quem chegou no prazo: quartis e cercas pré-calculados,
+        # com os outliers agrupados por valor (quantidade de pedidos no hover)
+        por_status = estatisticas.por_status(sel_anos)
+        fig_box = figura_box(por_status)
+        grafico(fig_box, "Box plot por status", use_container_width=True)
+
+    st.divider()
+
+    # --- 6. QUEBRA POR ESTADO, VENDEDOR E CATEGORIA ---
+    st.subheader("4. Lead Time por Estado, Vendedor e Categoria")
+    with etapa("Base relacional"):
+        fato, infos_fato = carregar_fato_olist()
+    if fato is None:
+        st.warning(f"Base relacional indisponível (itens, clientes, vendedores e produtos): {infos_fato}")
+    else:
+        col_dim, col_uf, col_cat, col_top = st.columns([1, 1, 1, 1])
+        rotulo_dim = col_dim.selectbox("Quebrar por", list(DIMENSOES))
+        sel_estados = col_uf.multiselect("Estados do Cliente (vazio = todos)", membros_fato(fato, 'customer_state'))
+        sel_categorias = col_cat.multiselect("Categorias (vazio = todas)", membros_fato(fato, 'product_category_name'))
+        top_n = col_top.slider("Mostrar os N maiores (por pedidos)", 5, 30, 15)
+
+        coluna_dim = DIMENSOES[rotulo_dim]
+        with etapa(f"Lead time por {rotulo_dim}"):
+            resumo_dim = resumo_por_dimensao(fato, coluna_dim, tuple(sel_anos), tuple(sel_estados), tuple(sel_categorias))
+        topo = resumo_dim.head(top_n).copy()
+        # IDs de vendedor são hashes longos: o gráfico mostra só o início
+        topo['Membro'] = topo[coluna_dim].astype(str).str[:12] if coluna_dim == 'seller_id' else topo[coluna_dim].astype(str)
+
+        col_graf, col_tab = st.columns([3, 2])
+        with col_graf:
+            fig_dim = px.bar(
+                topo.iloc[::-1], x='Lead_Time_Medio', y='Membro', orientation='h',
+                color='Taxa_Atraso', color_continuous_scale='RdYlGn_r',
+                hover_data={'Pedidos': ':,', 'Lead_Time_Mediano': ':.0f', 'Taxa_Atraso': ':.1%', 'Membro': False},
+                title=f"Lead Time Médio por {rotulo_dim} (cor = taxa de atraso)",
+                labels={'Lead_Time_Medio': 'Lead Time Médio (dias)', 'Membro': rotulo_dim, 'Taxa_Atraso': 'Taxa de Atraso'},
+            )
+            grafico(fig_dim, f"Lead time por {rotulo_dim}", use_container_width=True)
+        with col_tab:
+            st.caption(f"{len(resumo_dim):,} membros | cada pedido conta uma vez por membro")
+            st.dataframe(
+                resumo_dim.head(top_n).style.format({'Lead_Time_Medio': '{:.1f}', 'Lead_Time_Mediano': '{:.0f}', 'Taxa_Atraso': '{:.1%}'}),
+                use_container_width=True, hide_index=True, height=420,
+            )
+
+    with st.expander("📦 Payload dos Gráficos (Linhas Brutas vs. Resumos)", expanded=False):
+        st.markdown("Tamanho do JSON enviado ao navegador e tempo de montagem/serialização de cada figura.")
+        if st.button("Medir Figuras"):
+            st.dataframe(medir_figuras(df_filtrado, acumulador, por_status), use_container_width=True, hide_index=True)
 
     st.info("""
     **Análise Técnica:**
@@ -158,14 +196,4 @@ st.divider() # Uma linha visual para separar o App da documentação
 # 2. DOCUMENTAÇÃO (Vem no final)
 PATH_README = "projeto-5-logistica/readme.md"
 
-def exibir_readme(caminho):
-    try:
-        with open(caminho, "r", encoding="utf-8") as f:
-            conteudo = f.read()
-        # Usamos um expander "fechado" para não esticar demais a página
-        with st.expander("📖 Detalhes Técnicos e Metodologia (README)", expanded=False):
-            st.markdown(conteudo)
-    except FileNotFoundError:
-        st.error("Documentação não encontrada.")
-
 exibir_readme(PATH_README)